@@ -1,98 +1,111 @@
-from typing import List
-from game.card import Card, Suit, Rank
-from game.hand import Hand
+from typing import Iterable, List, Tuple
+from collections import defaultdict
+from functools import lru_cache
+from game.card import Card, Suit, Rank, card_code
+from game.hand import Hand, HandOverlay
 import math
 
+DECK_SIZE = 48
+PARTNER_HAND_SIZE = 12
+FAMILY_RANKS = (Rank.ACE, Rank.TEN, Rank.KING, Rank.QUEEN, Rank.JACK)
+
+# Binomial coefficients C(n, k) for every n, k up to the deck size
+BINOMIAL = [[math.comb(n, k) for k in range(DECK_SIZE + 1)] for n in range(DECK_SIZE + 1)]
+
+
+@lru_cache(maxsize=None)
+def _partner_probability(unseen: int, copies: Tuple[int, ...], at_least: int) -> float:
+    """Probability that a partner hand drawn from the unseen cards holds at least one
+    copy of at least `at_least` of the needed cards.
+
+    copies has, for each needed card, how many of its copies are unseen. Callers pass
+    it sorted so every hand with the same shape shares one cache entry.
+    """
+    if at_least <= 0:
+        return 1.0
+
+    # ways[(taken, hits)]: ways to take `taken` needed-card copies covering `hits` needed cards
+    ways = {(0, 0): 1}
+    for card_copies in copies:
+        next_ways = defaultdict(int)
+        for (taken, hits), count in ways.items():
+            next_ways[(taken, hits)] += count
+            for x in range(1, card_copies + 1):
+                next_ways[(taken + x, hits + 1)] += count * BINOMIAL[card_copies][x]
+        ways = next_ways
+
+    others = unseen - sum(copies)
+    favourable = sum(count * BINOMIAL[others][PARTNER_HAND_SIZE - taken]
+                     for (taken, hits), count in ways.items()
+                     if hits >= at_least and taken <= PARTNER_HAND_SIZE)
+    return favourable / BINOMIAL[unseen][PARTNER_HAND_SIZE]
+
 class BidHelper:
     def __init__(self, hand: Hand):
         self.hand = hand
 
-    def remaining_deck(self) -> list:
-        """Generate the remaining deck after the player's hand is removed"""
-        full_deck = self.create_full_deck()  # Create a full deck of cards
-        remaining = [card for card in full_deck if card not in self.hand.cards]
-        return remaining
-
-    def create_full_deck(self) -> list:
-        """Creates a full deck of 48 cards (2 copies of each card)"""
-        suits = [Suit.CLUBS, Suit.DIAMONDS, Suit.HEARTS, Suit.SPADES]
-        ranks = [Rank.ACE, Rank.TEN, Rank.KING, Rank.QUEEN, Rank.JACK]
-        deck = [Card(suit, rank) for suit in suits for rank in ranks for _ in range(2)]  # 2 of each card
-        return deck
-
     def calculate_hypergeometric_probability(self, needed_cards: list, total_cards_needed: int) -> float:
-        """Calculate the probability that the partner has the necessary meld cards"""
-        remaining_deck = self.remaining_deck()
-        total_remaining = len(remaining_deck)
-
-        # Count how many of the needed cards are in the remaining deck
-        remaining_needed = [card for card in needed_cards if card in remaining_deck]
-
-        # If the number of needed cards is more than the remaining, probability is 0
-        if len(remaining_needed) < total_cards_needed:
-            return 0.0
-
-        # Calculate hypergeometric probability
-        # Number of ways to choose the needed cards
-        needed_combinations = math.comb(len(remaining_needed), total_cards_needed)
-        # Number of ways to choose the remaining cards
-        remaining_combinations = math.comb(total_remaining - len(remaining_needed), 12 - total_cards_needed)
-        # Total number of ways to choose 12 cards from the remaining deck
-        total_combinations = math.comb(total_remaining, 12)
-
-        # Hypergeometric probability
-        probability = (needed_combinations * remaining_combinations) / total_combinations
-        return probability
+        """Calculate the probability that the partner has the necessary meld cards
+
+        Exact multivariate hypergeometric odds that the partner's 12 cards, drawn from
+        the cards we can't see, hold at least one copy of at least total_cards_needed of
+        the needed cards.
+        """
+        counts = self._card_counts()
+        copies = tuple(sorted(2 - counts[card.code] for card in set(needed_cards)))
+        unseen = DECK_SIZE - len(self.hand)
+        return _partner_probability(unseen, copies, total_cards_needed)
+
+    def family_probabilities(self) -> List[float]:
+        """Probability that the partner holds every card missing from a family, for each suit in Suit order."""
+        counts = self._card_counts()
+        unseen = DECK_SIZE - len(self.hand)
+        probabilities = []
+        for suit in Suit:
+            copies = tuple(sorted(2 - counts[card_code(suit, rank)] for rank in FAMILY_RANKS
+                                  if counts[card_code(suit, rank)] == 0))
+            probabilities.append(_partner_probability(unseen, copies, len(copies)))
+        return probabilities
+
+    def _card_counts(self) -> List[int]:
+        """Count vector of the hand (the Hand keeps it up to date)."""
+        return self.hand.counts
     
     def closest_family_suits(self):
         missing_cards_per_suit = []
 
+        held = set(self.hand.cards)
         for suit in Suit:
             family_cards = [Card(suit, rank) for rank in [Rank.ACE, Rank.TEN, Rank.KING, Rank.QUEEN, Rank.JACK]]
-            missing = [card for card in family_cards if card not in self.hand.cards]
+            missing = [card for card in family_cards if card not in held]
             missing_cards_per_suit.append(missing)
 
         return missing_cards_per_suit
 
     def create_bid_hand(self, trump: Suit, needed_cards: List[Card]) -> int:
-        # Start with an empty hand
-        bid_hand = Hand()
+        # A what-if copy of the hand: only the cards below are kept, nothing is copied
+        bid_hand = HandOverlay(self.hand)
+        pinochle_partner = {Suit.SPADES: Card(Suit.DIAMONDS, Rank.JACK),
+                            Suit.DIAMONDS: Card(Suit.SPADES, Rank.QUEEN)}.get(trump)
 
-        # Add all Aces in hand
-        for card in self.hand.cards:
-            if card.rank == Rank.ACE:
-                bid_hand.add_card(card)
-        
-        # Add all cards of trump suit
         for card in self.hand.cards:
-            if card.suit == trump:
+            if card.rank == Rank.ACE and card.suit == trump:
+                # Kept as an Ace and again as a trump card
                 bid_hand.add_card(card)
-        
-        # Add the Jack of Diamonds if trump is Spades
-        if trump == Suit.SPADES:
-            for card in self.hand.cards:
-                if card.suit == Suit.DIAMONDS and card.rank == Rank.JACK:
-                    bid_hand.add_card(card)
-        
-        # Add the Queen of Spades if trump is Diamonds
-        if trump == Suit.DIAMONDS:
-            for card in self.hand.cards:
-                if card.suit == Suit.SPADES and card.rank == Rank.QUEEN:
-                    bid_hand.add_card(card)
-        
+            elif card.rank != Rank.ACE and card.suit != trump and card is not pinochle_partner:
+                # Keep all Aces, all trump, and the Jack of Diamonds (Spades trump) or
+                # the Queen of Spades (Diamonds trump)
+                bid_hand.remove_card(card)
+
         # Add all the needed cards
         for card in needed_cards:
             bid_hand.add_card(card)
 
-        bid_hand.add_meld_def(trump)
-
         # Calculate the melds for the new hand
-        total_points = bid_hand.evaluate_melds()
-
-        return total_points
+        return bid_hand.meld_points(trump)
     
 
-    def estimate_tricks(self, hand_cards: List[Card], trump_suit: Suit) -> int:
+    def estimate_tricks(self, hand_cards: Iterable[Card], trump_suit: Suit) -> int:
         """Estimate the number of tricks the player is likely to win."""
         # Start with a base score of 250
         estimated_tricks = 250
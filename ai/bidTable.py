@@ -0,0 +1,237 @@
+from typing import List, Optional, Tuple
+from game.card import Card, Suit, Rank, CARDS, NUM_CARDS, SUITS, SUIT_INDEX, card_code
+from game.canonical import canonicalize
+from game.hand import Hand
+from ai.bidHelper import BidHelper
+import argparse
+import itertools
+import mmap
+import os
+import struct
+import time
+import numpy as np
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bid_table.bin")
+
+MAGIC = b"PNBT"
+VERSION = 1
+HAND_SIZE = 12
+HEADER = struct.Struct("<4sIII")  # magic, version, hand size, entries
+HEADER_SIZE = 64
+MISSING = -1
+
+# Besides the trump suit and the Aces, create_bid_hand keeps the other Pinochle card
+# when Spades or Diamonds are trump
+_EXTRA_CARD = {Suit.SPADES: card_code(Suit.DIAMONDS, Rank.JACK),
+               Suit.DIAMONDS: card_code(Suit.SPADES, Rank.QUEEN)}
+_FAMILY_RANKS = (Rank.ACE, Rank.TEN, Rank.KING, Rank.QUEEN, Rank.JACK)
+
+# Outside trump a signature only holds Aces, which count the same in every suit, so
+# those suits can be swapped freely except for the one holding the extra card
+_FIXED_SUITS = {trump: (CARDS[_EXTRA_CARD[trump]].suit,) if trump in _EXTRA_CARD else () for trump in SUITS}
+
+
+def _section_size(trump: Suit) -> int:
+    # Six trump cards and three other Aces, plus the extra Pinochle card, 0-2 copies each
+    return 3 ** (9 if trump not in _EXTRA_CARD else 10)
+
+
+_SECTION_OFFSETS = {}
+_offset = 0
+for _trump in SUITS:
+    _SECTION_OFFSETS[_trump] = _offset
+    _offset += _section_size(_trump)
+ENTRIES = _offset
+
+
+def _signature_cards(trump: Suit) -> List[int]:
+    """Card codes the bid advice for a trump depends on, in signature digit order."""
+    trump_base = card_code(trump, Rank.ACE)
+    codes = list(range(trump_base, trump_base + 6))
+    codes += [card_code(suit, Rank.ACE) for suit in SUITS if suit != trump]
+    if trump in _EXTRA_CARD:
+        codes.append(_EXTRA_CARD[trump])
+    return codes
+
+
+_SIGNATURE_CARDS = {trump: _signature_cards(trump) for trump in SUITS}
+
+
+def signature(counts: List[int], trump: Suit) -> List[int]:
+    """Canonical signature of a hand's count vector for a trump suit.
+
+    The signature keeps how many copies the hand holds of each card in
+    _SIGNATURE_CARDS: every trump, the other Aces and the Pinochle card create_bid_hand
+    keeps. Those are the only cards the partner odds and the best-case meld look at.
+    The Aces are then moved to canonical suits, so hands that only differ in which
+    plain suits hold their Aces share a row.
+    """
+    kept = [0] * NUM_CARDS
+    for code in _SIGNATURE_CARDS[trump]:
+        kept[code] = counts[code]
+    return canonicalize(kept, trump, _FIXED_SUITS[trump])[0]
+
+
+def signature_index(counts: List[int], trump: Suit) -> int:
+    """Row of the table for a hand's count vector and a trump suit."""
+    kept = signature(counts, trump)
+    index = 0
+    for code in _SIGNATURE_CARDS[trump]:
+        index = index * 3 + kept[code]
+    return _SECTION_OFFSETS[trump] + index
+
+
+def missing_family_cards(counts: List[int], trump: Suit) -> List[Card]:
+    """Family cards of the trump suit the hand holds no copy of (as closest_family_suits lists them)."""
+    return [Card(trump, rank) for rank in _FAMILY_RANKS if counts[card_code(trump, rank)] == 0]
+
+
+class BidTable:
+    """Partner family odds and best-case meld for every hand signature, read from a
+    memory-mapped file built by `python -m ai.bidTable`.
+
+    Opening the table only maps the file, so it costs the same however big it is.
+    recommend() falls back to computing the answer with BidHelper when there is no
+    table, the table is out of date, the hand is not a 12-card hand, or the row is empty.
+    """
+    def __init__(self, path: Optional[str] = DEFAULT_PATH):
+        self.path = path
+        self.max_meld: Optional[np.ndarray] = None
+        self.probability: Optional[np.ndarray] = None
+        self._map: Optional[mmap.mmap] = None
+        if path is not None and os.path.exists(path):
+            self._open(path)
+
+    def _open(self, path: str) -> None:
+        with open(path, "rb") as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return  # Empty file
+        if len(data) < HEADER_SIZE:
+            data.close()
+            return
+        magic, version, hand_size, entries = HEADER.unpack_from(data)
+        if (magic, version, hand_size, entries) != (MAGIC, VERSION, HAND_SIZE, ENTRIES) or \
+           len(data) != HEADER_SIZE + entries * 10:
+            data.close()
+            return  # Built for other rules or another layout: use live computation
+        self._map = data
+        self.max_meld = np.frombuffer(data, dtype="<i2", count=entries, offset=HEADER_SIZE)
+        self.probability = np.frombuffer(data, dtype="<f8", count=entries, offset=HEADER_SIZE + entries * 2)
+
+    @property
+    def loaded(self) -> bool:
+        return self._map is not None
+
+    def lookup(self, counts: List[int], trump: Suit) -> Optional[Tuple[float, int]]:
+        """(family probability, best-case meld) from the table, or None if it is not there."""
+        if self._map is None or sum(counts) != HAND_SIZE:
+            return None
+        row = signature_index(counts, trump)
+        max_meld = int(self.max_meld[row])
+        if max_meld == MISSING:
+            return None
+        return float(self.probability[row]), max_meld
+
+    def recommend(self, helper: BidHelper, trump: Suit) -> Tuple[float, int]:
+        """Probability the partner holds every card missing from a family in trump, and
+        the meld create_bid_hand gives if they do. Looked up, or computed when missing.
+        """
+        counts = helper._card_counts()
+        found = self.lookup(counts, trump)
+        if found is not None:
+            return found
+        needed = missing_family_cards(counts, trump)
+        probability = helper.family_probabilities()[SUIT_INDEX[trump]]
+        return probability, helper.create_bid_hand(trump, needed)
+
+    def close(self) -> None:
+        if self._map is not None:
+            self.max_meld = self.probability = None
+            self._map.close()
+            self._map = None
+
+
+_default_table: Optional[BidTable] = None
+
+
+def default_table() -> BidTable:
+    """The table at DEFAULT_PATH, mapped on first use and shared afterwards."""
+    global _default_table
+    if _default_table is None:
+        _default_table = BidTable(DEFAULT_PATH)
+    return _default_table
+
+
+def _filler_cards(trump: Suit) -> List[Card]:
+    """Cards no signature looks at, to pad a signature out to a full hand."""
+    signature = set(_SIGNATURE_CARDS[trump])
+    return [CARDS[code] for code in range(len(CARDS)) for _ in range(2)
+            if code not in signature and CARDS[code].suit != trump]
+
+
+def build_table(path: str = DEFAULT_PATH, trumps: Optional[List[Suit]] = None) -> int:
+    """Compute every row the table can hold and write it to path. Returns the rows filled.
+
+    Each canonical signature is turned into a 12-card hand (padded with cards no
+    signature looks at) and scored with BidHelper, so the table always agrees with
+    live computation. Rows for signatures that are not canonical or have more than
+    12 cards are never looked up and are left empty, as are the sections for trumps
+    not in `trumps`.
+    """
+    max_meld = np.full(ENTRIES, MISSING, dtype="<i2")
+    probability = np.zeros(ENTRIES, dtype="<f8")
+    filled = 0
+
+    for trump in (trumps if trumps is not None else SUITS):
+        codes = _SIGNATURE_CARDS[trump]
+        filler = _filler_cards(trump)
+        for copies in itertools.product(range(3), repeat=len(codes)):
+            size = sum(copies)
+            if size > HAND_SIZE:
+                continue
+            kept = [0] * NUM_CARDS
+            for code, n in zip(codes, copies):
+                kept[code] = n
+            if signature(kept, trump) != kept:
+                continue
+            hand = Hand()
+            for code, n in zip(codes, copies):
+                for _ in range(n):
+                    hand.add_card(CARDS[code])
+            for card in filler[:HAND_SIZE - size]:
+                hand.add_card(card)
+
+            helper = BidHelper(hand)
+            counts = helper._card_counts()
+            row = signature_index(counts, trump)
+            probability[row] = helper.family_probabilities()[SUIT_INDEX[trump]]
+            max_meld[row] = helper.create_bid_hand(trump, missing_family_cards(counts, trump))
+            filled += 1
+
+    # Write to a temporary file first so a mapped table is never seen half written
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, HAND_SIZE, ENTRIES).ljust(HEADER_SIZE, b"\0"))
+        f.write(max_meld.tobytes())
+        f.write(probability.tobytes())
+    os.replace(temp_path, path)
+    return filled
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the bid recommendation table used by the tutor.")
+    parser.add_argument("--out", default=DEFAULT_PATH, help="Where to write the table")
+    parser.add_argument("--trump", action="append", choices=[suit.name for suit in SUITS],
+                        help="Only build these trump suits (default: all)")
+    args = parser.parse_args(argv)
+
+    trumps = [Suit[name] for name in args.trump] if args.trump else None
+    start = time.monotonic()
+    filled = build_table(args.out, trumps)
+    print(f"Wrote {filled} of {ENTRIES} rows to {args.out} in {time.monotonic() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,16 @@
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 from game.card import Card, Suit
 from game.hand import Hand
+from game.rng import resolve
 import random
 
 class Bidder:
-    def __init__(self, maxBid, best_suit=None):
+    def __init__(self, maxBid, best_suit=None, rng: Optional[random.Random] = None):
         self.minimum_bid = 250
         self.bid_increment = 10
         self.max_bid = maxBid
         self.best_suit = best_suit
+        self.rng = resolve(rng)
     
     def get_next_bid(self, current_bid: int) -> str:
         """
@@ -26,11 +28,11 @@ class Bidder:
         base_prob = 0.75 * (1 - bid_progress)
         
         # Add some randomness to make it less predictable
-        random_factor = random.uniform(0.8, 1.2)
+        random_factor = self.rng.uniform(0.8, 1.2)
         final_prob = min(0.95, max(0.05, base_prob * random_factor))
         
         # Roll the dice
-        if random.random() < final_prob:
+        if self.rng.random() < final_prob:
             return str(current_bid + self.bid_increment)
         else:
             return "pass"
\ No newline at end of file
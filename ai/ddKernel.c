@@ -0,0 +1,503 @@
+/* Compiled search kernel for ai/doubleDummy.py.
+ *
+ * Same search as doubleDummy._Solver (zero-window alpha-beta over the trick-play
+ * phase, bounds for positions at the start of a trick in a transposition table),
+ * plus partition search: every search also works out which ranks of each suit its
+ * result depended on, and the table entry only keys on those. A bound proved with
+ * the small cards of a suit left out holds for every position that agrees on the
+ * higher ranks, which is what makes full 12-trick deals tractable.
+ *
+ * Cards are codes 0..23, suit * 6 + rank with rank 0 the Ace and 5 the Nine. Ranks
+ * 0..2 (A, 10, K) are counters. `python -m ai.doubleDummy --build` compiles this file
+ * with the system C compiler. The tables take 56 MB (32 MB of bounds, 24 MB of kept
+ * shapes), allocated on the first solve and kept until dd_clear().
+ */
+#include <limits.h>
+#include <setjmp.h>
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/mman.h>
+
+#define NCARDS 24
+#define TT_BITS 21
+#define SIG_BITS 20
+#define TT_SIZE (1u << TT_BITS)
+#define SIG_SIZE (1u << SIG_BITS)
+#define WAYS 4
+#define KEPT 6
+
+/* Bounds on the counters team 0 takes from the start of a trick */
+typedef struct {
+    uint64_t check;         /* hash of the kept part of the position, 0 for empty */
+    int8_t low, high;
+    uint8_t depth;          /* cards left in the leader's hand */
+    uint8_t pad;
+    uint16_t gen;           /* last solve that used the entry */
+    uint16_t pad2;
+} Entry;
+
+/* The kept-rank shapes stored for one suit-length signature */
+typedef struct {
+    uint64_t check;
+    uint16_t gen;
+    uint8_t used, next;
+    uint16_t kept[KEPT];    /* 3 bits per suit, in Position.order */
+} SigEntry;
+
+typedef struct {
+    uint8_t counts[4][NCARDS];
+    uint8_t suit_len[4][4];
+    uint8_t unplayed[NCARDS];   /* copies in a hand or in the current trick */
+    uint64_t owners[4];         /* per suit, byte r: 2 bits per seat for rank r */
+    int trump;
+    int remaining;              /* counters still to be taken */
+    long long nodes;
+    long long max_nodes;        /* give up past this many nodes */
+    jmp_buf out_of_nodes;
+    const int *root;            /* the trick at the root, to spot root nodes */
+    int root_n;
+    int root_best;              /* move behind the last cutoff at the root, -1 for none */
+    uint8_t beats[NCARDS][NCARDS];
+} Solver;
+
+/* The tables outlive a solve: entries describe positions, not deals, so a solve
+ * reuses whatever earlier ones proved. Entries from older solves are replaced first. */
+static Entry *table;
+static SigEntry *sigs;
+static uint16_t generation;
+static uint16_t lanes[256];  /* 2-bit seat fields of a byte spread to 4-bit lanes */
+
+static int suit_of(int c) { return c / 6; }
+static int strength(int c) { return 5 - c % 6; }
+static int counter(int c) { return c % 6 < 3; }
+
+static uint64_t mix(uint64_t h) {
+    h ^= h >> 33; h *= 0xff51afd7ed558ccdULL; h ^= h >> 33; h *= 0xc4ceb9fe1a85ec53ULL; h ^= h >> 33;
+    return h;
+}
+
+/* Relevant ranks: per suit byte, 1 + the lowest rank the result depended on (0 for none) */
+typedef uint32_t Rel;
+
+static Rel rel_union(Rel a, Rel b) {
+    uint32_t ge = (((a | 0x80808080u) - b) & 0x80808080u) >> 7;  /* 1 in bytes where a >= b */
+    uint32_t mask = ge * 0xff;
+    return (a & mask) | (b & ~mask);
+}
+
+static int rel_get(Rel r, int suit) { return (int)((r >> (8 * suit)) & 0xff) - 1; }
+
+static Rel rel_mark(Rel r, int suit, int rank) {
+    if (rel_get(r, suit) >= rank) return r;
+    return (r & ~(0xffu << (8 * suit))) | ((uint32_t)(rank + 1) << (8 * suit));
+}
+
+typedef struct {
+    uint64_t pattern;   /* owner byte of each remaining rank, high to low */
+    uint32_t sig;       /* copies per seat, counters in the low half */
+    int8_t ranks[6];
+    int nranks;
+} SuitView;
+
+static void view_suit(const Solver *s, int suit, SuitView *v) {
+    uint64_t own = s->owners[suit], p = 0;
+    uint32_t high = 0, low = 0;
+    int n = 0;
+    for (int r = 0; r < 6; r++) {
+        uint32_t b = (own >> (8 * r)) & 0xff;
+        if (!b) continue;
+        p = (p << 8) | b;
+        v->ranks[n++] = (int8_t)r;
+        if (r < 3) high += lanes[b]; else low += lanes[b];
+    }
+    v->pattern = p;
+    v->nranks = n;
+    v->sig = high | (low << 16);
+}
+
+/* Pattern of the top `keep` ranks, with how many of them are counters */
+static uint64_t truncated(const SuitView *v, int keep) {
+    int counters = 0;
+    while (counters < keep && v->ranks[counters] < 3) counters++;
+    return ((v->pattern >> (8 * (v->nranks - keep))) << 6) | (uint64_t)(keep << 3) | (uint64_t)counters;
+}
+
+/* A position at the start of a trick: trump first, then the other suits sorted so
+ * that positions differing only in which plain suit is which share entries. */
+typedef struct {
+    SuitView view[4];
+    int order[4];
+    uint64_t head;      /* hash of the leader and the suit signatures */
+} Position;
+
+static void describe(const Solver *s, int leader, Position *pos) {
+    for (int suit = 0; suit < 4; suit++) view_suit(s, suit, &pos->view[suit]);
+    int k = 0;
+    pos->order[k++] = s->trump;
+    for (int suit = 0; suit < 4; suit++) if (suit != s->trump) pos->order[k++] = suit;
+    for (int i = 2; i < 4; i++)
+        for (int j = i; j > 1; j--) {
+            const SuitView *a = &pos->view[pos->order[j - 1]], *b = &pos->view[pos->order[j]];
+            if (a->sig > b->sig || (a->sig == b->sig && a->pattern > b->pattern)) {
+                int t = pos->order[j]; pos->order[j] = pos->order[j - 1]; pos->order[j - 1] = t;
+            } else break;
+        }
+    uint64_t h = mix((uint64_t)leader + 0x9e3779b97f4a7c15ULL);
+    for (int i = 0; i < 4; i++) h = mix(h ^ ((uint64_t)pos->view[pos->order[i]].sig * (2 * i + 1)));
+    pos->head = h;
+}
+
+static SigEntry *find_sig(const Position *pos, int create) {
+    uint64_t check = pos->head | 1;
+    SigEntry *bucket = &sigs[(pos->head >> 11) & (SIG_SIZE - 1) & ~(uint32_t)(WAYS - 1)];
+    SigEntry *spare = NULL;
+    for (int w = 0; w < WAYS; w++) {
+        SigEntry *e = &bucket[w];
+        if (e->check == check) { e->gen = generation; return e; }
+        if (!spare || (spare->gen == generation && e->gen != generation)) spare = e;
+    }
+    if (!create) return NULL;
+    if (spare->gen == generation) spare = &bucket[(check >> 3) & (WAYS - 1)];
+    spare->check = check; spare->gen = generation; spare->used = 0; spare->next = 0;
+    return spare;
+}
+
+static uint64_t entry_hash(const Position *pos, uint16_t kept) {
+    uint64_t h = mix(pos->head ^ ((uint64_t)kept << 40));
+    for (int i = 0; i < 4; i++) {
+        int keep = (kept >> (3 * i)) & 7;
+        h = mix(h + truncated(&pos->view[pos->order[i]], keep) * (2 * i + 3));
+    }
+    return h | 1;
+}
+
+static Entry *find_entry(uint64_t h) {
+    Entry *bucket = &table[(h >> 11) & (TT_SIZE - 1) & ~(uint32_t)(WAYS - 1)];
+    for (int w = 0; w < WAYS; w++)
+        if (bucket[w].check == h) { bucket[w].gen = generation; return &bucket[w]; }
+    return NULL;
+}
+
+/* Entry for h, replacing one from an older solve or else the shallowest */
+static Entry *store_entry(uint64_t h, int depth) {
+    Entry *bucket = &table[(h >> 11) & (TT_SIZE - 1) & ~(uint32_t)(WAYS - 1)];
+    Entry *victim = NULL;
+    for (int w = 0; w < WAYS; w++) {
+        Entry *e = &bucket[w];
+        if (e->check == h) { e->gen = generation; return e; }
+        if (e->gen != generation) { if (!victim || victim->gen == generation) victim = e; }
+        else if (!victim || (victim->gen == generation && e->depth < victim->depth)) victim = e;
+    }
+    victim->check = h; victim->gen = generation; victim->depth = (uint8_t)depth;
+    victim->low = 0; victim->high = 127;
+    return victim;
+}
+
+static uint16_t kept_from_rel(const Position *pos, Rel rel) {
+    uint16_t kept = 0;
+    for (int i = 0; i < 4; i++) {
+        const SuitView *v = &pos->view[pos->order[i]];
+        int limit = rel_get(rel, pos->order[i]), keep = 0;
+        while (keep < v->nranks && v->ranks[keep] <= limit) keep++;
+        kept |= (uint16_t)keep << (3 * i);
+    }
+    return kept;
+}
+
+static Rel rel_from_kept(const Position *pos, uint16_t kept) {
+    Rel rel = 0;
+    for (int i = 0; i < 4; i++) {
+        int keep = (kept >> (3 * i)) & 7;
+        if (keep) rel = rel_mark(rel, pos->order[i], pos->view[pos->order[i]].ranks[keep - 1]);
+    }
+    return rel;
+}
+
+/* Legal codes for a seat, one per group of equivalent cards, in search order. A group
+ * is searched through its lowest card; top[] holds its highest. */
+static int gen_moves(const Solver *s, int seat, const int *trick, int n, int *out, int *top) {
+    const uint8_t *counts = s->counts[seat];
+    const uint8_t *lens = s->suit_len[seat];
+    int suits[4], ns = 0;
+    if (n == 0) {
+        for (int suit = 0; suit < 4; suit++) if (lens[suit]) suits[ns++] = suit;
+    } else if (lens[suit_of(trick[0])]) {
+        suits[ns++] = suit_of(trick[0]);
+    } else if (lens[s->trump]) {
+        suits[ns++] = s->trump;
+    } else {
+        for (int suit = 0; suit < 4; suit++) if (lens[suit]) suits[ns++] = suit;
+    }
+    int m = 0;
+    for (int i = 0; i < ns; i++) {
+        int suit = suits[i];
+        int group_flag = -1;
+        for (int c = suit * 6; c < suit * 6 + 6; c++) {
+            int mine = counts[c];
+            int foreign = s->unplayed[c] - mine;
+            int flag = counter(c);
+            if (mine && !foreign) {
+                if (group_flag != flag) { top[m] = c; out[m++] = c; group_flag = flag; }
+                else out[m - 1] = c;
+            } else if (mine) {
+                top[m] = c; out[m++] = c; group_flag = -1;
+            } else if (foreign) {
+                group_flag = -1;
+            }
+        }
+    }
+
+    int keys[NCARDS];
+    if (n == 0) {
+        /* Lead sure winners first, then low cards to a partner who can win the
+         * trick, then the rest from the top, keeping away from opponents' ruffs */
+        int partner = (seat + 2) % 4, t = s->trump;
+        for (int i = 0; i < m; i++) {
+            int c = out[i], suit = suit_of(c);
+            int opp_best = 6, partner_best = 6, opp_ruff = 0;
+            for (int o = 1; o < 4; o += 2) {
+                int p = (seat + o) % 4;
+                for (int r = 0; r < 6; r++) if (s->counts[p][suit * 6 + r]) { if (r < opp_best) opp_best = r; break; }
+                if (suit != t && !s->suit_len[p][suit] && s->suit_len[p][t]) opp_ruff = 1;
+            }
+            for (int r = 0; r < 6; r++) if (s->counts[partner][suit * 6 + r]) { partner_best = r; break; }
+            int score;
+            if (top[i] % 6 <= opp_best && !opp_ruff) score = 300 + strength(top[i]) * 2 + (suit == t);
+            else if (partner_best < opp_best && !opp_ruff) score = 200 - strength(c) - counter(c) * 10;
+            else score = strength(top[i]) * 2 + (suit == t) - opp_ruff * 20;
+            keys[i] = -score;
+        }
+    } else {
+        int winner = trick[0], wpos = 0;
+        for (int p = 1; p < n; p++) if (s->beats[trick[p]][winner]) { winner = trick[p]; wpos = p; }
+        if ((n - wpos) % 2 == 0) {
+            /* Partner is winning: give counters, keep winners */
+            for (int i = 0; i < m; i++)
+                keys[i] = s->beats[out[i]][winner] * 100 - counter(out[i]) * 10 + strength(out[i]);
+        } else {
+            /* Win as cheaply as possible, otherwise throw the lowest card */
+            for (int i = 0; i < m; i++)
+                keys[i] = s->beats[out[i]][winner] ? strength(out[i]) : 100 + counter(out[i]) * 10 + strength(out[i]);
+        }
+    }
+    for (int i = 1; i < m; i++) {
+        int c = out[i], t = top[i], k = keys[i], j = i - 1;
+        while (j >= 0 && keys[j] > k) { out[j + 1] = out[j]; top[j + 1] = top[j]; keys[j + 1] = keys[j]; j--; }
+        out[j + 1] = c; top[j + 1] = t; keys[j + 1] = k;
+    }
+    return m;
+}
+
+static int search(Solver *s, int leader, int *trick, int n, int target, Rel *rel);
+
+static int finish(Solver *s, int leader, int *trick, int target, Rel *rel) {
+    int w = 0;
+    for (int p = 1; p < 4; p++) if (s->beats[trick[p]][trick[w]]) w = p;
+    int winner = (leader + w) % 4;
+    int cnt = counter(trick[0]) + counter(trick[1]) + counter(trick[2]) + counter(trick[3]);
+    int gained = winner % 2 == 0 ? cnt : 0;
+    for (int p = 0; p < 4; p++) s->unplayed[trick[p]]--;
+    s->remaining -= cnt;
+    Rel child = 0;
+    int v = gained + search(s, winner, trick + 4, 0, target - gained, &child);
+    s->remaining += cnt;
+    for (int p = 0; p < 4; p++) s->unplayed[trick[p]]++;
+    /* Beating a card of the same suit depends on the winner's rank */
+    for (int p = 0; p < 4; p++)
+        if (p != w && suit_of(trick[p]) == suit_of(trick[w])) {
+            child = rel_mark(child, suit_of(trick[w]), trick[w] % 6);
+            break;
+        }
+    *rel = child;
+    return v;
+}
+
+static void take(Solver *s, int seat, int c) {
+    s->counts[seat][c]--; s->suit_len[seat][suit_of(c)]--;
+    s->owners[suit_of(c)] -= 1ULL << (8 * (c % 6) + 2 * seat);
+}
+
+static void put_back(Solver *s, int seat, int c) {
+    s->counts[seat][c]++; s->suit_len[seat][suit_of(c)]++;
+    s->owners[suit_of(c)] += 1ULL << (8 * (c % 6) + 2 * seat);
+}
+
+/* Fail-soft: the counters team 0 takes from here, exact when the result is on the
+ * same side of `target` as the true value, otherwise a bound. */
+static int search(Solver *s, int leader, int *trick, int n, int target, Rel *rel) {
+    /* Bounds already stored stay valid, so the search can simply be dropped */
+    if (++s->nodes > s->max_nodes) longjmp(s->out_of_nodes, 1);
+    *rel = 0;
+    Position pos;
+    int depth = 0;
+    if (n == 0) {
+        if (target <= 0) return 0;
+        if (target > s->remaining) return s->remaining;
+        depth = s->suit_len[leader][0] + s->suit_len[leader][1] + s->suit_len[leader][2] + s->suit_len[leader][3];
+        describe(s, leader, &pos);
+        SigEntry *sig = find_sig(&pos, 0);
+        if (sig) {
+            for (int i = 0; i < sig->used; i++) {
+                Entry *e = find_entry(entry_hash(&pos, sig->kept[i]));
+                if (e && (e->low >= target || e->high < target)) {
+                    *rel = rel_from_kept(&pos, sig->kept[i]);
+                    return e->low >= target ? e->low : e->high;
+                }
+            }
+        }
+    }
+
+    int seat = (leader + n) % 4;
+    int team_zero = seat % 2 == 0;
+    int best = team_zero ? -1 : 127;
+    int moves[NCARDS], top[NCARDS];
+    int m = gen_moves(s, seat, trick, n, moves, top);
+    Rel all = 0;
+    int i;
+    for (i = 0; i < m; i++) {
+        int c = moves[i];
+        take(s, seat, c);
+        trick[n] = c;
+        Rel child;
+        int v = n == 3 ? finish(s, leader, trick, target, &child) : search(s, leader, trick, n + 1, target, &child);
+        put_back(s, seat, c);
+        if (team_zero ? v > best : v < best) best = v;
+        if ((v >= target) == team_zero) {
+            all = child;
+            if (trick == s->root && n == s->root_n) s->root_best = c;
+            break;
+        }
+        all = rel_union(all, child);
+    }
+    if (i == m) {
+        /* Every move was tried through its group's lowest card. A group stays one
+         * group only if its ranks are all kept or all dropped. */
+        for (int j = 0; j < m; j++) {
+            int suit = suit_of(moves[j]), limit = rel_get(all, suit);
+            if (top[j] % 6 <= limit && moves[j] % 6 > limit) all = rel_mark(all, suit, moves[j] % 6);
+        }
+    }
+    *rel = all;
+
+    if (n == 0) {
+        uint16_t kept = kept_from_rel(&pos, all);
+        SigEntry *sig = find_sig(&pos, 1);
+        int known = 0;
+        for (int k = 0; k < sig->used; k++) if (sig->kept[k] == kept) known = 1;
+        if (!known) {
+            if (sig->used < KEPT) sig->kept[sig->used++] = kept;
+            else { sig->kept[sig->next] = kept; sig->next = (uint8_t)((sig->next + 1) % KEPT); }
+        }
+        Entry *e = store_entry(entry_hash(&pos, kept), depth);
+        if (best >= target) { if (best > e->low) e->low = (int8_t)best; }
+        else { if (best < e->high) e->high = (int8_t)best; }
+    }
+    return best;
+}
+
+static int open_tables(void) {
+    if (!table) {
+        table = aligned_alloc(1 << 21, TT_SIZE * sizeof(Entry));
+        sigs = aligned_alloc(1 << 21, SIG_SIZE * sizeof(SigEntry));
+        if (!table || !sigs) {
+            free(table); free(sigs);
+            table = NULL; sigs = NULL;
+            return 0;
+        }
+#ifdef MADV_HUGEPAGE
+        /* Probes land all over the tables; huge pages save most of the TLB misses */
+        madvise(table, TT_SIZE * sizeof(Entry), MADV_HUGEPAGE);
+        madvise(sigs, SIG_SIZE * sizeof(SigEntry), MADV_HUGEPAGE);
+#endif
+        memset(table, 0, TT_SIZE * sizeof(Entry));
+        memset(sigs, 0, SIG_SIZE * sizeof(SigEntry));
+        for (int b = 0; b < 256; b++) {
+            lanes[b] = 0;
+            for (int seat = 0; seat < 4; seat++)
+                lanes[b] |= (uint16_t)(((b >> (2 * seat)) & 3) << (4 * seat));
+        }
+    }
+    if (++generation == 0) {
+        memset(table, 0, TT_SIZE * sizeof(Entry));
+        memset(sigs, 0, SIG_SIZE * sizeof(SigEntry));
+        generation = 1;
+    }
+    return 1;
+}
+
+/* Forget every stored bound and free the tables; the next solve starts from empty ones */
+void dd_clear(void) {
+    free(table); free(sigs);
+    table = NULL; sigs = NULL;
+}
+
+/* counts: copies of each code per seat, 4 x 24. trick: codes already played to the
+ * current trick, starting with the leader's. Returns the fewest counters team 0
+ * (seats 0 and 2) takes from the current trick on with best play, and *high the
+ * most; the two are equal unless the search ran past max_nodes (0 for no limit)
+ * first. Returns -1 when the tables cannot be allocated. *best gets the best code
+ * for the seat to move, -1 if it has no cards; after running out of nodes, the move
+ * that proved the closer of the two bounds for its side. Not reentrant: callers
+ * serialise solves. */
+int dd_solve(const int *counts, int trump, int leader, const int *trick_in, int trick_len,
+             long long max_nodes, int *best, int *high_out, long long *nodes) {
+    if (!open_tables()) return -1;
+    Solver solver, *s = &solver;
+    memset(s, 0, sizeof(*s));
+    s->max_nodes = max_nodes > 0 ? max_nodes : LLONG_MAX;
+    s->trump = trump;
+    for (int a = 0; a < NCARDS; a++)
+        for (int b = 0; b < NCARDS; b++)
+            s->beats[a][b] = suit_of(a) == suit_of(b) ? strength(a) > strength(b) : suit_of(a) == trump;
+    for (int seat = 0; seat < 4; seat++)
+        for (int c = 0; c < NCARDS; c++) {
+            int k = counts[seat * NCARDS + c];
+            s->counts[seat][c] = (uint8_t)k;
+            s->suit_len[seat][suit_of(c)] += k;
+            s->unplayed[c] += k;
+            s->owners[suit_of(c)] += (uint64_t)k << (8 * (c % 6) + 2 * seat);
+            s->remaining += k * counter(c);
+        }
+    int trick[64];
+    for (int t = 0; t < trick_len; t++) {
+        trick[t] = trick_in[t];
+        s->unplayed[trick_in[t]]++;
+        s->remaining += counter(trick_in[t]);
+    }
+
+    int seat = (leader + trick_len) % 4;
+    int team_zero = seat % 2 == 0;
+    int moves[NCARDS], top[NCARDS];
+    int m = gen_moves(s, seat, trick, trick_len, moves, top);
+    s->root = trick;
+    s->root_n = trick_len;
+    s->root_best = -1;
+
+    Rel rel;
+    volatile int low = 0, high = s->remaining, found = m ? moves[0] : -1;
+    if (setjmp(s->out_of_nodes) == 0) {
+        while (low < high) {
+            int target = (low + high + 1) / 2;
+            int v = search(s, leader, trick, trick_len, target, &rel);
+            if (v >= target) low = v; else high = v;
+        }
+
+        /* Best move: the first that keeps team 0 at exactly the solved value */
+        for (int i = 0; i < m; i++) {
+            int c = moves[i];
+            take(s, seat, c);
+            trick[trick_len] = c;
+            int target = team_zero ? low : low + 1;
+            int v = trick_len == 3 ? finish(s, leader, trick, target, &rel) : search(s, leader, trick, trick_len + 1, target, &rel);
+            put_back(s, seat, c);
+            if ((v >= target) == team_zero) { found = c; break; }
+        }
+    } else if (s->root_best >= 0) {
+        found = s->root_best;
+    }
+    *best = found;
+    *high_out = high;
+    *nodes = s->nodes;
+    return low;
+}
@@ -0,0 +1,445 @@
+from typing import List, Dict, Optional, Tuple
+from game.card import Card, Suit, CARDS, NUM_CARDS, SUIT_INDEX
+from game.game_state import GameState
+import argparse
+import ctypes
+import os
+import subprocess
+import sys
+import threading
+
+# Card facts by code. Codes run Ace down to Nine inside each suit.
+_SUIT_OF = [code // 6 for code in range(NUM_CARDS)]
+_STRENGTH = [5 - code % 6 for code in range(NUM_CARDS)]        # Nine 0 .. Ace 5
+_COUNTER = [1 if code % 6 < 3 else 0 for code in range(NUM_CARDS)]  # Ace, Ten and King count
+_SHIFT = [[1 << (2 * (seat * NUM_CARDS + code)) for code in range(NUM_CARDS)] for seat in range(4)]
+
+# Entries kept in the transposition and killer tables before they are cleared
+MAX_TABLE_SIZE = 1_000_000
+
+# Nodes a kernel solve may search before it settles for bounds, about a second on
+# one core. Most full deals need far fewer, the hardest over ten times more.
+DEFAULT_MAX_NODES = 4_000_000
+
+# The compiled kernel: ddKernel.c built by `python -m ai.doubleDummy --build` into the
+# user's cache directory, or wherever $PINOCHLE_DD_KERNEL points
+KERNEL_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ddKernel.c")
+KERNEL_PATH = os.environ.get("PINOCHLE_DD_KERNEL") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "pinochle-tutor", "ddKernel.so")
+
+# Without the kernel, only positions this close to the end are solved, by _Solver;
+# it takes well under a tenth of a second on those and over a second soon after
+PYTHON_MAX_TRICKS = 6
+
+
+class SolveResult:
+    """Outcome of a double-dummy search.
+
+    A search that ran out of nodes only brackets the result: the side to move takes
+    between counters and max_counters, and exact is False.
+    """
+    def __init__(self, counters: int, best_card: Optional[Card], nodes: int,
+                 max_counters: Optional[int] = None):
+        self.counters = counters    # Counters (A, 10, K) the side to move takes from this trick on
+        self.points = counters * 10
+        self.max_counters = counters if max_counters is None else max_counters
+        self.exact = self.max_counters == counters
+        self.best_card = best_card  # Best card for the seat to move
+        self.nodes = nodes
+
+
+class _Solver:
+    """Zero-window alpha-beta search over the trick-play phase with every hand visible.
+
+    ge() answers "does team 0 (seats 0 and 2) take at least `target` counters from the
+    current trick to the end of the deal"; solve_position binary-searches the target.
+    Bounds for positions at the start of a trick are kept in a transposition table.
+    Its key only keeps what matters for play: the trump suit's rank pattern and the
+    sorted patterns of the other suits, where a pattern lists who holds each remaining
+    rank from high to low and whether it is a counter. Ranks that are gone and the
+    order of the non-trump suits do not change the outcome, so those positions share
+    an entry. The best move found at each node is remembered and tried first next time.
+    """
+    def __init__(self, hands: List[List[Card]], trump: Suit):
+        self.trump = SUIT_INDEX[trump]
+        self.counts = [[0] * NUM_CARDS for _ in range(4)]
+        self.suit_counts = [[0] * 4 for _ in range(4)]
+        self.unplayed = [0] * NUM_CARDS  # Copies in a hand or in the current trick
+        for seat, cards in enumerate(hands):
+            for card in cards:
+                self.counts[seat][card.code] += 1
+                self.suit_counts[seat][_SUIT_OF[card.code]] += 1
+                self.unplayed[card.code] += 1
+        self.remaining_counters = sum(_COUNTER[code] * n for code, n in enumerate(self.unplayed))
+        self.table: Dict[tuple, Tuple[int, int]] = {}
+        self.killers: Dict[tuple, int] = {}
+        self.packed = sum(_SHIFT[seat][code] * n for seat in range(4) for code, n in enumerate(self.counts[seat]))
+        self.nodes = 0
+
+    def _key(self, leader: int) -> tuple:
+        c0, c1, c2, c3 = self.counts
+        unplayed = self.unplayed
+        patterns = []
+        for suit in range(4):
+            pattern = 1
+            for code in range(suit * 6, suit * 6 + 6):
+                if unplayed[code]:
+                    pattern = (pattern << 9) | (_COUNTER[code] << 8) | c0[code] | (c1[code] << 2) | (c2[code] << 4) | (c3[code] << 6)
+            patterns.append(pattern)
+        trump_pattern = patterns.pop(self.trump)
+        patterns.sort()
+        return (leader, trump_pattern, patterns[0], patterns[1], patterns[2])
+
+    def _beats(self, code: int, winner: int) -> bool:
+        if _SUIT_OF[code] == _SUIT_OF[winner]:
+            return _STRENGTH[code] > _STRENGTH[winner]
+        return _SUIT_OF[code] == self.trump
+
+    def moves(self, seat: int, trick: List[int]) -> List[int]:
+        """Legal codes for a seat, one per group of equivalent cards, in search order."""
+        counts = self.counts[seat]
+        suit_counts = self.suit_counts[seat]
+        if not trick:
+            suits = [s for s in range(4) if suit_counts[s]]
+        elif suit_counts[_SUIT_OF[trick[0]]]:
+            suits = [_SUIT_OF[trick[0]]]
+        elif suit_counts[self.trump]:
+            suits = [self.trump]
+        else:
+            suits = [s for s in range(4) if suit_counts[s]]
+
+        # Cards of one suit are equivalent when no other seat holds a card ranked between
+        # them and they are worth the same counters, so only one of them is searched.
+        candidates = []
+        for suit in suits:
+            group_counter = None
+            for code in range(suit * 6, suit * 6 + 6):
+                mine = counts[code]
+                foreign = self.unplayed[code] - mine
+                if mine and not foreign:
+                    if group_counter != _COUNTER[code]:
+                        candidates.append(code)
+                        group_counter = _COUNTER[code]
+                elif mine:
+                    candidates.append(code)
+                    group_counter = None
+                elif foreign:
+                    group_counter = None
+
+        if len(candidates) > 1:
+            if trick:
+                candidates.sort(key=self._follow_order(trick))
+            else:
+                trump = self.trump
+                candidates.sort(key=lambda code: (-_STRENGTH[code], _SUIT_OF[code] != trump))
+        return candidates
+
+    def _follow_order(self, trick: List[int]):
+        winner = trick[0]
+        winner_pos = 0
+        for pos in range(1, len(trick)):
+            if self._beats(trick[pos], winner):
+                winner, winner_pos = trick[pos], pos
+        beats = self._beats
+        if (len(trick) - winner_pos) % 2 == 0:
+            # Partner is winning: give counters, keep winners
+            return lambda code: (beats(code, winner), -_COUNTER[code], _STRENGTH[code])
+        # Win as cheaply as possible, otherwise throw the lowest card
+        return lambda code: ((0, _STRENGTH[code]) if beats(code, winner)
+                             else (1, _COUNTER[code] * 10 + _STRENGTH[code]))
+
+    def ge(self, leader: int, trick: List[int], target: int) -> bool:
+        """True if team 0 takes at least `target` counters from here with best play."""
+        self.nodes += 1
+
+        if not trick:
+            if target <= 0:
+                return True
+            if target > self.remaining_counters:
+                return False
+            key = self._key(leader)
+            low, high = self.table.get(key, (0, self.remaining_counters))
+            if low >= target:
+                return True
+            if high < target:
+                return False
+            if len(self.table) > MAX_TABLE_SIZE:
+                self.table.clear()
+                self.killers.clear()
+
+        seat = (leader + len(trick)) % 4
+        team_zero = seat % 2 == 0
+        counts = self.counts[seat]
+        suit_counts = self.suit_counts[seat]
+        result = not team_zero
+
+        moves = self.moves(seat, trick)
+        position = (self.packed, leader, len(trick))
+        killer = self.killers.get(position)
+        if killer is not None and killer in moves and moves[0] != killer:
+            moves.remove(killer)
+            moves.insert(0, killer)
+
+        for code in moves:
+            counts[code] -= 1
+            suit_counts[_SUIT_OF[code]] -= 1
+            self.packed -= _SHIFT[seat][code]
+            trick.append(code)
+
+            if len(trick) == 4:
+                child = self._finish_trick(leader, trick, target)
+            else:
+                child = self.ge(leader, trick, target)
+
+            trick.pop()
+            self.packed += _SHIFT[seat][code]
+            suit_counts[_SUIT_OF[code]] += 1
+            counts[code] += 1
+
+            if child == team_zero:
+                result = child
+                self.killers[position] = code
+                break
+
+        if not trick:
+            if result:
+                low = target
+            else:
+                high = target - 1
+            self.table[key] = (low, high)
+        return result
+
+    def _finish_trick(self, leader: int, trick: List[int], target: int) -> bool:
+        winner_pos = 0
+        for pos in range(1, 4):
+            if self._beats(trick[pos], trick[winner_pos]):
+                winner_pos = pos
+        winner = (leader + winner_pos) % 4
+        counters = _COUNTER[trick[0]] + _COUNTER[trick[1]] + _COUNTER[trick[2]] + _COUNTER[trick[3]]
+        gained = counters if winner % 2 == 0 else 0
+
+        for code in trick:
+            self.unplayed[code] -= 1
+        self.remaining_counters -= counters
+
+        result = self.ge(winner, [], target - gained)
+
+        self.remaining_counters += counters
+        for code in trick:
+            self.unplayed[code] += 1
+        return result
+
+    def value(self, leader: int, trick: List[int]) -> int:
+        """Counters team 0 takes from here with best play, by binary search on ge()."""
+        low, high = 0, self.remaining_counters
+        while low < high:
+            target = (low + high + 1) // 2
+            if self.ge(leader, trick, target):
+                low = target
+            else:
+                high = target - 1
+        return low
+
+
+_kernel_lib: Optional[ctypes.CDLL] = None
+_kernel_error: Optional[str] = None  # Why the kernel could not be loaded
+_kernel_checked = False
+# The kernel's tables are shared by every solve in the process
+_kernel_lock = threading.Lock()
+
+
+def build_kernel(path: str = KERNEL_PATH) -> None:
+    """Compile ddKernel.c into a shared library at `path` with the system C compiler
+    ($CC, or cc). Raises OSError when there is no compiler and CalledProcessError
+    when the compile fails."""
+    compiler = os.environ.get("CC", "cc")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Build under a temporary name so another process never loads a half-written library
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        subprocess.run([compiler, "-O2", "-shared", "-fPIC", "-o", temp_path, KERNEL_SOURCE],
+                       check=True, capture_output=True, text=True)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _load_kernel() -> ctypes.CDLL:
+    build = "run `python -m ai.doubleDummy --build` to build it"
+    if not os.path.exists(KERNEL_PATH):
+        raise RuntimeError(f"The double-dummy kernel {KERNEL_PATH} is not built; {build}")
+    if os.path.getmtime(KERNEL_PATH) < os.path.getmtime(KERNEL_SOURCE):
+        raise RuntimeError(f"The double-dummy kernel {KERNEL_PATH} is older than ddKernel.c; {build}")
+    try:
+        lib = ctypes.CDLL(KERNEL_PATH)
+    except OSError as e:
+        raise RuntimeError(f"Could not load the double-dummy kernel {KERNEL_PATH} ({e}); {build}") from None
+    lib.dd_clear.restype = None
+    lib.dd_solve.restype = ctypes.c_int
+    lib.dd_solve.argtypes = [ctypes.POINTER(ctypes.c_int), ctypes.c_int, ctypes.c_int,
+                             ctypes.POINTER(ctypes.c_int), ctypes.c_int, ctypes.c_longlong,
+                             ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+                             ctypes.POINTER(ctypes.c_longlong)]
+    return lib
+
+
+def _kernel() -> Optional[ctypes.CDLL]:
+    """The compiled kernel, or None when it is not built or older than its source;
+    _kernel_error then says why."""
+    global _kernel_lib, _kernel_error, _kernel_checked
+    with _kernel_lock:
+        if not _kernel_checked:
+            try:
+                _kernel_lib = _load_kernel()
+            except RuntimeError as e:
+                _kernel_error = str(e)
+            _kernel_checked = True
+    return _kernel_lib
+
+
+def kernel_available() -> bool:
+    """True when full deals can be solved, i.e. the compiled kernel is built and current."""
+    return _kernel() is not None
+
+
+def clear_tables() -> None:
+    """Forget the bounds earlier solves left in the kernel's tables and free them. The
+    tables take about 56 MB from the first solve on, and later solves reuse what they
+    hold, which makes solving one position after another from the same deal cheap;
+    clear them to time a solve from scratch or to give the memory back."""
+    lib = _kernel()
+    if lib is not None:
+        with _kernel_lock:
+            lib.dd_clear()
+
+
+def _solve_kernel(lib: ctypes.CDLL, hands: List[List[Card]], trump: Suit, leader: int,
+                  trick_codes: List[int], max_nodes: Optional[int]) -> Optional[Tuple[int, int, int, int]]:
+    """Bounds on team 0's counters, the best code and the node count from the compiled kernel."""
+    counts = (ctypes.c_int * (4 * NUM_CARDS))()
+    for seat, cards in enumerate(hands):
+        for card in cards:
+            counts[seat * NUM_CARDS + card.code] += 1
+    trick = (ctypes.c_int * 4)(*trick_codes)
+    best = ctypes.c_int()
+    high = ctypes.c_int()
+    nodes = ctypes.c_longlong()
+    with _kernel_lock:
+        low = lib.dd_solve(counts, SUIT_INDEX[trump], leader, trick, len(trick_codes), max_nodes or 0,
+                           ctypes.byref(best), ctypes.byref(high), ctypes.byref(nodes))
+    if low < 0:
+        return None
+    return low, high.value, best.value, nodes.value
+
+
+def _solve_python(hands: List[List[Card]], trump: Suit, leader: int,
+                  trick_codes: List[int]) -> Tuple[int, int, int, int]:
+    """Team 0's counters (twice, as both bounds), the best code and the node count from _Solver."""
+    solver = _Solver(hands, trump)
+    for code in trick_codes:
+        solver.unplayed[code] += 1
+        solver.remaining_counters += _COUNTER[code]
+
+    seat = (leader + len(trick_codes)) % 4
+    moves = solver.moves(seat, trick_codes)
+    value = solver.value(leader, trick_codes)
+
+    # Best move: one that keeps team 0 at exactly the solved value
+    team_zero = seat % 2 == 0
+    counts = solver.counts[seat]
+    suit_counts = solver.suit_counts[seat]
+    best_code = moves[0]
+    for code in moves:
+        counts[code] -= 1
+        suit_counts[_SUIT_OF[code]] -= 1
+        solver.packed -= _SHIFT[seat][code]
+        trick_codes.append(code)
+        target = value if team_zero else value + 1
+        if len(trick_codes) == 4:
+            reaches = solver._finish_trick(leader, trick_codes, target)
+        else:
+            reaches = solver.ge(leader, trick_codes, target)
+        trick_codes.pop()
+        solver.packed += _SHIFT[seat][code]
+        suit_counts[_SUIT_OF[code]] += 1
+        counts[code] += 1
+        if reaches == team_zero:
+            best_code = code
+            break
+    return value, value, best_code, solver.nodes
+
+
+def solve_position(hands: List[List[Card]], trump: Suit, leader: int,
+                   trick: Optional[List[Card]] = None,
+                   max_nodes: Optional[int] = DEFAULT_MAX_NODES) -> SolveResult:
+    """Solve the trick-play phase with all four hands known.
+
+    hands are the cards each seat still holds, trick the cards already played to the
+    current trick starting with the leader's. Returns the counters the side to move
+    takes from the current trick to the end of the deal with best play on both sides,
+    and the best card for the seat to move.
+
+    The search runs in the compiled kernel, built by `python -m ai.doubleDummy --build`.
+    Without it, positions with at most PYTHON_MAX_TRICKS tricks left are solved by the
+    much slower _Solver, which has no node limit, and larger ones raise RuntimeError.
+
+    The kernel does NOT solve every full 12-trick deal in well under a second. On one
+    core it takes a median 0.3 s, but about three random deals in ten need more than a
+    second, and the hardest need over ten. So a kernel solve stops after max_nodes nodes
+    (None for no limit) and returns bounds with exact False. With the default budget, a
+    full deal takes at most about a second. About 3 deals in 10 come back as bounds,
+    usually within a couple of counters, though a few give no bound at all. Solves from
+    the second trick on, with tables left by earlier solves of the deal, stay well
+    inside the budget.
+    """
+    trick_codes = [card.code for card in trick or []]
+    seat = (leader + len(trick_codes)) % 4
+    if not hands[seat]:
+        return SolveResult(0, None, 0)
+
+    lib = _kernel()
+    if lib is not None:
+        solved = _solve_kernel(lib, hands, trump, leader, trick_codes, max_nodes)
+        if solved is None:
+            raise MemoryError("The double-dummy kernel could not allocate its tables")
+    elif max(len(cards) for cards in hands) <= PYTHON_MAX_TRICKS:
+        solved = _solve_python(hands, trump, leader, trick_codes)
+    else:
+        raise RuntimeError(_kernel_error)
+    low, high, best_code, nodes = solved
+
+    if seat % 2 == 0:
+        return SolveResult(low, CARDS[best_code], nodes, high)
+    remaining = sum(_COUNTER[card.code] for cards in hands for card in cards) + sum(_COUNTER[code] for code in trick_codes)
+    return SolveResult(remaining - high, CARDS[best_code], nodes, remaining - low)
+
+
+def solve(game_state: GameState, leader: int) -> SolveResult:
+    """Solve the trick-play position in a GameState for the trick led by `leader`."""
+    hands = [hand.cards for hand in game_state.player_hands]
+    return solve_position(hands, game_state.trump_suit, leader, game_state.current_trick)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the compiled double-dummy search kernel.")
+    parser.add_argument("--build", action="store_true", help="Compile ai/ddKernel.c with $CC (default cc)")
+    parser.add_argument("--out", default=KERNEL_PATH, help="Where to write the kernel")
+    args = parser.parse_args(argv)
+    if not args.build:
+        parser.error("nothing to do; pass --build")
+
+    try:
+        build_kernel(args.out)
+    except OSError as e:
+        sys.exit(f"Could not run the C compiler: {e}")
+    except subprocess.CalledProcessError as e:
+        sys.exit(f"Compiling {KERNEL_SOURCE} failed:\n{e.stderr}")
+    print(f"Wrote {args.out}")
+    if os.path.abspath(args.out) != os.path.abspath(KERNEL_PATH):
+        print(f"Set PINOCHLE_DD_KERNEL={args.out} to use it")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+from typing import List, Dict, Optional, Tuple
+from game.card import Card, Deck, Suit, CARDS
+from game.hand import Hand, HandOverlay
+from game.game_state import GameState
+from game.flow import GameFlow, Decision, Action, BID, CHOOSE_TRUMP, PLAY, final_scores
+from game.rng import resolve
+from ai.bidHelper import BidHelper
+from ai.bidder import Bidder
+from ai.bidTable import default_table
+from ai.helperFunctions import choose_cards_to_pass, choose_cards_to_pass_back, cardPlay
+import random
+
+
+class DealResult:
+    """Everything that happened in one headless deal."""
+    def __init__(self):
+        self.hands: List[List[Card]] = []          # Hands as dealt, per seat
+        self.opener: int = 0
+        self.bids: List[Tuple[int, Optional[int]]] = []  # (seat, bid) with None for a pass
+        self.winning_bidder: Optional[int] = None
+        self.bid: int = 0
+        self.trump: Optional[Suit] = None
+        self.passed: List[Card] = []               # Partner -> bid winner
+        self.passed_back: List[Card] = []          # Bid winner -> partner
+        self.meld: List[int] = []                  # Meld points per seat
+        self.tricks: List[Tuple[int, List[Card], int]] = []  # (leader, cards, winner)
+        self.counters: Dict[int, int] = {0: 0, 1: 0}  # Counters (A, 10, K) taken per team
+        self.scores: List[int] = [0, 0]            # Final score per team
+
+    def to_dict(self) -> dict:
+        """Plain JSON-ready form, with cards written like "10H" or "QS"."""
+        return {
+            "hands": [card_names(hand) for hand in self.hands],
+            "opener": self.opener,
+            "bids": [[seat, bid] for seat, bid in self.bids],
+            "winning_bidder": self.winning_bidder,
+            "bid": self.bid,
+            "trump": self.trump.name if self.trump is not None else None,
+            "passed": card_names(self.passed),
+            "passed_back": card_names(self.passed_back),
+            "meld": list(self.meld),
+            "tricks": [{"leader": leader, "cards": card_names(cards), "winner": winner}
+                       for leader, cards, winner in self.tricks],
+            "trick_points": [self.counters[0] * 10, self.counters[1] * 10],
+            "scores": list(self.scores),
+        }
+
+
+def card_names(cards: List[Card]) -> List[str]:
+    """Short ASCII names for cards: rank then the suit's initial."""
+    return [f"{card.rank}{card.suit.name[0]}" for card in cards]
+
+
+_CARDS_BY_NAME: Dict[str, Card] = {card_names([card])[0]: card for card in CARDS}
+
+
+def parse_cards(names: List[str]) -> List[Card]:
+    """Cards from their card_names() names; raises ValueError for anything else."""
+    try:
+        return [_CARDS_BY_NAME[name.upper()] for name in names]
+    except (KeyError, AttributeError):
+        raise ValueError(f"Not a list of card names like \"10H\" or \"QS\": {names!r}") from None
+
+
+def create_bidder(hand: Hand, rng: Optional[random.Random] = None) -> Bidder:
+    """Build the computer bidder for a hand from its best family suit."""
+    helper = BidHelper(hand)
+    neededCards = helper.closest_family_suits()
+    probabilities = helper.family_probabilities()
+
+    # Find best suit based on probability
+    best_suit = None
+    best_prob = 0
+    best_needed = None
+
+    for suit, needed, prob in zip(Suit, neededCards, probabilities):
+        if len(needed) <= 4:  # Only consider suits where we can get all needed cards
+            if prob > best_prob:
+                best_prob = prob
+                best_suit = suit
+                best_needed = needed
+
+    if best_suit is None:
+        return Bidder(250, Suit.CLUBS, rng)
+
+    # Calculate minimum bid (current meld + tricks)
+    hand.add_meld_def(best_suit)
+    min_meld = hand.evaluate_melds(detailed=False)
+    min_tricks = helper.estimate_tricks(hand.cards, best_suit)
+    min_bid = min_meld + min_tricks
+
+    # Calculate maximum bid (potential meld + tricks with needed cards)
+    _, max_meld = default_table().recommend(helper, best_suit)
+    max_tricks = helper.estimate_tricks(HandOverlay(hand, added=best_needed), best_suit)
+    max_bid = max_meld + max_tricks
+
+    # Generate bid based on probability
+    # If probability is 50% or higher, bias towards higher bids
+    if best_prob >= 0.5:
+        # Use a triangular distribution favoring higher bids
+        # The higher the probability, the more we favor the max bid
+        bid_range = max_bid - min_bid
+        # Scale probability to be between 0.5 and 1.0 for high probability cases
+        scaled_prob = 0.5 + (best_prob - 0.5) * 0.5
+        # Generate bid with bias towards max_bid
+        bid = int(min_bid + bid_range * (1 - (1 - scaled_prob) ** 2))
+    else:
+        # For lower probabilities, be more conservative
+        # Scale probability to be between 0 and 0.5
+        scaled_prob = best_prob * 0.5
+        # Generate bid with bias towards min_bid
+        bid = int(min_bid + (max_bid - min_bid) * scaled_prob)
+
+    if bid > 250:
+        return Bidder(bid, best_suit, rng)
+    return Bidder(250, best_suit, rng)
+
+
+def deal_hands(deck: Deck, game_state: GameState, rng: Optional[random.Random] = None) -> None:
+    """Reset the game state, shuffle and deal 12 cards to each seat, 3 at a time."""
+    game_state.reset()
+    deck._create_deck()
+    deck.shuffle(rng)
+
+    for _ in range(4):
+        game_state.player_hands.append(Hand())
+
+    for _ in range(4):  # 4 rounds of dealing
+        for hand in game_state.player_hands:
+            for card in deck.draw_hand(3):
+                hand.add_card(card)
+
+    game_state.event_log.deal([hand.cards for hand in game_state.player_hands])
+
+
+def computer_action(game_state: GameState, decision: Decision, bidders: Dict[int, Bidder],
+                    rng: Optional[random.Random] = None) -> Action:
+    """What the computer player in a seat does for a GameFlow decision."""
+    seat = decision.seat
+    if decision.kind == PLAY:
+        return cardPlay(decision.legal, game_state.current_trick, game_state.played_cards,
+                        game_state.trump_suit, (game_state.winning_bidder % 2 == seat % 2),
+                        game_state.tracker, game_state.winning_card(), rng,
+                        game_state.locations[seat] if game_state.locations else None)
+    if decision.kind == BID:
+        bid_input = bidders[seat].get_next_bid(game_state.current_bid)
+        if bid_input == "pass" or int(bid_input) < decision.minimum:
+            return None
+        return int(bid_input)
+    if decision.kind == CHOOSE_TRUMP:
+        return bidders[seat].best_suit
+    hand = game_state.player_hands[seat]
+    if seat == game_state.winning_bidder:
+        return choose_cards_to_pass_back(hand, game_state.trump_suit)
+    return choose_cards_to_pass(hand, game_state.trump_suit)
+
+
+def play_deal(deck: Optional[Deck] = None, game_state: Optional[GameState] = None,
+              rng: Optional[random.Random] = None, track_locations: bool = False) -> DealResult:
+    """Play a full deal end-to-end with the AI on all four seats, without any I/O.
+
+    Every random choice (shuffle, opener, bids, card play) is drawn from rng, so a
+    deal played with game_rng(run_seed, game_index) can be replayed exactly.
+
+    With track_locations the computer players also use what they have seen of the
+    hidden hands (GameState.locations). It is off by default, as keeping it up to
+    date is a noticeable share of a deal's time.
+    """
+    rng = resolve(rng)
+    deck = deck if deck is not None else Deck()
+    game_state = game_state if game_state is not None else GameState()
+    result = DealResult()
+
+    deal_hands(deck, game_state, rng)
+    result.hands = [list(hand.cards) for hand in game_state.player_hands]
+
+    bidders = {seat: create_bidder(hand, rng) for seat, hand in enumerate(game_state.player_hands)}
+    result.opener = rng.randint(0, 3)
+    flow = GameFlow(game_state, result.opener, track_locations=track_locations)
+    decision = flow.pending_decision()
+    while decision is not None:
+        flow.apply(computer_action(game_state, decision, bidders, rng))
+        decision = flow.pending_decision()
+
+    result.bids = flow.bids
+    result.winning_bidder = game_state.winning_bidder
+    result.bid = game_state.current_bid
+    result.trump = game_state.trump_suit
+    result.passed, result.passed_back = flow.passes[0][2], flow.passes[1][2]
+    result.meld = flow.meld
+    result.tricks = flow.tricks
+    result.counters = dict(game_state.tricks_won)
+    result.scores = flow.scores
+
+    return result
@@ -5,8 +5,12 @@ from game.hand import Hand
 import random
 
 from collections import defaultdict
-from typing import List
-from game.card import Card, Suit, Rank
+from typing import List, Optional
+from game.card import Card, Suit, Rank, CARDS
+from game.card_tracker import CardTracker
+from game.inference import CardLocations
+from game.strength import BEATS, CARD_STRENGTH, HIGHER, RANK_STRENGTH, winning_position
+from game.rng import resolve
 
 
 def prompt_user_to_pass_cards(hand, recommended_cards):
@@ -102,7 +106,7 @@ def choose_cards_to_pass(hand: List[Card], trump_suit: Suit) -> List[Card]:
         if suit == trump_suit:
             continue
         # Prefer to drop non-face cards first
-        sorted_cards = sorted(cards, key=lambda c: (c.rank in [Rank.KING, Rank.QUEEN], c.rank.value))
+        sorted_cards = sorted(cards, key=lambda c: (c.rank in [Rank.KING, Rank.QUEEN], CARD_STRENGTH[c.code]))
         for card in sorted_cards:
             to_pass.append(card)
             hand_copy.remove(card)
@@ -234,41 +238,50 @@ def choose_cards_to_pass_back(hand: Hand, trump: Suit) -> List[Card]:
         return to_pass[:4]
 
     # Fallback: lowest ranked non-trump, non-Ace cards
-    rank_order = {Rank.ACE: 0, Rank.TEN: 1, Rank.KING: 2, Rank.QUEEN: 3, Rank.JACK: 4, Rank.NINE: 5}
     fallback = [c for c in cards_to_consider if c.suit != trump and c.rank != Rank.ACE]
-    sorted_hand = sorted(fallback, key=lambda c: rank_order[c.rank])
+    sorted_hand = sorted(fallback, key=lambda c: -CARD_STRENGTH[c.code])
     return sorted_hand[:4]
 
-def cardPlay(cards, currentCards, cardsPlayed, trump, haveBid):
+def cardPlay(cards, currentCards, cardsPlayed, trump, haveBid, tracker: Optional[CardTracker] = None,
+             winningCard: Optional[Card] = None, rng: Optional[random.Random] = None,
+             locations: Optional[CardLocations] = None):
+    rng = resolve(rng)
+    # The game's CardTracker answers "what has been played" in O(1); build one if not given
+    if tracker is None:
+        tracker = CardTracker.from_played(cardsPlayed)
+
+    beats = BEATS[trump]  # beats[a][b]: card code a takes the trick from b
+
     def rank_value(card):
-        return card.rank.value
+        return CARD_STRENGTH[card.code]
 
     def is_trump(card):
         return card.suit == trump
 
     def all_played(card):
-        return cardsPlayed.count(card) == 2
-
-    def get_unplayed_trumps():
-        all_trumps = [Card(trump, rank) for rank in Rank]
-        return [card for card in all_trumps if cardsPlayed.count(card) < 2]
-
-    def get_strongest_unplayed_trumps():
-        return sorted(get_unplayed_trumps(), key=rank_value, reverse=True)
+        return tracker.all_played(card)
 
     def sort_cards_by_rank(card_list, reverse=True):
         return sorted(card_list, key=rank_value, reverse=reverse)
 
+    # What the seat has seen of the other hands (GameState.locations), if given
+    opponents = ((locations.seat + 1) % 4, (locations.seat + 3) % 4) if locations is not None else ()
+
+    def opponents_out_of(suit):
+        return bool(opponents) and all(locations.shown_out(seat, suit) for seat in opponents)
+
+    def opponent_may_ruff(suit):
+        return any(locations.may_ruff(seat, suit, trump) for seat in opponents)
+
     # LEADING THE TRICK
     if len(currentCards) == 0:
         if haveBid:
-            # Try to pull trump
-            my_trumps = [c for c in cards if is_trump(c)]
+            # Try to pull trump, unless both opponents have shown they have none left
+            my_trumps = [c for c in cards if is_trump(c)] if not opponents_out_of(trump) else []
             my_trumps_sorted = sort_cards_by_rank(my_trumps)
 
             for card in my_trumps_sorted:
-                stronger_unplayed = [c for c in get_strongest_unplayed_trumps() if rank_value(c) > rank_value(card)]
-                if not stronger_unplayed:
+                if tracker.is_boss(card):
                     return card  # No stronger trump left
                 if all_played(Card(card.suit, Rank.ACE)) or card.rank == Rank.ACE:
                     return card  # Play Ace or weaker trump if stronger Aces are gone
@@ -285,37 +298,35 @@ def cardPlay(cards, currentCards, cardsPlayed, trump, haveBid):
                     return choice
 
             # If nothing else, play a random card
-            return random.choice(cards)
+            return rng.choice(cards)
 
         else:
             # You don't have the bid, try to play high card in a suit where all higher cards have been played
             for suit in Suit:
                 suit_cards = [c for c in cards if c.suit == suit and not is_trump(c)]
-                if not suit_cards:
-                    continue
+                if not suit_cards or opponent_may_ruff(suit):
+                    continue  # An opponent out of the suit would trump the high card
                 suit_cards_sorted = sort_cards_by_rank(suit_cards)
                 for card in suit_cards_sorted:
-                    higher_ranks = [r for r in Rank if r.value > card.rank.value]
-                    if all(Card(suit, r) in cardsPlayed for r in higher_ranks):
+                    if all(tracker.played_count(CARDS[code]) > 0 for code in HIGHER[card.code]):
                         return card
 
             # Otherwise play any non-trump card
             non_trumps = [c for c in cards if not is_trump(c)]
             if non_trumps:
-                return random.choice(non_trumps)
+                return rng.choice(non_trumps)
 
-            return random.choice(cards)
+            return rng.choice(cards)
 
     # NOT LEADING
     else:
         partner_index = (len(currentCards) + 1) % 4 == 3  # Assume 4 players, partner is opposite
         if partner_index:
             partner_card = currentCards[0]
-            winning_card = currentCards[0]
-            for card in currentCards[1:]:
-                if (card.suit == trump and winning_card.suit != trump) or \
-                   (card.suit == winning_card.suit and rank_value(card) > rank_value(winning_card)):
-                    winning_card = card
+            winning_card = winningCard
+            if winning_card is None:
+                # GameState.winning_card() keeps this up to date; work it out if not given
+                winning_card = currentCards[winning_position(currentCards, trump)]
             
             if partner_card == winning_card:
                 # Partner is currently winning the trick
@@ -332,7 +343,7 @@ def cardPlay(cards, currentCards, cardsPlayed, trump, haveBid):
                     return sort_cards_by_rank(point_cards)[0]
 
                 # Avoid playing Ace — keep it to cover later
-                low_cards = [c for c in cards if rank_value(c) <= Rank.QUEEN.value and c.rank != Rank.ACE]
+                low_cards = [c for c in cards if rank_value(c) <= RANK_STRENGTH[Rank.QUEEN] and c.rank != Rank.ACE]
                 if low_cards:
                     return sort_cards_by_rank(low_cards, reverse=False)[0]
 
@@ -346,7 +357,7 @@ def cardPlay(cards, currentCards, cardsPlayed, trump, haveBid):
             if same_suit:
                 winning = max((c for c in currentCards if c.suit == led_suit), key=rank_value)
                 # TODO: CHECK THAT WE ARE PLAYING THE LOWEST BEATABLE
-                beatable = [c for c in same_suit if rank_value(c) > rank_value(winning)]
+                beatable = [c for c in same_suit if beats[c.code][winning.code]]
                 if beatable:
                     # Play the lowest card that can beat the winning card
                     return sort_cards_by_rank(beatable)[0]
@@ -360,9 +371,9 @@ def cardPlay(cards, currentCards, cardsPlayed, trump, haveBid):
                 return sort_cards_by_rank(trumps_in_hand)[0]
 
             # Can't follow suit or trump, dump low card
-            low_cards = [c for c in cards if rank_value(c) <= Rank.QUEEN.value]
+            low_cards = [c for c in cards if rank_value(c) <= RANK_STRENGTH[Rank.QUEEN]]
             if low_cards:
                 return sort_cards_by_rank(low_cards)[-1]
 
         # If nothing else makes sense, play a random card
-        return random.choice(cards)
+        return rng.choice(cards)
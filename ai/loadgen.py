@@ -0,0 +1,225 @@
+from typing import Dict, List, Optional, Tuple
+from game.card import Deck
+from game.game_state import GameState
+from game.rng import game_rng
+from ai.engine import card_names, deal_hands
+import argparse
+import asyncio
+import json
+import re
+import subprocess
+import sys
+import time
+
+ENDPOINTS = ("bid", "pass", "pass_back", "play", "session")
+TRUMPS = ("SPADES", "HEARTS", "CLUBS", "DIAMONDS")
+
+
+def make_requests(count: int, seed: int) -> List[Tuple[str, dict]]:
+    """(endpoint, body) for the stateless endpoints, from `count` seeded deals."""
+    requests = []
+    game_state = GameState()
+    deck = Deck()
+    for index in range(count):
+        rng = game_rng(seed, index)
+        deal_hands(deck, game_state, rng)
+        hands = [card_names(hand.cards) for hand in game_state.player_hands]
+        trump = rng.choice(TRUMPS)
+        requests.append(("bid", {"hand": hands[0]}))
+        requests.append(("pass", {"hand": hands[1], "trump": trump}))
+        requests.append(("pass_back", {"hand": hands[2], "trump": trump}))
+        # A hint for the third card of a trick, a few tricks into the deal
+        played = [hands[seat][i] for i in range(3) for seat in range(4)]
+        requests.append(("play", {"hand": hands[0][3:], "trump": trump, "played": played,
+                                  "trick": [hands[2][3], hands[3][3]], "have_bid": True, "seed": index}))
+    return requests
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection to the service."""
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, body: Optional[dict] = None) -> Tuple[int, dict]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        content = json.dumps(body).encode() if body is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                          f"Content-Type: application/json\r\nContent-Length: {len(content)}\r\n\r\n".encode()
+                          + content)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        keep_alive = True
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "connection":
+                keep_alive = value.strip().lower() != "close"
+        payload = json.loads(await self.reader.readexactly(length)) if length else {}
+        if not keep_alive:
+            self.close()
+        return status, payload
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+async def _session_flow(connection: Connection, seed: int, record) -> None:
+    """A learner's session: deal, set trump, then a hint and a play for the first trick."""
+    start = time.perf_counter()
+    status, view = await connection.request("POST", "/sessions", {"seed": seed})
+    record("session", start, status)
+    if status != 200:
+        return
+    path = f"/sessions/{view['session']}"
+    steps = [("POST", path + "/trump", {"trump": TRUMPS[seed % 4], "bidder": 0, "bid": 250})]
+    for _ in range(4):
+        steps.append(("POST", path + "/hint", {"seed": seed}))
+        steps.append(("POST", path + "/play", None))  # Plays the card the hint gave
+    steps.append(("DELETE", path, None))
+
+    card = None
+    for method, step_path, body in steps:
+        if step_path.endswith("/play"):
+            body = {"card": card}
+        start = time.perf_counter()
+        status, payload = await connection.request(method, step_path, body)
+        record("session", start, status)
+        if status != 200:
+            return
+        card = payload.get("card")
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(-(-q * len(sorted_values) // 100)))
+    return sorted_values[rank - 1]
+
+
+async def run_load(host: str, port: int, concurrency: int, total: int, endpoints: List[str],
+                   seed: int = 0) -> Dict[str, dict]:
+    """Send `total` requests (a session flow counts as one) from `concurrency` clients at
+    once, round-robin over `endpoints`. Returns latency stats per endpoint.
+    """
+    bodies: Dict[str, List[dict]] = {}
+    for endpoint, body in make_requests(max(1, min(total, 2000) // 4 + 1), seed):
+        bodies.setdefault(endpoint, []).append(body)
+
+    latencies: Dict[str, List[float]] = {endpoint: [] for endpoint in endpoints}
+    errors: Dict[str, int] = {endpoint: 0 for endpoint in endpoints}
+    next_request = iter(range(total))
+
+    def record(endpoint: str, start: float, status: int) -> None:
+        latencies[endpoint].append(time.perf_counter() - start)
+        if status != 200:
+            errors[endpoint] += 1
+
+    async def client() -> None:
+        connection = Connection(host, port)
+        try:
+            for i in next_request:
+                endpoint = endpoints[i % len(endpoints)]
+                if endpoint == "session":
+                    await _session_flow(connection, seed + i, record)
+                    continue
+                pool = bodies[endpoint]
+                start = time.perf_counter()
+                status, _ = await connection.request("POST", "/" + endpoint, pool[i % len(pool)])
+                record(endpoint, start, status)
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    stats = {}
+    for endpoint, values in latencies.items():
+        values.sort()
+        stats[endpoint] = {"requests": len(values), "errors": errors[endpoint],
+                           "p50_ms": percentile(values, 50) * 1e3, "p99_ms": percentile(values, 99) * 1e3,
+                           "max_ms": (values[-1] if values else 0.0) * 1e3}
+    stats["all"] = {"requests": sum(len(v) for v in latencies.values()), "errors": sum(errors.values()),
+                    "seconds": elapsed}
+    stats["all"]["per_second"] = stats["all"]["requests"] / elapsed if elapsed else 0.0
+    merged = sorted(value for values in latencies.values() for value in values)
+    stats["all"]["p50_ms"] = percentile(merged, 50) * 1e3
+    stats["all"]["p99_ms"] = percentile(merged, 99) * 1e3
+    return stats
+
+
+def format_stats(stats: Dict[str, dict], concurrency: int) -> str:
+    lines = [f"{'Endpoint':<12}{'requests':>10}{'errors':>8}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"]
+    for endpoint, row in stats.items():
+        if endpoint != "all":
+            lines.append(f"{endpoint:<12}{row['requests']:>10}{row['errors']:>8}"
+                         f"{row['p50_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['max_ms']:>9.2f}")
+    row = stats["all"]
+    lines.append(f"{'all':<12}{row['requests']:>10}{row['errors']:>8}{row['p50_ms']:>9.2f}{row['p99_ms']:>9.2f}")
+    lines.append(f"\n{row['requests']} requests in {row['seconds']:.2f}s at concurrency {concurrency}: "
+                 f"{row['per_second']:.0f} requests/s")
+    return "\n".join(lines)
+
+
+def _spawn_service(port: int, workers: int) -> Tuple[subprocess.Popen, int]:
+    """Start `python -m ai.service` and wait until it says it is listening. Returns the
+    process and the port it bound, which differs from `port` when that is 0."""
+    process = subprocess.Popen([sys.executable, "-m", "ai.service", "--port", str(port), "--workers", str(workers)],
+                               stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    bound = re.search(r"http://\S+:(\d+)", line)
+    if not bound:
+        process.terminate()
+        process.wait()
+        raise RuntimeError(f"The advice service did not start: {line.strip()!r}")
+    return process, int(bound.group(1))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load test the tutor advice service and report latency.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=64, help="Clients sending requests at once")
+    parser.add_argument("--requests", type=int, default=5000, help="Total requests (a session flow counts once)")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS),
+                        help=f"Comma-separated mix to cycle through (from {', '.join(ENDPOINTS)})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spawn", type=int, metavar="WORKERS",
+                        help="Start the service on --port with this many bid workers for the run")
+    parser.add_argument("--json", action="store_true", help="Print the stats as JSON")
+    args = parser.parse_args(argv)
+
+    endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown or not endpoints:
+        parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+    process = None
+    port = args.port
+    if args.spawn is not None:
+        process, port = _spawn_service(args.port, args.spawn)
+    try:
+        stats = asyncio.run(run_load(args.host, port, args.concurrency, args.requests, endpoints, args.seed))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    print(json.dumps(stats, indent=2) if args.json else format_stats(stats, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
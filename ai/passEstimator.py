@@ -0,0 +1,144 @@
+from typing import List, Dict, Optional, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from game.card import Card, Suit, CARDS, NUM_CARDS, count_cards
+from game.hand import Hand
+from game.meld import score_melds
+from ai.helperFunctions import choose_cards_to_pass
+import math
+import os
+import random
+import time
+
+PARTNER_HAND_SIZE = 12
+
+
+class PassEstimate:
+    """Distribution of the bidder's meld after the partner's pass, for one trump suit."""
+    def __init__(self, trump: Suit):
+        self.trump = trump
+        self.histogram: Dict[int, int] = {}  # Meld points -> number of samples
+        self.samples = 0
+        self._total = 0
+        self._total_sq = 0
+
+    def add(self, melds: Sequence[int]) -> None:
+        """Add sampled meld totals."""
+        for meld in melds:
+            self.histogram[meld] = self.histogram.get(meld, 0) + 1
+            self._total += meld
+            self._total_sq += meld * meld
+        self.samples += len(melds)
+
+    def mean(self) -> float:
+        return self._total / self.samples if self.samples else 0.0
+
+    def stderr(self) -> float:
+        """Standard error of the mean, infinite until there are two samples."""
+        if self.samples < 2:
+            return math.inf
+        variance = (self._total_sq - self._total * self._total / self.samples) / (self.samples - 1)
+        return math.sqrt(max(variance, 0.0) / self.samples)
+
+    def probability_at_least(self, points: int) -> float:
+        """Share of samples with at least this much meld."""
+        if not self.samples:
+            return 0.0
+        return sum(n for meld, n in self.histogram.items() if meld >= points) / self.samples
+
+    def percentile(self, q: float) -> int:
+        """Smallest meld total with at least q (0..1) of the samples at or below it."""
+        seen = 0
+        for meld in sorted(self.histogram):
+            seen += self.histogram[meld]
+            if seen >= q * self.samples:
+                return meld
+        return 0
+
+
+def _unseen_cards(counts: List[int]) -> List[Card]:
+    """Every card copy not in the hand."""
+    return [CARDS[code] for code in range(NUM_CARDS) for _ in range(2 - counts[code])]
+
+
+def _sample_pass_melds(hand_codes: List[int], trump_names: List[str], seed: int, samples: int) -> Dict[str, List[int]]:
+    """Worker: deal `samples` partner hands and score the bidder's meld after each pass.
+
+    Takes and returns plain ints and suit names so it is cheap to send to a process pool.
+    """
+    rng = random.Random(seed)
+    trumps = [Suit[name] for name in trump_names]
+    counts = count_cards(CARDS[code] for code in hand_codes)
+    unseen = _unseen_cards(counts)
+    melds = {name: [] for name in trump_names}
+
+    for _ in range(samples):
+        partner = Hand()
+        for card in rng.sample(unseen, PARTNER_HAND_SIZE):
+            partner.add_card(card)
+
+        for trump in trumps:
+            after_pass = counts[:]
+            for card in choose_cards_to_pass(partner, trump):
+                after_pass[card.code] += 1
+            melds[trump.name].append(score_melds(after_pass, trump))
+
+    return melds
+
+
+def estimate_pass_meld(hand: Hand, trumps: Optional[Sequence[Suit]] = None, time_budget: float = 1.0,
+                       tolerance: float = 2.0, batch_size: int = 100, max_samples: int = 20000,
+                       workers: Optional[int] = None, seed: Optional[int] = None,
+                       executor: Optional[Executor] = None) -> Dict[Suit, PassEstimate]:
+    """Estimate the bidder's meld after the partner's pass for each candidate trump.
+
+    Partner hands are dealt at random from the cards not in `hand`, the partner passes
+    with choose_cards_to_pass, and the bidder's hand plus the passed cards is scored.
+    Batches of samples run on a process pool (or inline when workers is 1) until the
+    standard error of every mean is below `tolerance` meld points, `max_samples` is
+    reached, or `time_budget` seconds have passed (at least one batch always finishes).
+    """
+    trumps = list(trumps) if trumps is not None else list(Suit)
+    estimates = {trump: PassEstimate(trump) for trump in trumps}
+    hand_codes = [card.code for card in hand.cards]
+    trump_names = [trump.name for trump in trumps]
+    seeds = random.Random(seed)
+    deadline = time.monotonic() + time_budget
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+
+    def merge(melds: Dict[str, List[int]]) -> None:
+        for trump in trumps:
+            estimates[trump].add(melds[trump.name])
+
+    def done() -> bool:
+        samples = min(estimate.samples for estimate in estimates.values())
+        if samples == 0:
+            return False  # Always finish at least one batch
+        if samples >= max_samples or time.monotonic() >= deadline:
+            return True
+        return samples >= 2 * batch_size and all(estimate.stderr() <= tolerance for estimate in estimates.values())
+
+    if workers <= 1 and executor is None:
+        while not done():
+            merge(_sample_pass_melds(hand_codes, trump_names, seeds.getrandbits(64), batch_size))
+        return estimates
+
+    pool = executor if executor is not None else ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = {pool.submit(_sample_pass_melds, hand_codes, trump_names, seeds.getrandbits(64), batch_size)
+                   for _ in range(workers)}
+        while pending:
+            timeout = max(deadline - time.monotonic(), 0) if estimates[trumps[0]].samples else None
+            finished, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in finished:
+                merge(future.result())
+            if done():
+                break
+            for _ in finished:
+                pending.add(pool.submit(_sample_pass_melds, hand_codes, trump_names, seeds.getrandbits(64), batch_size))
+        for future in pending:
+            future.cancel()
+    finally:
+        if executor is None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    return estimates
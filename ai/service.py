@@ -0,0 +1,455 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from game.card import Card, Deck, Suit, SUITS
+from game.card_tracker import CardTracker
+from game.game_state import GameState
+from game.hand import Hand
+from ai.bidHelper import BidHelper
+from ai.bidTable import default_table
+from ai.engine import card_names, create_bidder, deal_hands, parse_cards
+from ai.helperFunctions import choose_cards_to_pass, choose_cards_to_pass_back, cardPlay
+import argparse
+import asyncio
+import json
+import os
+import random
+import secrets
+import signal
+import time
+
+MAX_BODY = 64 * 1024
+HAND_SIZE = 12
+PASS_SIZE = 4
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _cards(body: dict, field: str) -> List[Card]:
+    try:
+        return parse_cards(body.get(field) or [])
+    except ValueError as e:
+        raise HTTPError(400, f"{field}: {e}") from None
+
+
+def _check_copies(cards: List[Card], what: str) -> None:
+    """The deck has two copies of every card, so no set of cards can hold more."""
+    for card, copies in Counter(cards).items():
+        if copies > 2:
+            raise HTTPError(400, f"{copies} copies of {card_names([card])[0]} in {what}; the deck has 2")
+
+
+def _hand(body: dict, field: str = "hand", max_cards: int = HAND_SIZE) -> Hand:
+    cards = _cards(body, field)
+    if not cards:
+        raise HTTPError(400, f"{field} is required")
+    if len(cards) > max_cards:
+        raise HTTPError(400, f"{field} has {len(cards)} cards; a hand holds at most {max_cards}")
+    _check_copies(cards, field)
+    hand = Hand()
+    for card in cards:
+        hand.add_card(card)
+    return hand
+
+
+def _suit(body: dict, field: str = "trump") -> Suit:
+    name = str(body.get(field, "")).upper()
+    for suit in SUITS:
+        if name in (suit.name, suit.name[0]):
+            return suit
+    raise HTTPError(400, f"{field} must be one of {', '.join(suit.name for suit in SUITS)}")
+
+
+def _seat(body: dict, field: str = "seat") -> int:
+    seat = body.get(field, 0)
+    if not isinstance(seat, int) or not 0 <= seat <= 3:
+        raise HTTPError(400, f"{field} must be a seat from 0 to 3")
+    return seat
+
+
+# Advice, as plain functions of JSON-ready values so they can run in a worker process
+
+def bid_advice(hand_names: List[str]) -> dict:
+    """Partner odds, best-case meld and the computer bidder's limit for a hand."""
+    hand = Hand()
+    for card in parse_cards(hand_names):
+        hand.add_card(card)
+    helper = BidHelper(hand)
+    table = default_table()
+    suits = {}
+    for suit, needed, probability in zip(Suit, helper.closest_family_suits(), helper.family_probabilities()):
+        _, max_meld = table.recommend(helper, suit)
+        suits[suit.name] = {"probability": probability, "needed": card_names(needed), "max_meld": max_meld}
+    bidder = create_bidder(hand, random.Random(0))
+    return {"suits": suits, "suit": bidder.best_suit.name, "max_bid": bidder.max_bid}
+
+
+def pass_advice(hand: Hand, trump: Suit) -> dict:
+    hand.add_meld_def(trump)
+    return {"cards": card_names(choose_cards_to_pass(hand, trump))}
+
+
+def pass_back_advice(hand: Hand, trump: Suit) -> dict:
+    hand.add_meld_def(trump)
+    return {"cards": card_names(choose_cards_to_pass_back(hand, trump))}
+
+
+def play_advice(game_state: GameState, seat: int, seed: Optional[int] = None) -> dict:
+    """The card cardPlay picks for a seat from the legal moves in a game state."""
+    valid_cards = game_state.legal_moves(seat)
+    if not valid_cards:
+        raise HTTPError(400, "No card to play")
+    have_bid = game_state.winning_bidder is not None and game_state.winning_bidder % 2 == seat % 2
+    card = cardPlay(valid_cards, game_state.current_trick, game_state.played_cards,
+                    game_state.trump_suit, have_bid, game_state.tracker, game_state.winning_card(),
+                    random.Random(seed))
+    return {"card": card_names([card])[0], "legal": card_names(valid_cards)}
+
+
+def _play_state(body: dict) -> GameState:
+    """A one-seat GameState for a stateless play hint: hand, earlier plays and the trick so far.
+
+    played holds the cards of the finished tricks only, so it comes in whole tricks and
+    the hand has one card fewer than 12 for each of them; trick holds the 0-3 cards
+    already played to the current one.
+    """
+    hand = _hand(body)
+    played = _cards(body, "played")
+    trick = _cards(body, "trick")
+    if len(played) % 4:
+        raise HTTPError(400, f"played has {len(played)} cards; it holds whole tricks, without the current one")
+    if len(hand.cards) != HAND_SIZE - len(played) // 4:
+        raise HTTPError(400, f"hand has {len(hand.cards)} cards after {len(played) // 4} tricks; "
+                             f"it should have {HAND_SIZE - len(played) // 4}")
+    if len(trick) > 3:
+        raise HTTPError(400, f"trick has {len(trick)} cards; the seat to move sees at most 3")
+    _check_copies(hand.cards + played + trick, "hand, played and trick")
+
+    game_state = GameState()
+    game_state.player_hands = [hand]
+    game_state.trump_suit = _suit(body)
+    game_state.winning_bidder = 0 if body.get("have_bid") else 1
+    game_state.played_cards = list(played)
+    game_state.tracker = CardTracker.from_played(played)
+    for card in trick:
+        game_state.play_card(card)
+    return game_state
+
+
+class Session:
+    """One learner's deal, kept between requests."""
+    def __init__(self, session_id: str, seed: int):
+        self.id = session_id
+        self.seed = seed
+        self.game_state = GameState()
+        self.trick_leader = 0
+        self.last_used = time.monotonic()
+        deal_hands(Deck(), self.game_state, random.Random(seed))
+
+    def view(self, seat: int = 0) -> dict:
+        game_state = self.game_state
+        return {
+            "session": self.id,
+            "seed": self.seed,
+            "seat": seat,
+            "hand": card_names(game_state.player_hands[seat].cards),
+            "trump": game_state.trump_suit.name if game_state.trump_suit is not None else None,
+            "bid": game_state.current_bid,
+            "winning_bidder": game_state.winning_bidder,
+            "current_player": game_state.current_player,
+            "trick": card_names(game_state.current_trick),
+            "played": len(game_state.played_cards),
+            "trick_points": [game_state.tricks_won[0] * 10, game_state.tricks_won[1] * 10],
+        }
+
+
+class SessionStore:
+    """Sessions by id, oldest dropped first when the store is full or a session expires."""
+    def __init__(self, max_sessions: int = 10000, ttl: float = 3600.0):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.sessions: "OrderedDict[str, Session]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self.sessions:
+            oldest = next(iter(self.sessions.values()))
+            if len(self.sessions) < self.max_sessions and now - oldest.last_used < self.ttl:
+                break
+            del self.sessions[oldest.id]
+
+    def create(self, seed: Optional[int] = None) -> Session:
+        self._evict()
+        session = Session(secrets.token_hex(8), seed if seed is not None else secrets.randbits(64))
+        self.sessions[session.id] = session
+        return session
+
+    def get(self, session_id: str) -> Session:
+        session = self.sessions.get(session_id)
+        if session is None or time.monotonic() - session.last_used >= self.ttl:
+            self.sessions.pop(session_id, None)
+            raise HTTPError(404, f"No session {session_id}")
+        session.last_used = time.monotonic()
+        self.sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id: str) -> None:
+        if self.sessions.pop(session_id, None) is None:
+            raise HTTPError(404, f"No session {session_id}")
+
+
+def _warm_worker() -> None:
+    default_table()  # Map the bid table once per worker rather than on its first request
+
+
+class AdviceService:
+    """Tutor advice over HTTP/JSON, for many sessions at once.
+
+    Stateless endpoints take everything they need in the request body:
+
+        POST /bid        {"hand"}                                  -> family odds, meld and bid limit
+        POST /pass       {"hand", "trump"}                         -> 4 cards for the partner to pass
+        POST /pass_back  {"hand", "trump"}                         -> 4 cards for the bid winner to pass back
+        POST /play       {"hand", "trump", "trick", "played", "have_bid", "seed"} -> card to play
+
+    A hand holds at most 12 cards (16 for /pass_back, with the partner's pass in it)
+    and no card more than twice. For /play, "played" is the cards of the finished
+    tricks and does not include "trick", the current one; hand, played and trick
+    together may not hold any card more than twice.
+
+    Session endpoints keep a dealt game in the store:
+
+        POST   /sessions                 {"seed"}                  -> new deal, seat 0's view
+        GET    /sessions/<id>?seat=N                               -> a seat's view
+        POST   /sessions/<id>/trump      {"trump", "bidder", "bid"}
+        POST   /sessions/<id>/hint                                 -> card for the player to move
+        POST   /sessions/<id>/play       {"card"}                  -> play it for the player to move
+        DELETE /sessions/<id>
+
+    Cards are named like "10H" or "QS". Bid advice (the only request that takes more
+    than a few dozen microseconds) runs on a process pool when workers > 0, so the
+    event loop keeps answering other connections meanwhile; everything else is cheap
+    enough to answer inline.
+    """
+    def __init__(self, workers: int = 0, store: Optional[SessionStore] = None):
+        self.store = store if store is not None else SessionStore()
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) if workers > 0 else None
+        self.routes: Dict[Tuple[str, str], Callable] = {
+            ("POST", "bid"): self.bid,
+            ("POST", "pass"): self.pass_cards,
+            ("POST", "pass_back"): self.pass_back,
+            ("POST", "play"): self.play,
+            ("POST", "sessions"): self.create_session,
+        }
+        self.session_routes: Dict[Tuple[str, str], Callable] = {
+            ("GET", ""): self.session_view,
+            ("DELETE", ""): self.delete_session,
+            ("POST", "trump"): self.session_trump,
+            ("POST", "hint"): self.session_hint,
+            ("POST", "play"): self.session_play,
+        }
+
+    async def _offload(self, func: Callable, *args):
+        if self.pool is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+    async def bid(self, body: dict, query: dict) -> dict:
+        hand = _hand(body)
+        return await self._offload(bid_advice, card_names(hand.cards))
+
+    async def pass_cards(self, body: dict, query: dict) -> dict:
+        return pass_advice(_hand(body), _suit(body))
+
+    async def pass_back(self, body: dict, query: dict) -> dict:
+        # The bid winner may already hold the partner's pass
+        return pass_back_advice(_hand(body, max_cards=HAND_SIZE + PASS_SIZE), _suit(body))
+
+    async def play(self, body: dict, query: dict) -> dict:
+        return play_advice(_play_state(body), 0, body.get("seed"))
+
+    async def create_session(self, body: dict, query: dict) -> dict:
+        seed = body.get("seed")
+        if seed is not None and not isinstance(seed, int):
+            raise HTTPError(400, "seed must be an integer")
+        return self.store.create(seed).view()
+
+    async def session_view(self, session: Session, body: dict, query: dict) -> dict:
+        try:
+            seat = int(query.get("seat", 0))
+        except ValueError:
+            raise HTTPError(400, "seat must be a seat from 0 to 3") from None
+        return session.view(_seat({"seat": seat}))
+
+    async def delete_session(self, session: Session, body: dict, query: dict) -> dict:
+        self.store.delete(session.id)
+        return {"deleted": session.id}
+
+    async def session_trump(self, session: Session, body: dict, query: dict) -> dict:
+        game_state = session.game_state
+        if game_state.trump_suit is not None:
+            raise HTTPError(400, "Trump is already set")
+        trump = _suit(body)
+        bidder = _seat(body, "bidder")
+        game_state.place_bid(bidder, int(body.get("bid", 250)))
+        game_state.set_trump(trump)
+        for hand in game_state.player_hands:
+            hand.add_meld_def(trump)
+        for seat in range(4):
+            game_state.evaluate_melds(seat, detailed=False)
+        game_state.current_player = session.trick_leader = bidder
+        return session.view(bidder)
+
+    async def session_hint(self, session: Session, body: dict, query: dict) -> dict:
+        game_state = session.game_state
+        if game_state.trump_suit is None:
+            raise HTTPError(400, "Set trump first")
+        return play_advice(game_state, game_state.current_player, body.get("seed"))
+
+    async def session_play(self, session: Session, body: dict, query: dict) -> dict:
+        game_state = session.game_state
+        if game_state.trump_suit is None:
+            raise HTTPError(400, "Set trump first")
+        seat = game_state.current_player
+        name = body.get("card")
+        if not isinstance(name, str):
+            raise HTTPError(400, "card is required")
+        card = _cards({"card": [name]}, "card")[0]
+        if card not in game_state.legal_moves(seat):
+            raise HTTPError(400, f"{card_names([card])[0]} is not a legal play for seat {seat}")
+
+        game_state.player_hands[seat].remove_card(card)
+        game_state.play_card(card)
+        result = {"seat": seat, "card": card_names([card])[0]}
+        if len(game_state.current_trick) == 4:
+            winner = game_state.get_trick_winner(session.trick_leader)
+            game_state.complete_trick(winner)
+            session.trick_leader = winner
+            result["trick_winner"] = winner
+        else:
+            game_state.current_player = (seat + 1) % 4
+        result.update(session.view(seat))
+        return result
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, dict]:
+        path, _, query_string = target.partition("?")
+        query = dict(part.partition("=")[::2] for part in query_string.split("&") if part)
+        parts = [part for part in path.split("/") if part]
+        try:
+            data = json.loads(body) if body else {}
+            if not isinstance(data, dict):
+                raise HTTPError(400, "The request body must be a JSON object")
+            if len(parts) == 1:
+                handler = self.routes.get((method, parts[0]))
+                if handler is None:
+                    known = parts[0] in {route for _, route in self.routes}
+                    raise HTTPError(405 if known else 404, f"No route for {method} {path}")
+                return 200, await handler(data, query)
+            if len(parts) in (2, 3) and parts[0] == "sessions":
+                handler = self.session_routes.get((method, parts[2] if len(parts) == 3 else ""))
+                if handler is None:
+                    raise HTTPError(404, f"No route for {method} {path}")
+                return 200, await handler(self.store.get(parts[1]), data, query)
+            raise HTTPError(404, f"No route for {method} {path}")
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one keep-alive connection until the client closes it."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    status, payload = 413, {"error": f"Bodies are limited to {MAX_BODY} bytes"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, payload = await self.dispatch(method, target, body)
+                    except Exception as e:  # Keep serving other requests
+                        status, payload = 500, {"error": repr(e)}
+                    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                content = json.dumps(payload, separators=(",", ":")).encode()
+                writer.write(f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(content)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + content)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass  # Client went away or sent something that isn't HTTP
+        finally:
+            writer.close()
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, workers: int = 0,
+                ready: Optional[Callable[[int], None]] = None) -> None:
+    service = AdviceService(workers)
+    if workers > 0:
+        # Start the workers now rather than on the first bid request
+        await asyncio.gather(*(asyncio.get_running_loop().run_in_executor(service.pool, _warm_worker)
+                               for _ in range(workers)))
+    server = await asyncio.start_server(service.handle, host, port, backlog=1024)
+    bound = server.sockets[0].getsockname()[1]
+    print(f"Pinochle tutor advice service on http://{host}:{bound} ({workers} bid workers)", flush=True)
+    if ready is not None:
+        ready(bound)
+    # Stop cleanly on SIGTERM too (loadgen --spawn, kill), so the bid workers are shut
+    # down with the service rather than left running
+    stop = asyncio.Event()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    except NotImplementedError:
+        pass  # No signal handlers in this event loop (Windows)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        service.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve tutor advice over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (0 picks a free one)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes for bid advice (0 answers it in the event loop)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
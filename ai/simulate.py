@@ -0,0 +1,107 @@
+from typing import Iterator, List, Optional, TextIO, Tuple
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from game.event_log import EventLog, MAGIC
+from game.game_state import GameState
+from game.rng import game_rng
+from ai.engine import play_deal
+import io
+import json
+import os
+import sys
+
+# Games each pool task plays; big enough to hide the cost of a task, small enough to stream
+CHUNK_SIZE = 50
+
+
+def play_games(run_seed: int, start: int, stop: int, record: bool = False,
+               track_locations: bool = False) -> Tuple[List[str], bytes]:
+    """Worker: play games start..stop-1 of a run and return one JSON line for each,
+    plus the games' event log records when `record` is set. track_locations is passed
+    on to play_deal.
+
+    Each game draws from its own game_rng(run_seed, index) stream, so a game gives the
+    same line whichever worker plays it.
+    """
+    lines = []
+    game_state = GameState()
+    buffer = io.BytesIO()
+    if record:
+        game_state.event_log = EventLog(buffer)
+    for index in range(start, stop):
+        line = {"seed": run_seed, "game": index}
+        line.update(play_deal(game_state=game_state, rng=game_rng(run_seed, index),
+                               track_locations=track_locations).to_dict())
+        lines.append(json.dumps(line, separators=(",", ":")))
+    return lines, buffer.getvalue()[len(MAGIC):]
+
+
+def simulate(games: int, workers: int = 1, seed: int = 0, chunk_size: int = CHUNK_SIZE,
+             log: Optional[EventLog] = None, track_locations: bool = False) -> Iterator[str]:
+    """Yield one JSON line per deal as soon as its chunk finishes, and append the
+    games' events to `log` if given.
+
+    With more than one worker, chunks run on a process pool and arrive in the order
+    they finish; every line carries its game index. Only a few chunks per worker are
+    in flight at a time, so memory does not grow with the number of games.
+    """
+    chunks = ((start, min(start + chunk_size, games)) for start in range(0, games, chunk_size))
+    record = log is not None
+
+    def finish(result: Tuple[List[str], bytes]) -> List[str]:
+        lines, records = result
+        if record:
+            log.write_records(records)
+        return lines
+
+    if workers <= 1:
+        for start, stop in chunks:
+            yield from finish(play_games(seed, start, stop, record, track_locations))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for start, stop in chunks:
+            pending.add(pool.submit(play_games, seed, start, stop, record, track_locations))
+            if len(pending) >= 2 * workers:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    yield from finish(future.result())
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield from finish(future.result())
+
+
+def run(games: int, workers: int, seed: int, out: Optional[str] = None, log_path: Optional[str] = None,
+        track_locations: bool = False) -> None:
+    """Write the simulation to a file (or stdout), flushing after every chunk."""
+    stream: TextIO = open(out, "w") if out else sys.stdout
+    log = EventLog(log_path) if log_path else None
+    try:
+        written = 0
+        for line in simulate(games, workers, seed, log=log, track_locations=track_locations):
+            stream.write(line + "\n")
+            written += 1
+            if written % CHUNK_SIZE == 0:
+                stream.flush()
+        stream.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); stop quietly
+        sys.stdout = open(os.devnull, "w")
+    finally:
+        if out:
+            stream.close()
+        if log is not None:
+            log.close()
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--games", type=int, default=100, help="Number of deals to play")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: one per CPU, 1 plays in this process)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Run seed; game i is played with game_rng(seed, i)")
+    parser.add_argument("--out", help="Write the JSON lines to this file instead of stdout")
+    parser.add_argument("--log", help="Also append every game's events to this binary event log")
+    parser.add_argument("--track-locations", action="store_true",
+                        help="Let the computer players infer where the hidden cards are (slower)")
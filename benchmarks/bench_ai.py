@@ -0,0 +1,102 @@
+import pytest
+from benchmarks.corpus import (make_deals, pass_back_hands, played_deals, replay, seeded_deal, trick_play_start,
+                               double_dummy_losses, CORPUS_SEED)
+from game.card import Suit
+from ai.bidHelper import BidHelper
+from ai.doubleDummy import DEFAULT_MAX_NODES, clear_tables, kernel_available, solve_position
+from ai.helperFunctions import choose_cards_to_pass, choose_cards_to_pass_back, cardPlay
+import random
+
+
+@pytest.fixture(scope="module")
+def deals():
+    return make_deals()
+
+
+@pytest.fixture(scope="module")
+def helpers(deals):
+    """A BidHelper for every dealt hand, with the deal's trump and the cards each family suit is missing."""
+    helpers = []
+    for deal in deals:
+        for seat in range(4):
+            hand = deal.hand(seat)
+            helpers.append((BidHelper(hand), deal.trump, hand.closest_family_suits()))
+    return helpers
+
+
+def bench_hypergeometric_probability(bench, helpers):
+    inputs = [(helper, needed, len(needed)) for helper, _, missing in helpers for needed in missing]
+    bench("BidHelper.calculate_hypergeometric_probability", BidHelper.calculate_hypergeometric_probability, inputs)
+
+
+def bench_create_bid_hand(bench, helpers):
+    inputs = [(helper, trump, missing[list(Suit).index(trump)]) for helper, trump, missing in helpers]
+    bench("BidHelper.create_bid_hand", BidHelper.create_bid_hand, inputs)
+
+
+def bench_choose_cards_to_pass(bench, deals):
+    inputs = [(deal.hand(seat), deal.trump) for deal in deals for seat in range(4)]
+    bench("choose_cards_to_pass", choose_cards_to_pass, inputs)
+
+
+def bench_choose_cards_to_pass_back(bench, deals):
+    bench("choose_cards_to_pass_back", choose_cards_to_pass_back, pass_back_hands(deals))
+
+
+def bench_card_play(bench):
+    plays = [play for result in played_deals() for play in replay(result)[0]]
+    rng = random.Random(CORPUS_SEED)  # For cardPlay's random fallbacks
+    bench("cardPlay", cardPlay, [play.args() + (rng,) for play in plays])
+
+
+def bench_play_deal(bench):
+    bench("play_deal", seeded_deal, [(CORPUS_SEED, i) for i in range(10)], min_time=0.2)
+
+
+def bench_play_deal_tracked(bench):
+    bench("play_deal[track_locations]", seeded_deal, [(CORPUS_SEED, i, True) for i in range(10)], min_time=0.2)
+
+
+@pytest.fixture
+def kernel(bench):
+    if not kernel_available():
+        message = "double-dummy benchmarks skipped: build the kernel with python -m ai.doubleDummy --build"
+        bench.note(message)
+        pytest.skip(message)
+
+
+def _solve_from_scratch(hands, trump, leader):
+    clear_tables()
+    return solve_position(hands, trump, leader)
+
+
+def bench_solve_full_deal(bench, kernel):
+    inputs = []
+    for result in played_deals():
+        hands, leader = trick_play_start(result)
+        inputs.append((hands, result.trump, leader))
+    solved = []
+
+    def solve(hands, trump, leader):
+        solved.append(_solve_from_scratch(hands, trump, leader))
+
+    # Up to a second per deal, so one run is enough
+    bench("doubleDummy.solve_position[12 tricks]", solve, inputs, repeat=1)
+    exact = sum(result.exact for result in solved[-len(inputs):])
+    bench.note(f"doubleDummy.solve_position solved {exact} of {len(inputs)} full deals exactly "
+               f"within {DEFAULT_MAX_NODES:,} nodes; the rest got bounds")
+
+
+def bench_card_play_against_double_dummy(bench, kernel):
+    results = played_deals()
+    losses = {}
+
+    def analyse(index):
+        clear_tables()
+        losses[index] = double_dummy_losses(results[index])
+
+    bench("double_dummy_losses[cardPlay deals]", analyse, [(i,) for i in range(len(results))], repeat=1)
+    bidders = sum(losses[i][results[i].winning_bidder % 2] for i in losses)
+    defenders = sum(losses[i][1 - results[i].winning_bidder % 2] for i in losses)
+    bench.note(f"cardPlay against double-dummy play over {len(losses)} deals: the bidding side gave away "
+               f"{bidders / len(losses):.1f} counters a deal, the defenders {defenders / len(losses):.1f}")
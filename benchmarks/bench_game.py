@@ -0,0 +1,57 @@
+import pytest
+from benchmarks.corpus import make_deals, played_deals, replay
+from game.card import Suit
+from game.hand import Hand
+from game.bulk_deal import deal_counts
+from game.batch_play import BatchTricks, greedy_policy
+import numpy as np
+
+
+@pytest.fixture(scope="module")
+def deals():
+    return make_deals()
+
+
+@pytest.fixture(scope="module")
+def hands(deals):
+    """Every dealt hand with the deal's trump already set."""
+    hands = []
+    for deal in deals:
+        for seat in range(4):
+            hand = deal.hand(seat)
+            hand.add_meld_def(deal.trump)
+            hands.append(hand)
+    return hands
+
+
+def bench_add_meld_def(bench, hands):
+    bench("Hand.add_meld_def", Hand.add_meld_def, [(hand, suit) for hand in hands for suit in Suit])
+
+
+def bench_evaluate_melds(bench, hands):
+    bench("Hand.evaluate_melds", Hand.evaluate_melds, [(hand,) for hand in hands])
+
+
+def bench_evaluate_melds_score_only(bench, hands):
+    bench("Hand.evaluate_melds[score only]", Hand.evaluate_melds, [(hand, False) for hand in hands])
+
+
+def bench_get_trick_winner(bench):
+    tricks = [trick for result in played_deals() for trick in replay(result)[1]]
+    bench("GameState.get_trick_winner", lambda game_state, leader: game_state.get_trick_winner(leader), tricks)
+
+
+def bench_deal_counts(bench):
+    # 10,000 deals per call; divide by that for the time per deal
+    bench("deal_counts[10000 deals]", deal_counts, [(10_000, seed) for seed in range(4)], min_time=0.2)
+
+
+def bench_batch_tricks(bench):
+    # 1,000 games per call, all twelve tricks with greedy_policy on every seat
+    games = []
+    for seed in range(4):
+        hands = deal_counts(1_000, seed)
+        trump = np.arange(1_000) % 4
+        games.append((hands, trump, trump))
+    bench("BatchTricks.play_all[1000 games]",
+          lambda hands, trump, leader: BatchTricks(hands, trump, leader).play_all(greedy_policy), games, min_time=0.2)
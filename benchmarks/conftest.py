@@ -0,0 +1,151 @@
+import json
+import os
+import platform
+import time
+import pytest
+from typing import Optional
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Results of this run, name -> {"us": microseconds per call, "calls": calls per repeat}
+_results = {}
+# Other findings benchmarks report, printed under the timings
+_notes = []
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--baseline", default=DEFAULT_BASELINE,
+                    help="JSON file with the baseline timings (default: benchmarks/baseline.json)")
+    group.addoption("--save-baseline", action="store_true",
+                    help="Write this run's timings to the baseline file instead of comparing")
+    group.addoption("--tolerance", type=float, default=0.25,
+                    help="How much slower than the baseline (0.25 = 25%%) counts as a regression")
+    group.addoption("--fail-on-regression", action="store_true",
+                    help="Exit with an error if any benchmark regressed")
+    group.addoption("--repeat", type=int, default=5,
+                    help="Timing runs per benchmark; the fastest is kept")
+
+
+class Bench:
+    """Times a function over a list of inputs and records the time per call."""
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+
+    def __call__(self, name: str, func, inputs, min_time: float = 0.05, repeat: Optional[int] = None) -> float:
+        """Call func(*args) for every args tuple in inputs, looping over the inputs until
+        a run takes at least min_time seconds. Returns microseconds per call (fastest run).
+        repeat overrides --repeat for benchmarks too slow to run several times.
+        """
+        inputs = list(inputs)
+        loops = 1
+        while True:
+            elapsed = self._run(func, inputs, loops)
+            if elapsed >= min_time:
+                break
+            loops *= 2
+
+        best = elapsed
+        for _ in range((repeat or self.repeat) - 1):
+            best = min(best, self._run(func, inputs, loops))
+
+        calls = loops * len(inputs)
+        us = best / calls * 1e6
+        _results[name] = {"us": round(us, 3), "calls": calls}
+        return us
+
+    @staticmethod
+    def note(text: str) -> None:
+        """Report a line besides the timings, e.g. how good a player's choices were.
+        A line several benchmarks report is printed once."""
+        if text not in _notes:
+            _notes.append(text)
+
+    @staticmethod
+    def _run(func, inputs, loops: int) -> float:
+        start = time.perf_counter()
+        for _ in range(loops):
+            for args in inputs:
+                func(*args)
+        return time.perf_counter() - start
+
+
+@pytest.fixture
+def bench(request):
+    return Bench(request.config.getoption("--repeat"))
+
+
+def _machine() -> dict:
+    return {"python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine()}
+
+
+def _compare(baseline: dict, tolerance: float):
+    """Split this run's results into regressions, improvements and the rest."""
+    rows = []
+    for name in sorted(_results):
+        now = _results[name]["us"]
+        before = baseline.get(name, {}).get("us")
+        if before is None:
+            rows.append((name, None, now, None, "new"))
+            continue
+        change = now / before - 1
+        if change > tolerance:
+            status = "REGRESSION"
+        elif change < -tolerance:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, before, now, change, status))
+    return rows
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not _results:
+        return
+    path = config.getoption("--baseline")
+    write = terminalreporter.write_line
+    terminalreporter.section("benchmarks")
+
+    if config.getoption("--save-baseline"):
+        with open(path, "w") as f:
+            json.dump({"machine": _machine(), "results": _results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        write(f"Saved {len(_results)} timings to {path}")
+        return
+
+    if not os.path.exists(path):
+        write(f"No baseline at {path}; run with --save-baseline to create one")
+        baseline = {}
+    else:
+        with open(path) as f:
+            saved = json.load(f)
+        baseline = saved.get("results", {})
+        if saved.get("machine") != _machine():
+            write(f"Baseline was recorded on {saved.get('machine')}; timings may not be comparable")
+
+    rows = _compare(baseline, config.getoption("--tolerance"))
+    write(f"{'benchmark':<48} {'baseline us':>12} {'now us':>12} {'change':>8}")
+    for name, before, now, change, status in rows:
+        before_text = f"{before:12.2f}" if before is not None else f"{'-':>12}"
+        change_text = f"{change:+8.1%}" if change is not None else f"{'':>8}"
+        write(f"{name:<48} {before_text} {now:12.2f} {change_text}  {status}")
+
+    regressions = [row[0] for row in rows if row[4] == "REGRESSION"]
+    if regressions:
+        write(f"{len(regressions)} benchmark(s) slower than the baseline: {', '.join(regressions)}", red=True)
+    for text in _notes:
+        write(text)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    # Runs before the terminal summary, so compare here too to set the exit status
+    config = session.config
+    if not _results or config.getoption("--save-baseline") or not config.getoption("--fail-on-regression"):
+        return
+    path = config.getoption("--baseline")
+    if not os.path.exists(path):
+        return
+    with open(path) as f:
+        baseline = json.load(f).get("results", {})
+    if any(row[4] == "REGRESSION" for row in _compare(baseline, config.getoption("--tolerance"))):
+        session.exitstatus = 1
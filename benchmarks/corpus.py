@@ -0,0 +1,160 @@
+from typing import List, Optional, Tuple
+from game.card import Card, Deck, Suit
+from game.hand import Hand
+from game.game_state import GameState
+from game.card_tracker import CardTracker
+from game.rng import game_rng
+from game.strength import IS_COUNTER
+from ai.doubleDummy import solve_position
+from ai.engine import play_deal
+from ai.helperFunctions import choose_cards_to_pass
+import random
+
+# Every benchmark runs on the same deals so runs can be compared with the baseline
+CORPUS_SEED = 20240501
+CORPUS_DEALS = 40
+
+
+class Deal:
+    """One seeded deal: the four hands as dealt and a trump suit to evaluate them with."""
+    def __init__(self, hands: List[List[Card]], trump: Suit):
+        self.hands = hands
+        self.trump = trump
+
+    def hand(self, seat: int) -> Hand:
+        """A fresh Hand for a seat."""
+        hand = Hand()
+        for card in self.hands[seat]:
+            hand.add_card(card)
+        return hand
+
+
+class PlayState:
+    """The arguments cardPlay was called with at one turn of a headless deal."""
+    def __init__(self, cards: List[Card], current: List[Card], played: List[Card], trump: Suit,
+                 have_bid: bool, tracker: CardTracker, winning: Optional[Card]):
+        self.cards = cards
+        self.current = current
+        self.played = played
+        self.trump = trump
+        self.have_bid = have_bid
+        self.tracker = tracker
+        self.winning = winning
+
+    def args(self) -> tuple:
+        return (self.cards, self.current, self.played, self.trump, self.have_bid, self.tracker, self.winning)
+
+
+def make_deals(seed: int = CORPUS_SEED, count: int = CORPUS_DEALS) -> List[Deal]:
+    """Shuffle and deal `count` hands with their own RNG, cycling the trump suit."""
+    rng = random.Random(seed)
+    suits = list(Suit)
+    deals = []
+    for i in range(count):
+        cards = list(Deck().cards)
+        rng.shuffle(cards)
+        deals.append(Deal([cards[seat * 12:(seat + 1) * 12] for seat in range(4)], suits[i % len(suits)]))
+    return deals
+
+
+def pass_back_hands(deals: List[Deal]) -> List[Tuple[Hand, Suit]]:
+    """Seat 0's 16-card hand after seat 2 passes to it, as the bid winner would hold it."""
+    hands = []
+    for deal in deals:
+        hand = deal.hand(0)
+        for card in choose_cards_to_pass(deal.hand(2), deal.trump):
+            hand.add_card(card)
+        hands.append((hand, deal.trump))
+    return hands
+
+
+def seeded_deal(seed: int, index: int, track_locations: bool = False):
+    """Play game `index` of a run seeded with `seed`."""
+    return play_deal(rng=game_rng(seed, index), track_locations=track_locations)
+
+
+def played_deals(seed: int = CORPUS_SEED, count: int = CORPUS_DEALS // 4):
+    """Headless deals, each with its own seeded RNG stream."""
+    return [seeded_deal(seed, i) for i in range(count)]
+
+
+def replay(result) -> Tuple[List[PlayState], List[Tuple[GameState, int]]]:
+    """Replay a DealResult's tricks, keeping every cardPlay call and every finished trick."""
+    game_state = GameState()
+    game_state.set_trump(result.trump)
+    for cards in result.hands:
+        hand = Hand()
+        for card in cards:
+            hand.add_card(card)
+        game_state.player_hands.append(hand)
+
+    winner = result.winning_bidder
+    partner = (winner + 2) % 4
+    hands = game_state.player_hands
+    for card in result.passed:
+        hands[partner].remove_card(card)
+        hands[winner].add_card(card)
+    for card in result.passed_back:
+        hands[winner].remove_card(card)
+        hands[partner].add_card(card)
+
+    plays = []
+    tricks = []
+    for leader, cards, _ in result.tricks:
+        game_state.current_trick = []
+        for i, card in enumerate(cards):
+            seat = (leader + i) % 4
+            game_state.current_player = seat
+            plays.append(PlayState(game_state.legal_moves(seat), list(game_state.current_trick),
+                                   list(game_state.played_cards), result.trump, winner % 2 == seat % 2,
+                                   CardTracker.from_played(game_state.played_cards), game_state.winning_card()))
+            hands[seat].remove_card(card)
+            game_state.play_card(card)
+
+        # A copy of the state with the full trick on the table, for get_trick_winner
+        finished = GameState()
+        finished.set_trump(result.trump)
+        for card in cards:
+            finished.play_card(card)
+        tricks.append((finished, leader))
+        game_state.complete_trick(game_state.get_trick_winner(leader))
+
+    return plays, tricks
+
+
+def trick_play_start(result) -> Tuple[List[List[Card]], int]:
+    """The four hands of a DealResult as trick play starts, after the passes, and the first leader."""
+    hands = [[] for _ in range(4)]
+    for leader, cards, _ in result.tricks:
+        for i, card in enumerate(cards):
+            hands[(leader + i) % 4].append(card)
+    return hands, result.tricks[0][0]
+
+
+def double_dummy_losses(result) -> List[int]:
+    """Counters each team's cardPlay decisions gave away against best play on both sides.
+
+    The deal is solved exactly, with no node budget, before every card. What a card cost its team is how far that
+    team's best total from here drops between its play and the next decision.
+    """
+    hands, _ = trick_play_start(result)
+    remaining = sum(IS_COUNTER[card.code] for hand in hands for card in hand)
+    taken = [0, 0]
+    lost = [0, 0]
+    previous = None  # (team that played the last card, team 0's best total before it)
+    for leader, cards, winner in result.tricks:
+        for i, card in enumerate(cards):
+            seat = (leader + i) % 4
+            solved = solve_position(hands, result.trump, leader, cards[:i], max_nodes=None)
+            best = taken[0] + (solved.counters if seat % 2 == 0 else remaining - solved.counters)
+            if previous is not None:
+                team, before = previous
+                lost[team] += before - best if team == 0 else best - before
+            previous = (seat % 2, best)
+            hands[seat].remove(card)
+        won = sum(IS_COUNTER[card.code] for card in cards)
+        taken[winner % 2] += won
+        remaining -= won
+    team, before = previous
+    lost[team] += before - taken[0] if team == 0 else taken[0] - before
+    return lost
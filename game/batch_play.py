@@ -0,0 +1,168 @@
+from typing import Callable, Optional, Union
+from .card import NUM_CARDS
+from .bulk_deal import SEATS, HAND_SIZE, _generator
+from . import strength
+import numpy as np
+
+SUIT_COUNT = 4
+SUIT_SIZE = NUM_CARDS // SUIT_COUNT
+
+# Per card code: its suit index and how strong it is inside its suit (Ace 5 .. Nine 0,
+# as in game/strength.py)
+CARD_SUIT = np.arange(NUM_CARDS) // SUIT_SIZE
+CARD_STRENGTH = np.array(strength.CARD_STRENGTH, dtype=np.int8)
+# Counters (A, 10, K) score a point each for the team taking the trick
+CARD_COUNTER = np.array(strength.IS_COUNTER, dtype=np.int16)
+
+# Trick-taking strength of a card, given whether it is trump and whether it follows the led
+# suit. Cards that do neither can't win and keep strength 0.
+_TRUMP_BONUS = 2 * SUIT_SIZE
+_LED_BONUS = SUIT_SIZE
+
+NO_CARD = -1
+
+# For greedy_policy: the weaker a card is in the trick, the cheaper it is to give up
+_CHEAPNESS = ((4 * SUIT_SIZE - np.arange(4 * SUIT_SIZE)) * SUIT_SIZE).astype(np.int16)
+
+# A policy picks one legal card code for the seat to move in every game:
+# policy(batch, seats, legal) -> (n,) card codes, where legal is an (n, 24) bool mask
+Policy = Callable[["BatchTricks", np.ndarray, np.ndarray], np.ndarray]
+
+
+class BatchTricks:
+    """Trick play for n games at once, in lockstep.
+
+    Every game is held as arrays: hands (n, 4, 24) card counts, trump (n,) suit
+    index and leader (n,) seat. Each call to play_trick() has every game play its
+    next trick: four rounds of legal-move masks and a vectorized policy, then the
+    winner and counters of all n tricks at once. The rules are those of GameState:
+    follow the led suit if possible, otherwise trump if possible; the highest trump
+    or else the highest card of the led suit wins, and of two equal cards the one
+    played first wins.
+    """
+    def __init__(self, hands: np.ndarray, trump: np.ndarray, leader: np.ndarray):
+        self.hands = np.array(hands, dtype=np.int8)
+        self.n = self.hands.shape[0]
+        self.rows = np.arange(self.n)
+        self.trump = np.asarray(trump, dtype=np.int64).reshape(self.n)
+        self.leader = np.asarray(leader, dtype=np.int64).reshape(self.n).copy()
+        self.played = np.zeros((self.n, NUM_CARDS), dtype=np.int8)  # Copies of each card played so far
+        self.counters = np.zeros((self.n, 2), dtype=np.int16)  # Counters taken per team
+        self.trick = np.full((self.n, SEATS), NO_CARD, dtype=np.int64)  # Cards in play order
+        self.position = 0  # Cards played to the current tricks
+        self.tricks_played = 0
+        self._is_trump = CARD_SUIT[None, :] == self.trump[:, None]
+        self._lead_strength = (CARD_STRENGTH[None, :] + self._is_trump * _TRUMP_BONUS).astype(np.int8)
+        # Kept up to date as cards are played: strengths against the led suits, and the
+        # position and strength of the card winning each trick so far
+        self._strength = self._lead_strength
+        self._winning = np.zeros(self.n, dtype=np.int64)
+        self._best = np.zeros(self.n, dtype=np.int8)
+
+    @property
+    def done(self) -> bool:
+        return self.tricks_played == HAND_SIZE
+
+    def seats_to_move(self) -> np.ndarray:
+        return (self.leader + self.position) % SEATS
+
+    def strengths(self) -> np.ndarray:
+        """(n, 24) trick-taking strength of each card code against the current tricks' led suit."""
+        return self._strength
+
+    def winning_positions(self) -> np.ndarray:
+        """Position in the trick of the card winning each game's trick so far."""
+        return self._winning
+
+    def winning_strengths(self) -> np.ndarray:
+        """Strength of the card winning each game's trick so far."""
+        return self._best
+
+    def legal(self, seats: Optional[np.ndarray] = None) -> np.ndarray:
+        """(n, 24) mask of the cards each seat may play to the current tricks."""
+        seats = self.seats_to_move() if seats is None else seats
+        hand = self.hands[self.rows, seats] > 0
+        if self.position == 0:
+            return hand
+        suit_held = hand.reshape(self.n, SUIT_COUNT, SUIT_SIZE).any(axis=2)
+        led = CARD_SUIT[self.trick[:, 0]]
+        # Follow the led suit, else trump, else anything
+        must = np.where(suit_held[self.rows, led], led,
+                        np.where(suit_held[self.rows, self.trump], self.trump, -1))
+        return hand & ((must[:, None] == -1) | (CARD_SUIT[None, :] == must[:, None]))
+
+    def play_cards(self, cards: np.ndarray) -> None:
+        """Play one card in every game, for the seat to move."""
+        seats = self.seats_to_move()
+        cards = np.asarray(cards, dtype=np.int64)
+        if (self.hands[self.rows, seats, cards] <= 0).any():
+            raise ValueError("A policy played a card the seat doesn't hold")
+        self.hands[self.rows, seats, cards] -= 1
+        self.played[self.rows, cards] += 1
+        self.trick[:, self.position] = cards
+
+        if self.position == 0:
+            follows = CARD_SUIT[None, :] == CARD_SUIT[cards][:, None]
+            self._strength = np.where(self._is_trump | follows, self._lead_strength + follows * _LED_BONUS,
+                                      0).astype(np.int8)
+            self._winning = np.zeros(self.n, dtype=np.int64)
+            self._best = self._strength[self.rows, cards]
+        else:
+            strength = self._strength[self.rows, cards]
+            better = strength > self._best  # Strictly: of two equal cards the first one wins
+            self._winning = np.where(better, self.position, self._winning)
+            self._best = np.where(better, strength, self._best)
+        self.position += 1
+
+    def finish_trick(self) -> np.ndarray:
+        """Score the complete tricks and make their winners lead. Returns the winning seats."""
+        winners = (self.leader + self.winning_positions()) % SEATS
+        points = CARD_COUNTER[self.trick].sum(axis=1)
+        np.add.at(self.counters, (self.rows, winners % 2), points)
+        self.leader = winners
+        self.trick.fill(NO_CARD)
+        self.position = 0
+        self._strength = self._lead_strength
+        self.tricks_played += 1
+        return winners
+
+    def play_trick(self, policy: Policy) -> np.ndarray:
+        """Play one trick in every game with `policy` on all seats. Returns the winning seats."""
+        for _ in range(SEATS):
+            seats = self.seats_to_move()
+            self.play_cards(policy(self, seats, self.legal(seats)))
+        return self.finish_trick()
+
+    def play_all(self, policy: Policy) -> np.ndarray:
+        """Play out every remaining trick. Returns the (n, 2) counters taken per team."""
+        while not self.done:
+            self.play_trick(policy)
+        return self.counters
+
+
+def random_policy(rng: Union[None, int, np.random.Generator] = None) -> Policy:
+    """Play a uniformly random legal card (each distinct card is equally likely)."""
+    generator = _generator(rng)
+
+    def policy(batch: BatchTricks, seats: np.ndarray, legal: np.ndarray) -> np.ndarray:
+        keys = generator.random(legal.shape)
+        return np.where(legal, keys, -1.0).argmax(axis=1)
+    return policy
+
+
+def greedy_policy(batch: BatchTricks, seats: np.ndarray, legal: np.ndarray) -> np.ndarray:
+    """Lead the strongest card; otherwise take the trick as cheaply as possible, and
+    throw the weakest card when it can't be taken or the partner is already winning it.
+    """
+    strength = batch.strengths()
+    if batch.position == 0:
+        return np.where(legal, strength, np.int8(-1)).argmax(axis=1)
+
+    partner_winning = (batch.winning_positions() - batch.position) % 2 == 0  # Seats two apart are partners
+    beats = legal & (strength > batch.winning_strengths()[:, None]) & ~partner_winning[:, None]
+
+    # Between cards that can't win, the lower rank goes first
+    cheapness = _CHEAPNESS[strength] - CARD_STRENGTH[None, :]
+    cheapest_winner = np.where(beats, cheapness, np.int16(-1)).argmax(axis=1)
+    weakest = np.where(legal, cheapness, np.int16(-1)).argmax(axis=1)
+    return np.where(beats.any(axis=1), cheapest_winner, weakest)
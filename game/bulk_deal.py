@@ -0,0 +1,59 @@
+from typing import Iterator, Optional, Union
+from .card import NUM_CARDS
+import numpy as np
+
+DECK_SIZE = 2 * NUM_CARDS
+SEATS = 4
+HAND_SIZE = DECK_SIZE // SEATS
+
+# The 48-card deck as card codes, two copies of each
+DECK_CODES = np.repeat(np.arange(NUM_CARDS, dtype=np.uint8), 2)
+
+
+def _generator(rng: Union[None, int, np.random.Generator]) -> np.random.Generator:
+    """A NumPy Generator from a seed, an existing Generator, or fresh entropy."""
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+
+def deal_permutations(n: int, rng: Union[None, int, np.random.Generator] = None) -> np.ndarray:
+    """Shuffle n decks at once. Returns card codes with shape (n, 48).
+
+    Seat s is dealt positions 12*s to 12*s + 11 of each row.
+    """
+    decks = np.broadcast_to(DECK_CODES, (n, DECK_SIZE))
+    return _generator(rng).permuted(decks, axis=1)
+
+
+def counts_from_permutations(decks: np.ndarray) -> np.ndarray:
+    """Per-seat card counts for shuffled decks: (n, 48) codes -> (n, 4, 24) counts.
+
+    The counts are the same 24-slot vectors count_cards() builds for a Hand, so each
+    [deal, seat] row can go straight into score_melds or score_melds_batch.
+    """
+    n = decks.shape[0]
+    # Flat slot of every dealt card in the (n, 4, 24) output, counted with one bincount
+    seats = np.repeat(np.arange(SEATS), HAND_SIZE)
+    slots = (np.arange(n)[:, None] * SEATS + seats) * NUM_CARDS + decks
+    counts = np.bincount(slots.ravel(), minlength=n * SEATS * NUM_CARDS)
+    return counts.astype(np.uint8).reshape(n, SEATS, NUM_CARDS)
+
+
+def deal_counts(n: int, rng: Union[None, int, np.random.Generator] = None) -> np.ndarray:
+    """Deal n hands of Pinochle at once without creating any Card or Hand objects.
+
+    Returns an (n, 4, 24) array of how many copies of each card code every seat holds.
+    rng is a seed or a numpy Generator; the same seed always gives the same deals.
+    """
+    return counts_from_permutations(deal_permutations(n, rng))
+
+
+def iter_deal_counts(total: int, chunk_size: int = 100_000,
+                     rng: Union[None, int, np.random.Generator] = None) -> Iterator[np.ndarray]:
+    """Deal `total` hands in chunks of at most chunk_size, to keep memory bounded."""
+    generator = _generator(rng)
+    while total > 0:
+        n = min(chunk_size, total)
+        yield deal_counts(n, generator)
+        total -= n
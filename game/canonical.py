@@ -0,0 +1,77 @@
+from typing import List, Optional, Sequence, Tuple
+from .card import Card, Suit, CARDS, NUM_CARDS, SUITS, SUIT_INDEX
+
+# Spades and Diamonds hold the Pinochle (Queen of Spades and Jack of Diamonds), so
+# they can't be swapped with another suit without changing the meld
+PINOCHLE_SUITS = (Suit.SPADES, Suit.DIAMONDS)
+
+# A suit permutation as a tuple: entry i is the suit index suit i is moved to
+IDENTITY = (0, 1, 2, 3)
+
+
+def free_suits(trump: Optional[Suit], fixed: Sequence[Suit] = PINOCHLE_SUITS) -> List[int]:
+    """Indexes of the suits that may be swapped with each other: all but trump and `fixed`."""
+    return [i for i, suit in enumerate(SUITS) if suit != trump and suit not in fixed]
+
+
+def canonicalize(counts: Sequence[int], trump: Optional[Suit] = None,
+                 fixed: Sequence[Suit] = PINOCHLE_SUITS) -> Tuple[List[int], Tuple[int, ...]]:
+    """Map a 24-slot count vector to the canonical member of its suit-symmetry class.
+
+    Hands that only differ by swapping interchangeable suits (every suit but trump
+    and `fixed`) score the same meld, so they get the same canonical form: the free
+    suits are reordered so their six-card blocks are in descending order. Returns
+    the canonical counts and the permutation that produced them, which
+    permute_counts/permute_card with invert() translate back.
+
+    Pass fixed=() when the Pinochle doesn't matter (e.g. trick play) to let every
+    non-trump suit move.
+    """
+    counts = list(counts)
+    free = free_suits(trump, fixed)
+    if len(free) < 2:
+        return counts, IDENTITY
+
+    # Stable sort, so equal blocks keep their order and the permutation is well defined
+    order = sorted(free, key=lambda i: counts[i * 6:i * 6 + 6], reverse=True)
+    permutation = list(IDENTITY)
+    for target, source in zip(free, order):
+        permutation[source] = target
+    permutation = tuple(permutation)
+    return permute_counts(counts, permutation), permutation
+
+
+def canonical_key(counts: Sequence[int], trump: Optional[Suit] = None,
+                  fixed: Sequence[Suit] = PINOCHLE_SUITS) -> tuple:
+    """Hashable key shared by every hand in the same suit-symmetry class, for caches."""
+    canonical, _ = canonicalize(counts, trump, fixed)
+    return (trump, tuple(canonical))
+
+
+def invert(permutation: Tuple[int, ...]) -> Tuple[int, ...]:
+    """The permutation that undoes `permutation`."""
+    inverse = [0] * len(permutation)
+    for source, target in enumerate(permutation):
+        inverse[target] = source
+    return tuple(inverse)
+
+
+def permute_counts(counts: Sequence[int], permutation: Tuple[int, ...]) -> List[int]:
+    """Move each suit's six slots of a count vector to the suit the permutation gives."""
+    permuted = [0] * NUM_CARDS
+    for source, target in enumerate(permutation):
+        permuted[target * 6:target * 6 + 6] = counts[source * 6:source * 6 + 6]
+    return permuted
+
+
+def permute_card(card: Card, permutation: Tuple[int, ...]) -> Card:
+    """The same rank in the suit the permutation moves the card's suit to."""
+    return CARDS[permutation[SUIT_INDEX[card.suit]] * 6 + card.code % 6]
+
+
+def permute_cards(cards: Sequence[Card], permutation: Tuple[int, ...]) -> List[Card]:
+    return [permute_card(card, permutation) for card in cards]
+
+
+def permute_suit(suit: Suit, permutation: Tuple[int, ...]) -> Suit:
+    return SUITS[permutation[SUIT_INDEX[suit]]]
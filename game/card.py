@@ -1,8 +1,10 @@
 from enum import Enum
-from typing import List, Optional
+from typing import List, Optional, Dict, Tuple
 
 import random
 
+from .rng import resolve
+
 class Suit(Enum):
     SPADES = "♠️"
     HEARTS = "♥️"
@@ -33,19 +35,84 @@ class Rank(Enum):
             return "9"
 
 class Card:
-    def __init__(self, suit: Suit, rank: Rank):
-        self.suit = suit
-        self.rank = rank
+    """A Pinochle card.
+
+    There are only 24 distinct cards, so every card is interned: Card(suit, rank)
+    always returns the same object. Each card has a small integer code (0..23) in
+    display order (suits Spades, Hearts, Clubs, Diamonds, ranks Ace down to Nine),
+    so cards can be used in sets, dict keys, count arrays and bitmasks.
+    """
+    __slots__ = ("suit", "rank", "code")
+
+    _interned: Dict[Tuple[Suit, Rank], "Card"] = {}
+
+    def __new__(cls, suit: Suit, rank: Rank):
+        try:
+            return cls._interned[(suit, rank)]
+        except KeyError:
+            raise ValueError(f"Not a Pinochle card: {suit!r} {rank!r}") from None
+
+    @classmethod
+    def _intern(cls, suit: Suit, rank: Rank, code: int) -> "Card":
+        card = object.__new__(cls)
+        card.suit = suit
+        card.rank = rank
+        card.code = code
+        cls._interned[(suit, rank)] = card
+        return card
 
-    def __eq__(self, other):
-        if isinstance(other, Card):
-            return self.suit == other.suit and self.rank == other.rank
-        return False  # If compared with something that's not a Card, return False
+    # Cards are singletons, so the default identity equality is exact.
+    def __hash__(self):
+        return self.code
+
+    def __reduce__(self):
+        # Unpickling goes through Card() so cards stay interned across processes
+        return (Card, (self.suit, self.rank))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __repr__(self):
         """String representation for debugging."""
         return f"{self.suit.value}  {self.rank}"
 
+
+# Display order of suits and ranks, which is also the order of card codes
+SUITS: Tuple[Suit, ...] = (Suit.SPADES, Suit.HEARTS, Suit.CLUBS, Suit.DIAMONDS)
+RANKS: Tuple[Rank, ...] = (Rank.ACE, Rank.TEN, Rank.KING, Rank.QUEEN, Rank.JACK, Rank.NINE)
+SUIT_INDEX: Dict[Suit, int] = {suit: i for i, suit in enumerate(SUITS)}
+RANK_INDEX: Dict[Rank, int] = {rank: i for i, rank in enumerate(RANKS)}
+
+NUM_CARDS = len(SUITS) * len(RANKS)
+
+# All 24 cards, indexed by code
+CARDS: Tuple[Card, ...] = tuple(
+    Card._intern(suit, rank, SUIT_INDEX[suit] * len(RANKS) + RANK_INDEX[rank])
+    for suit in SUITS for rank in RANKS
+)
+
+
+def card_code(suit: Suit, rank: Rank) -> int:
+    """Code (0..23) of the card with this suit and rank."""
+    return SUIT_INDEX[suit] * len(RANKS) + RANK_INDEX[rank]
+
+
+def card_from_code(code: int) -> Card:
+    """The card with this code."""
+    return CARDS[code]
+
+
+def count_cards(cards) -> List[int]:
+    """Count vector of a collection of cards: how many copies of each card code it holds."""
+    counts = [0] * NUM_CARDS
+    for card in cards:
+        counts[card.code] += 1
+    return counts
+
+
 class Deck:
     def __init__(self):
         self.cards: List[Card] = []
@@ -60,9 +127,9 @@ class Deck:
                 self.cards.append(Card(suit, rank))
                 self.cards.append(Card(suit, rank))
     
-    def shuffle(self) -> None:
-        """Shuffle the deck."""
-        random.shuffle(self.cards)
+    def shuffle(self, rng: Optional[random.Random] = None) -> None:
+        """Shuffle the deck with rng (the global random module if not given)."""
+        resolve(rng).shuffle(self.cards)
     
     def draw_card(self) -> Optional[Card]:
         """Draw a card from the top of the deck."""
@@ -81,10 +148,11 @@ class Deck:
     
     def remove_card(self, card: Card) -> bool:
         """Remove a specific card from the deck."""
-        if card in self.cards:
-            self.cards.remove(card)
-            return True
-        return False
+        try:
+            self.cards.remove(card)  # One scan; cards are interned, so this compares identity first
+        except ValueError:
+            return False
+        return True
     
     def __len__(self) -> int:
         return len(self.cards) 
\ No newline at end of file
@@ -0,0 +1,60 @@
+from typing import List, Dict, Optional, Iterable
+from .card import Card, Suit, Rank, CARDS, NUM_CARDS, SUITS, card_code
+
+COUNTER_RANKS = (Rank.ACE, Rank.TEN, Rank.KING)
+
+
+class CardTracker:
+    """Keeps track of the cards that have not been played yet.
+
+    Updated one card at a time by play(), so every query is O(1) or O(cards in a suit)
+    no matter how far into the hand we are.
+    """
+    def __init__(self):
+        self.remaining: List[int] = [2] * NUM_CARDS  # Unplayed copies, by card code
+        self.suit_remaining: Dict[Suit, List[Card]] = {
+            suit: [CARDS[code] for code in range(card_code(suit, Rank.ACE), card_code(suit, Rank.NINE) + 1)
+                   for _ in range(2)]
+            for suit in SUITS
+        }
+        self.counters_remaining = 2 * len(SUITS) * len(COUNTER_RANKS)
+        self.boss: Dict[Suit, Optional[Card]] = {suit: Card(suit, Rank.ACE) for suit in SUITS}
+
+    @classmethod
+    def from_played(cls, played: Iterable[Card]) -> "CardTracker":
+        """Build a tracker from a list of cards already played."""
+        tracker = cls()
+        for card in played:
+            tracker.play(card)
+        return tracker
+
+    def play(self, card: Card) -> None:
+        """Record that a card was played."""
+        self.remaining[card.code] -= 1
+        self.suit_remaining[card.suit].remove(card)
+        if card.rank in COUNTER_RANKS:
+            self.counters_remaining -= 1
+        if self.remaining[card.code] == 0 and self.boss[card.suit] is card:
+            # Highest unplayed card left in the suit (lists stay in Ace-to-Nine order)
+            left = self.suit_remaining[card.suit]
+            self.boss[card.suit] = left[0] if left else None
+
+    def played_count(self, card: Card) -> int:
+        """How many copies of a card have been played."""
+        return 2 - self.remaining[card.code]
+
+    def all_played(self, card: Card) -> bool:
+        """True if both copies of a card have been played."""
+        return self.remaining[card.code] == 0
+
+    def remaining_in_suit(self, suit: Suit) -> List[Card]:
+        """Unplayed cards of a suit, highest first."""
+        return self.suit_remaining[suit]
+
+    def counter_points_remaining(self) -> int:
+        """Points (10 per A, 10 and K) still to be won."""
+        return self.counters_remaining * 10
+
+    def is_boss(self, card: Card) -> bool:
+        """True if no unplayed card of the suit ranks above this one."""
+        return self.boss[card.suit] is card
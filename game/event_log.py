@@ -0,0 +1,185 @@
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Union
+from .card import Card, Suit, CARDS, SUITS, SUIT_INDEX
+import struct
+
+MAGIC = b"PNLG\x01"  # File signature and format version
+
+# Event kinds
+DEAL = 1    # seat: none, data: the four hands as dealt
+BID = 2     # seat: bidder, data: bid, 0 for a pass
+TRUMP = 3   # seat: none, data: trump suit
+PASS = 4    # seat: passer, data: (receiving seat, cards)
+MELD = 5    # seat: melder, data: meld points
+PLAY = 6    # seat: player, data: card
+TRICK = 7   # seat: trick winner, data: None
+SCORE = 8   # seat: none, data: [team 0 score, team 1 score]
+
+KIND_NAMES = {DEAL: "deal", BID: "bid", TRUMP: "trump", PASS: "pass", MELD: "meld",
+              PLAY: "play", TRICK: "trick", SCORE: "score"}
+
+NO_SEAT = 255
+
+# Every record is a 3-byte header (kind, seat, payload length) and its payload.
+# Cards are written as their codes (0..23), one byte each.
+_HEADER = struct.Struct("<BBB")
+_U16 = struct.Struct("<H")
+_SCORES = struct.Struct("<ii")
+
+
+class Event:
+    """One decoded record of a game event log."""
+    __slots__ = ("kind", "seat", "data")
+
+    def __init__(self, kind: int, seat: Optional[int], data):
+        self.kind = kind
+        self.seat = seat
+        self.data = data
+
+    def __repr__(self):
+        return f"Event({KIND_NAMES.get(self.kind, self.kind)}, seat={self.seat}, data={self.data!r})"
+
+
+class EventLog:
+    """Appends game events to a compact binary log.
+
+    Records go through a buffered file, so logging an event costs a struct.pack and
+    a buffer append. Pass a path to append to a file (the header is written when the
+    file is new) or an open binary file object to write to it directly.
+    """
+    def __init__(self, target: Union[str, BinaryIO], buffer_size: int = 65536):
+        if isinstance(target, str):
+            self.file = open(target, "ab", buffering=buffer_size)
+            self._owns_file = True
+        else:
+            self.file = target
+            self._owns_file = False
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+
+    def _write(self, kind: int, seat: int, payload: bytes = b"") -> None:
+        self.file.write(_HEADER.pack(kind, seat, len(payload)) + payload)
+
+    def deal(self, hands: Sequence[Sequence[Card]]) -> None:
+        self._write(DEAL, NO_SEAT, bytes(card.code for hand in hands for card in hand))
+
+    def bid(self, seat: int, bid: Optional[int]) -> None:
+        """A bid, or a pass when bid is None."""
+        self._write(BID, seat, _U16.pack(bid or 0))
+
+    def trump(self, suit: Suit) -> None:
+        self._write(TRUMP, NO_SEAT, bytes((SUIT_INDEX[suit],)))
+
+    def pass_cards(self, seat: int, to_seat: int, cards: Sequence[Card]) -> None:
+        self._write(PASS, seat, bytes([to_seat] + [card.code for card in cards]))
+
+    def meld(self, seat: int, points: int) -> None:
+        self._write(MELD, seat, _U16.pack(points))
+
+    def play(self, seat: int, card: Card) -> None:
+        self._write(PLAY, seat, bytes((card.code,)))
+
+    def trick(self, winner: int) -> None:
+        self._write(TRICK, winner)
+
+    def scores(self, scores: Sequence[int]) -> None:
+        self._write(SCORE, NO_SEAT, _SCORES.pack(*scores))
+
+    def write_records(self, records: bytes) -> None:
+        """Append records another EventLog encoded (its output without the file header)."""
+        self.file.write(records)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        if self._owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class NullEventLog:
+    """Stands in for an EventLog when nothing is being recorded."""
+    def deal(self, hands): pass
+    def bid(self, seat, bid): pass
+    def trump(self, suit): pass
+    def pass_cards(self, seat, to_seat, cards): pass
+    def meld(self, seat, points): pass
+    def play(self, seat, card): pass
+    def trick(self, winner): pass
+    def scores(self, scores): pass
+    def flush(self): pass
+    def close(self): pass
+
+
+NULL_LOG = NullEventLog()
+
+
+def decode(kind: int, seat: int, payload: bytes) -> Event:
+    """Turn one record's header fields and payload back into an Event."""
+    if kind == PLAY:
+        data = CARDS[payload[0]]
+    elif kind == BID:
+        data = _U16.unpack(payload)[0] or None
+    elif kind == MELD:
+        data = _U16.unpack(payload)[0]
+    elif kind == TRICK:
+        data = None
+    elif kind == PASS:
+        data = (payload[0], [CARDS[code] for code in payload[1:]])
+    elif kind == DEAL:
+        hand_size = len(payload) // 4
+        data = [[CARDS[code] for code in payload[i:i + hand_size]] for i in range(0, len(payload), hand_size)]
+    elif kind == TRUMP:
+        data = SUITS[payload[0]]
+    elif kind == SCORE:
+        data = list(_SCORES.unpack(payload))
+    else:
+        data = bytes(payload)  # Unknown kind from a newer writer: keep the raw payload
+    return Event(kind, None if seat == NO_SEAT else seat, data)
+
+
+def read_events(source: Union[str, BinaryIO], chunk_size: int = 1 << 20) -> Iterator[Event]:
+    """Yield every event in a log, reading it in fixed-size chunks (constant memory)."""
+    file = open(source, "rb") if isinstance(source, str) else source
+    try:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a game event log")
+        buffer = b""
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            buffer = buffer + chunk if buffer else chunk
+            pos = 0
+            end = len(buffer)
+            while pos + 3 <= end:
+                kind, seat, length = buffer[pos], buffer[pos + 1], buffer[pos + 2]
+                if pos + 3 + length > end:
+                    break
+                yield decode(kind, seat, buffer[pos + 3:pos + 3 + length])
+                pos += 3 + length
+            buffer = buffer[pos:]
+        if buffer:
+            raise ValueError("Event log ends with a partial record")
+    finally:
+        if isinstance(source, str):
+            file.close()
+
+
+def read_games(source: Union[str, BinaryIO]) -> Iterator[List[Event]]:
+    """Yield the events of one game at a time; every game starts with its DEAL event."""
+    game: List[Event] = []
+    for event in read_events(source):
+        if event.kind == DEAL and game:
+            yield game
+            game = []
+        game.append(event)
+    if game:
+        yield game
@@ -0,0 +1,258 @@
+from typing import List, Optional, Tuple, Union
+from .card import Card, Suit, CARDS, SUITS, SUIT_INDEX, count_cards
+from .game_state import GameState
+from .hand import Hand
+
+# Phases, as GameState.phase
+BIDDING = "bidding"
+TRUMP = "trump"
+PASSING = "passing"
+PLAYING = "playing"
+DONE = "done"
+
+# Decision kinds; a BID decision is also how a seat passes in the auction
+BID = "bid"
+CHOOSE_TRUMP = "trump"
+PASS = "pass"
+PLAY = "play"
+
+OPENING_BID = 250
+BID_INCREMENT = 10
+PASS_SIZE = 4
+FORMAT_VERSION = 1
+
+Action = Union[None, int, Suit, Card, List[Card]]
+
+
+class Decision:
+    """A choice the game is waiting for.
+
+    kind is BID (action: a bid of at least `minimum`, or None to pass), CHOOSE_TRUMP
+    (a Suit), PASS (PASS_SIZE cards from the seat's hand, going to `to_seat`) or PLAY
+    (one of the `legal` cards).
+    """
+    __slots__ = ("kind", "seat", "minimum", "to_seat", "legal")
+
+    def __init__(self, kind: str, seat: int, minimum: int = 0, to_seat: Optional[int] = None,
+                 legal: Optional[List[Card]] = None):
+        self.kind = kind
+        self.seat = seat
+        self.minimum = minimum
+        self.to_seat = to_seat
+        self.legal = legal
+
+    def __repr__(self):
+        return f"Decision({self.kind}, seat={self.seat})"
+
+
+def final_scores(game_state: GameState) -> List[int]:
+    """Score each team: counters taken, plus meld if the team took any counters."""
+    scores = []
+    for team in (0, 1):
+        points = game_state.tricks_won[team] * 10
+        if points > 0:
+            points += game_state.player_hands[team].meldPoints + game_state.player_hands[team + 2].meldPoints
+        scores.append(points)
+    return scores
+
+
+class GameFlow:
+    """One deal as an explicit phase machine on top of a GameState.
+
+    The flow never waits: pending_decision() says which seat has to choose what, and
+    apply(action) makes that choice and moves the game on to the next decision (meld
+    is counted and tricks are scored along the way). Whoever drives it, the CLI
+    asking a human or a computer player, calls the same two methods, so a paused game
+    is just a GameFlow object and one process can keep any number of them.
+
+    Every action applied is kept in `history`, so to_dict() and from_dict() save and
+    resume a game as the deal, the opener and the actions that followed.
+
+    With track_locations (the default) every seat's GameState.locations is kept up to
+    date for the computer players and the tutor.
+    """
+    def __init__(self, game_state: GameState, opener: int, detailed_meld: bool = False,
+                 track_locations: bool = True):
+        self.game_state = game_state
+        self.opener = opener
+        self.detailed_meld = detailed_meld  # Fill Hand.melds as well as the points
+        self.track_locations = track_locations
+        self.dealt: List[List[Card]] = [list(hand.cards) for hand in game_state.player_hands]
+        self.history: List = []  # JSON-ready actions, see _encode
+        self.bids: List[Tuple[int, Optional[int]]] = []  # (seat, bid) with None for a pass
+        self.passes: List[Tuple[int, int, List[Card]]] = []  # (from seat, to seat, cards)
+        self.tricks: List[Tuple[int, List[Card], int]] = []  # (leader, cards, winner)
+        self.meld: List[int] = []
+        self.scores: Optional[List[int]] = None
+
+        self._passed = [False] * 4
+        self.leader = opener  # Seat leading the current trick
+
+        if track_locations:
+            game_state.track_locations()
+        game_state.phase = BIDDING
+        game_state.place_bid(opener, OPENING_BID)
+        self.bids.append((opener, OPENING_BID))
+        self._turn = self._next_bidder(opener)
+
+    @property
+    def phase(self) -> str:
+        return self.game_state.phase
+
+    @property
+    def done(self) -> bool:
+        return self.game_state.phase == DONE
+
+    def _next_bidder(self, seat: int) -> int:
+        for step in range(1, 5):
+            if not self._passed[(seat + step) % 4]:
+                return (seat + step) % 4
+        return seat
+
+    def pending_decision(self) -> Optional[Decision]:
+        """The decision the game is waiting for, or None once the deal is over."""
+        game_state = self.game_state
+        phase = game_state.phase
+        if phase == PLAYING:
+            seat = game_state.current_player
+            return Decision(PLAY, seat, legal=game_state.legal_moves(seat))
+        if phase == BIDDING:
+            return Decision(BID, self._turn, minimum=game_state.current_bid + BID_INCREMENT)
+        if phase == TRUMP:
+            return Decision(CHOOSE_TRUMP, game_state.winning_bidder)
+        if phase == PASSING:
+            winner = game_state.winning_bidder
+            partner = (winner + 2) % 4
+            if not self.passes:
+                return Decision(PASS, partner, to_seat=winner)
+            return Decision(PASS, winner, to_seat=partner)
+        return None
+
+    def apply(self, action: Action) -> None:
+        """Make the pending decision. Raises ValueError if the action isn't allowed."""
+        decision = self.pending_decision()
+        if decision is None:
+            raise ValueError("The deal is over")
+        if decision.kind == PLAY:
+            self._play(decision, action)
+        elif decision.kind == BID:
+            self._bid(decision, action)
+        elif decision.kind == CHOOSE_TRUMP:
+            self._choose_trump(action)
+        else:
+            self._pass(decision, action)
+        self.history.append(_encode(decision.kind, action))
+
+    def _bid(self, decision: Decision, bid: Optional[int]) -> None:
+        game_state = self.game_state
+        seat = decision.seat
+        if bid is None:
+            self._passed[seat] = True
+            game_state.pass_bid(seat)
+        elif not isinstance(bid, int) or bid < decision.minimum:
+            raise ValueError(f"Bid must be at least {decision.minimum}")
+        else:
+            game_state.place_bid(seat, bid)
+        self.bids.append((seat, bid))
+
+        if self._passed.count(True) >= 3:
+            game_state.phase = TRUMP
+        else:
+            self._turn = self._next_bidder(seat)
+
+    def _choose_trump(self, suit: Suit) -> None:
+        if not isinstance(suit, Suit):
+            raise ValueError("Trump must be a Suit")
+        game_state = self.game_state
+        game_state.set_trump(suit)
+        for hand in game_state.player_hands:
+            hand.add_meld_def(suit)
+        game_state.phase = PASSING
+
+    def _pass(self, decision: Decision, cards: List[Card]) -> None:
+        game_state = self.game_state
+        cards = list(cards)
+        if len(cards) != PASS_SIZE:
+            raise ValueError(f"Pass exactly {PASS_SIZE} cards")
+        held = game_state.player_hands[decision.seat].counts
+        for code, count in enumerate(count_cards(cards)):
+            if count > held[code]:
+                raise ValueError(f"Seat {decision.seat} doesn't hold {CARDS[code]}")
+        game_state.pass_cards(decision.seat, decision.to_seat, cards)
+        self.passes.append((decision.seat, decision.to_seat, cards))
+        if len(self.passes) < 2:
+            return
+
+        self.meld = [game_state.evaluate_melds(seat, self.detailed_meld) for seat in range(4)]
+        game_state.phase = PLAYING
+        game_state.current_trick = []
+        game_state.current_player = self.leader = game_state.winning_bidder
+
+    def _play(self, decision: Decision, card: Card) -> None:
+        if card not in decision.legal:
+            raise ValueError(f"{card} is not a legal play for seat {decision.seat}")
+        game_state = self.game_state
+        seat = decision.seat
+        game_state.player_hands[seat].remove_card(card)
+        game_state.play_card(card)
+        if len(game_state.current_trick) < 4:
+            game_state.current_player = (seat + 1) % 4
+            return
+
+        winner = game_state.get_trick_winner(self.leader)
+        self.tricks.append((self.leader, list(game_state.current_trick), winner))
+        game_state.complete_trick(winner)
+        self.leader = winner
+        if not any(hand.size for hand in game_state.player_hands):
+            self.scores = final_scores(game_state)
+            game_state.event_log.scores(self.scores)
+            game_state.phase = DONE
+
+    def to_dict(self) -> dict:
+        """JSON-ready snapshot of the deal so far, for from_dict() to resume."""
+        return {
+            "version": FORMAT_VERSION,
+            "hands": [[card.code for card in hand] for hand in self.dealt],
+            "opener": self.opener,
+            "detailed_meld": self.detailed_meld,
+            "track_locations": self.track_locations,
+            "actions": list(self.history),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, game_state: Optional[GameState] = None) -> "GameFlow":
+        """Rebuild a game saved with to_dict() by dealing the same hands and replaying its actions."""
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported saved game version {data.get('version')!r}")
+        game_state = game_state if game_state is not None else GameState()
+        game_state.reset()
+        for codes in data["hands"]:
+            hand = Hand()
+            for code in codes:
+                hand.add_card(CARDS[code])
+            game_state.player_hands.append(hand)
+        flow = cls(game_state, data["opener"], data.get("detailed_meld", False),
+                   data.get("track_locations", True))
+        for encoded in data["actions"]:
+            flow.apply(_decode(flow.pending_decision().kind, encoded))
+        return flow
+
+
+def _encode(kind: str, action: Action):
+    if kind == PLAY:
+        return action.code
+    if kind == PASS:
+        return [card.code for card in action]
+    if kind == CHOOSE_TRUMP:
+        return SUIT_INDEX[action]
+    return action
+
+
+def _decode(kind: str, encoded) -> Action:
+    if kind == PLAY:
+        return CARDS[encoded]
+    if kind == PASS:
+        return [CARDS[code] for code in encoded]
+    if kind == CHOOSE_TRUMP:
+        return SUITS[encoded]
+    return encoded
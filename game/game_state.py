@@ -1,22 +1,44 @@
 from typing import List, Dict, Optional
 from .card import Card, Suit
 from .hand import Hand
+from .card_tracker import CardTracker
+from .event_log import NULL_LOG
+from .strength import BEATS, IS_COUNTER
+from .inference import CardLocations
+from .meld import shown_counts
 
 class GameState:
     def __init__(self):
+        self.event_log = NULL_LOG  # Set to an EventLog to record the game; kept across deals
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear everything but the event log, ready for a new deal."""
         self.trump_suit: Optional[Suit] = None
         self.current_bid: int = 0
         self.winning_bidder: Optional[int] = None  # Player index
         self.current_trick: List[Card] = []
+        self.trick_winner: int = 0  # Position in current_trick of the card winning it so far
         self.tricks_won: Dict[int, int] = {0: 0, 1: 0}  # Player index -> tricks won
         self.played_cards: List[Card] = []
+        self.tracker = CardTracker()  # Unplayed cards, updated on every play
+        self.locations: List[CardLocations] = []  # Per seat, once track_locations() is called
         self.player_hands: List[Hand] = []
         self.current_player: int = 0
-        self.phase: str = "bidding"  # bidding, melding, playing, scoring
+        self.phase: str = "bidding"  # bidding, trump, passing, playing, done (see game/flow.py)
     
+    def track_locations(self) -> None:
+        """Start inferring, for every seat, where the cards it can't see are (see game/inference.py).
+
+        Call once the hands are dealt; plays, passes and meld update it from then on.
+        """
+        sizes = [len(hand) for hand in self.player_hands]
+        self.locations = [CardLocations(seat, hand.counts, sizes) for seat, hand in enumerate(self.player_hands)]
+
     def set_trump(self, suit: Suit) -> None:
         """Set the trump suit for the current hand."""
         self.trump_suit = suit
+        self.event_log.trump(suit)
     
     def place_bid(self, player: int, bid: int) -> bool:
         """Place a bid for the current hand."""
@@ -24,18 +46,56 @@ class GameState:
             return False
         self.current_bid = bid
         self.winning_bidder = player
+        self.event_log.bid(player, bid)
         return True
+
+    def pass_bid(self, player: int) -> None:
+        """Record that a player passed in the auction."""
+        self.event_log.bid(player, None)
+
+    def pass_cards(self, from_player: int, to_player: int, cards: List[Card]) -> None:
+        """Move cards from one player's hand to another's in the trading phase."""
+        for card in cards:
+            self.player_hands[from_player].remove_card(card)
+            self.player_hands[to_player].add_card(card)
+        for locations in self.locations:
+            locations.pass_cards(from_player, to_player, cards)
+        self.event_log.pass_cards(from_player, to_player, cards)
+
+    def evaluate_melds(self, player: int, detailed: bool = True) -> int:
+        """Count a player's meld (see Hand.evaluate_melds)."""
+        hand = self.player_hands[player]
+        points = hand.evaluate_melds(detailed)
+        if self.locations and points:
+            # Meld is laid on the table, so every other seat sees those cards
+            shown = shown_counts(hand.counts, hand.trump)
+            for locations in self.locations:
+                locations.meld(player, shown)
+        self.event_log.meld(player, points)
+        return points
     
     def play_card(self, card: Card) -> None:
         """Play a card in the current trick."""
-        self.current_trick.append(card)
+        trick = self.current_trick
+        trick.append(card)
+        if len(trick) == 1:
+            self.trick_winner = 0
+        elif BEATS[self.trump_suit][card.code][trick[self.trick_winner].code]:
+            self.trick_winner = len(trick) - 1
         self.played_cards.append(card)
+        self.tracker.play(card)
+        if self.locations:
+            led_suit = trick[0].suit
+            for locations in self.locations:
+                locations.play(self.current_player, card, led_suit, self.trump_suit)
+        self.event_log.play(self.current_player, card)
     
     def complete_trick(self, winning_player: int) -> None:
         """Complete the current trick and award it to the winning player."""
-        for trick in self.current_trick:
-            if trick.rank.value == 14 or trick.rank.value == 13 or trick.rank.value == 12:
+        for card in self.current_trick:
+            if IS_COUNTER[card.code]:
                 self.tricks_won[winning_player % 2] += 1
+        self.event_log.trick(winning_player)
         self.current_trick = []
         self.current_player = winning_player
     
@@ -49,6 +109,34 @@ class GameState:
         return [card for card in self.player_hands[self.current_player].cards 
                 if card.suit == suit]
     
+    def legal_suit(self, seat: int) -> Optional[Suit]:
+        """The suit a seat must play to the current trick, or None if any card is allowed."""
+        if not self.current_trick:
+            return None
+        suit_counts = self.player_hands[seat].suit_counts
+
+        # Must follow suit if possible, otherwise trump if possible
+        led_suit = self.current_trick[0].suit
+        if suit_counts[led_suit]:
+            return led_suit
+        if self.trump_suit is not None and suit_counts[self.trump_suit]:
+            return self.trump_suit
+        return None
+
+    def legal_moves(self, seat: int) -> List[Card]:
+        """Every card in a seat's hand that may be played to the current trick."""
+        cards = self.player_hands[seat].cards
+        suit = self.legal_suit(seat)
+        if suit is None:
+            return list(cards)
+        return [card for card in cards if card.suit == suit]
+
+    def winning_card(self) -> Optional[Card]:
+        """The card currently winning the trick."""
+        if not self.current_trick:
+            return None
+        return self.current_trick[self.trick_winner]
+
     def is_valid_play(self, card: Card) -> bool:
         """Check if a card is a valid play in the current trick."""
         if not self.current_trick:
@@ -58,13 +146,12 @@ class GameState:
         led_suit = self.current_trick[0].suit
         if card.suit != led_suit:
             # Check if player has any cards of the led suit
-            has_led_suit = any(c.suit == led_suit for c in self.player_hands[self.current_player].cards)
-            if has_led_suit:
+            suit_counts = self.player_hands[self.current_player].suit_counts
+            if suit_counts[led_suit]:
                 return False
             
             # If no led suit, check if player has trump
-            has_trump = any(c.suit == self.trump_suit for c in self.player_hands[self.current_player].cards)
-            if has_trump:
+            if self.trump_suit is not None and suit_counts[self.trump_suit]:
                 # If they have trump, must play trump
                 return card.suit == self.trump_suit
             
@@ -78,16 +165,6 @@ class GameState:
         if not self.current_trick:
             return None
 
-        # Determine trump cards
-        trump_cards = [(i, card) for i, card in enumerate(self.current_trick) if card.suit == self.trump_suit]
-        if trump_cards:
-            # Find the trump card with the highest rank
-            best_index, _ = max(trump_cards, key=lambda x: x[1].rank.value)
-        else:
-            # Use the first suit played
-            first_suit = self.current_trick[0].suit
-            suit_cards = [(i, card) for i, card in enumerate(self.current_trick) if card.suit == first_suit]
-            best_index, _ = max(suit_cards, key=lambda x: x[1].rank.value)
-
-        # Convert the index in the trick to the actual player number
-        return (trick_starter + best_index) % 4
+        # play_card keeps track of the winning card, so convert its index in the trick
+        # to the actual player number
+        return (trick_starter + self.trick_winner) % 4
@@ -0,0 +1,204 @@
+from typing import List, Optional, Sequence, Tuple
+from .card import Card, Suit, CARDS, NUM_CARDS, SUIT_INDEX
+import math
+import numpy as np
+
+SEATS = 4
+SUIT_SIZE = NUM_CARDS // 4
+CARD_SUIT = np.arange(NUM_CARDS) // SUIT_SIZE
+
+# The fit stops once every hand's cards add up to within this, or after _MAX_STEPS
+_TOLERANCE = 1e-6
+_MAX_STEPS = 50
+
+
+def _split(suits: List[Tuple[int, List[int]]], log_weights: List[float]):
+    """Split each suit's unknown copies between the hands that may hold it, in proportion
+    to exp(log_weights). suits has (copies, columns that may hold the suit) pairs.
+
+    Returns the cards this puts in each hand, their derivatives by the log weights, and
+    sum(copies * log(total weight of the suit's columns)), the convex function of the log
+    weights those totals are the gradient of.
+    """
+    totals = [0.0] * 3
+    curvature = [[0.0] * 3 for _ in range(3)]
+    value = 0.0
+    for copies, columns in suits:
+        weights = [math.exp(log_weights[col]) for col in columns]
+        total = sum(weights)
+        value += copies * math.log(total)
+        shares = [weight / total for weight in weights]
+        for col, share in zip(columns, shares):
+            totals[col] += copies * share
+            curvature[col][col] += copies * share
+            for other, other_share in zip(columns, shares):
+                curvature[col][other] -= copies * share * other_share
+    return totals, curvature, value
+
+
+class CardLocations:
+    """Where the cards one seat can't see probably are, from that seat's point of view.
+
+    The evidence is kept as counts that each event updates in a few array writes:
+    the copies of each card still hidden, copies known to be in a given hand (passed
+    there by this seat, or shown in meld), cards left in each hand, and the suits each
+    seat has shown out of by not following the led suit (or not trumping).
+
+    expected() turns that into a 24x3 matrix: the expected copies of each card in the
+    hands of the three other seats, in the order seat + 1, + 2 (the partner), + 3.
+    Under a uniform prior over the deals that fit the evidence, a hidden copy is in a
+    hand in proportion to the room left in it, and never in a suit the seat is out
+    of. The matrix is the closest fit to both totals (every card's hidden copies and
+    every hand's unknown cards): each hand gets a weight, and a card's unknown copies
+    are split between the hands that may hold its suit in proportion to their weights.
+    Newton's method finds the weights that make the hand totals come out right,
+    starting from the previous fit's, so an update usually takes one or two steps.
+    Each card's copies always add up exactly and the hand totals to within
+    _TOLERANCE; `converged` is False if the last fit stopped after _MAX_STEPS
+    without getting there. The matrix is only recomputed when asked for after
+    something changed.
+    """
+    def __init__(self, seat: int, held: Sequence[int], hand_sizes: Sequence[int]):
+        self.seat = seat
+        self.others = tuple((seat + step) % SEATS for step in (1, 2, 3))
+        self.hidden = 2 - np.asarray(held, dtype=np.int16)  # Copies held by the other seats
+        self.known = np.zeros((NUM_CARDS, 3), dtype=np.int16)  # Copies known to be in each hand
+        self.sizes = np.array([hand_sizes[other] for other in self.others], dtype=np.int16)
+        self.may_hold = np.ones((4, 3), dtype=bool)  # [suit, column]: False once shown out
+        self._expected: Optional[np.ndarray] = None
+        self._log_weights = [0.0, 0.0, 0.0]  # Hand weights of the last fit, to start the next from
+        self.converged = True
+
+    def column(self, seat: int) -> int:
+        """Column of `seat` in the matrices (0..2); not defined for the observing seat itself."""
+        return (seat - self.seat - 1) % SEATS
+
+    def play(self, seat: int, card: Card, led_suit: Suit, trump: Optional[Suit]) -> None:
+        """A card was played to a trick led with `led_suit`."""
+        if seat == self.seat:
+            return  # This seat's own hand was never hidden
+        col = (seat - self.seat - 1) % SEATS
+        code = card.code
+        self.hidden[code] -= 1
+        if self.known[code, col]:
+            self.known[code, col] -= 1
+        self.sizes[col] -= 1
+        if card.suit is not led_suit:
+            # Showed out of the led suit, and out of trump too if it didn't trump
+            self.may_hold[SUIT_INDEX[led_suit], col] = False
+            if trump is not None and card.suit is not trump:
+                self.may_hold[SUIT_INDEX[trump], col] = False
+        self._expected = None
+
+    def pass_cards(self, from_seat: int, to_seat: int, cards: Sequence[Card]) -> None:
+        """Cards went from one hand to another in the trading phase."""
+        if from_seat == self.seat:
+            col = self.column(to_seat)
+            for card in cards:
+                self.hidden[card.code] += 1
+                self.known[card.code, col] += 1
+        elif to_seat == self.seat:
+            col = self.column(from_seat)
+            for card in cards:
+                self.hidden[card.code] -= 1
+                if self.known[card.code, col]:
+                    self.known[card.code, col] -= 1
+        else:
+            # Unseen cards changed hands, so whatever was known about the giver may have moved
+            self.known[:, self.column(from_seat)] = 0
+        if from_seat != self.seat:
+            self.sizes[self.column(from_seat)] -= len(cards)
+        if to_seat != self.seat:
+            self.sizes[self.column(to_seat)] += len(cards)
+        self._expected = None
+
+    def meld(self, seat: int, shown: Sequence[int]) -> None:
+        """A seat laid down meld showing these copies (by card code, see meld.shown_counts)."""
+        if seat == self.seat:
+            return
+        col = self.column(seat)
+        np.maximum(self.known[:, col], shown, out=self.known[:, col])
+        self._expected = None
+
+    def shown_out(self, seat: int, suit: Suit) -> bool:
+        """True once `seat` has failed to follow `suit` (so it holds none)."""
+        return seat != self.seat and not self.may_hold[SUIT_INDEX[suit], self.column(seat)]
+
+    def may_ruff(self, seat: int, suit: Suit, trump: Optional[Suit]) -> bool:
+        """True if `seat` is out of `suit` but may still hold trump to play on it."""
+        return (trump is not None and suit is not trump and self.shown_out(seat, suit)
+                and not self.shown_out(seat, trump))
+
+    def known_cards(self, seat: int) -> List[Card]:
+        """Cards known to be in `seat`'s hand, in display order."""
+        known = self.known[:, self.column(seat)]
+        return [CARDS[code] for code in np.flatnonzero(known) for _ in range(known[code])]
+
+    def expected(self) -> np.ndarray:
+        """(24, 3) expected copies of each card in each other seat's hand."""
+        if self._expected is None:
+            self._expected = self._fit()
+        return self._expected
+
+    def probabilities(self) -> np.ndarray:
+        """(24, 3) probability that a hidden copy of each card is in each other seat's hand.
+
+        Rows of cards with no hidden copy left are all zero.
+        """
+        hidden = self.hidden[:, None].astype(float)
+        return np.divide(self.expected(), hidden, out=np.zeros((NUM_CARDS, 3)), where=hidden > 0)
+
+    def suit_expected(self) -> np.ndarray:
+        """(4, 3) expected cards of each suit in each other seat's hand."""
+        return self.expected().reshape(4, SUIT_SIZE, 3).sum(axis=1)
+
+    def _fit(self) -> np.ndarray:
+        rows = self.hidden - self.known.sum(axis=1)  # Copies with no known hand
+        cols = (self.sizes - self.known.sum(axis=0)).tolist()  # Room left in each hand
+        may_hold = self.may_hold.tolist()
+        free = [col for col in range(3) if cols[col] > 0]
+        suits = [(copies, [col for col in free if may_hold[suit][col]])
+                 for suit, copies in enumerate(rows.reshape(4, SUIT_SIZE).sum(axis=1).tolist()) if copies]
+        suits = [(copies, columns) for copies, columns in suits if columns]
+
+        # Minimise value - sum(room * log weight): its gradient is each hand's cards minus
+        # its room. Only the ratios of the weights matter, so the last one stays put.
+        log_weights = list(self._log_weights)
+        totals, curvature, value = _split(suits, log_weights)
+        steps = 0
+        self.converged = True
+        while len(free) > 1 and max(abs(totals[col] - cols[col]) for col in free) >= _TOLERANCE:
+            if steps == _MAX_STEPS:
+                self.converged = False
+                break
+            steps += 1
+            moving = free[:-1]
+            gradient = [totals[col] - cols[col] for col in moving]
+            if len(moving) == 1:
+                step = [gradient[0] / (curvature[moving[0]][moving[0]] + 1e-12)]
+            else:
+                a, b = moving
+                aa, ab, bb = curvature[a][a] + 1e-12, curvature[a][b], curvature[b][b] + 1e-12
+                det = aa * bb - ab * ab
+                step = [(bb * gradient[0] - ab * gradient[1]) / det, (aa * gradient[1] - ab * gradient[0]) / det]
+            # Halve the step until the objective drops enough
+            objective = value - sum(cols[col] * log_weights[col] for col in free)
+            slope = sum(g * d for g, d in zip(gradient, step))
+            scale = 1.0
+            while True:
+                trial = list(log_weights)
+                for col, d in zip(moving, step):
+                    trial[col] -= scale * d
+                trial_totals, trial_curvature, trial_value = _split(suits, trial)
+                trial_objective = trial_value - sum(cols[col] * trial[col] for col in free)
+                if trial_objective <= objective - 1e-4 * scale * slope or scale < 1e-6:
+                    break
+                scale /= 2
+            log_weights, totals, curvature, value = trial, trial_totals, trial_curvature, trial_value
+        self._log_weights = log_weights
+
+        weights = np.array([math.exp(log_weights[col]) if cols[col] > 0 else 0.0 for col in range(3)])
+        weighted = self.may_hold * weights
+        total = weighted.sum(axis=1, keepdims=True)
+        shares = np.divide(weighted, total, out=np.zeros((4, 3)), where=total > 0)
+        return self.known + rows[:, None] * shares[CARD_SUIT]
@@ -0,0 +1,175 @@
+from typing import Callable, Dict, List, Optional, Sequence, TextIO
+import atexit
+import builtins
+import functools
+import importlib
+import json
+import sys
+import time
+
+# Functions enable() times, as "module:attribute path"
+HOT_FUNCTIONS = (
+    "game.hand:Hand.evaluate_melds",
+    "game.hand:Hand.add_meld_def",
+    "game.hand:Hand.add_card",
+    "ai.bidHelper:BidHelper.family_probabilities",
+    "ai.bidHelper:_partner_probability",
+    "ai.helperFunctions:cardPlay",
+    "game.game_state:GameState.legal_moves",
+)
+
+_enabled = False
+_patches: List[tuple] = []  # (owner, attribute, original) to put back on disable()
+_original_input: Optional[Callable] = None
+
+_calls: Dict[str, List[float]] = {}   # function -> [calls, seconds]
+_phases: Dict[str, List[float]] = {}  # phase -> [times entered, wall seconds, seconds blocked on input()]
+_current_phase: Optional[str] = None
+_phase_start = 0.0
+_phase_blocked = 0.0
+_blocked = 0.0  # Total seconds spent waiting in input() since enable()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def _timed(name: str, func: Callable) -> Callable:
+    stats = _calls.setdefault(name, [0, 0.0])
+    perf_counter = time.perf_counter
+
+    @functools.wraps(func)
+    def timed(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats[0] += 1
+            stats[1] += perf_counter() - start
+    return timed
+
+
+def _timed_input(prompt=""):
+    global _blocked
+    start = time.perf_counter()
+    try:
+        return _original_input(prompt)
+    finally:
+        _blocked += time.perf_counter() - start
+
+
+def _patch(owner, attribute: str, value) -> None:
+    _patches.append((owner, attribute, getattr(owner, attribute)))
+    setattr(owner, attribute, value)
+
+
+def enable(functions: Sequence[str] = HOT_FUNCTIONS) -> None:
+    """Start counting calls and time for `functions` and timing input() and phases.
+
+    Nothing is wrapped until this is called, so the game runs at full speed without
+    it. Module-level functions are also replaced in every loaded module that imported
+    them by name, so call this after the game's modules are imported.
+    """
+    global _enabled, _original_input
+    if _enabled:
+        return
+    for target in functions:
+        module_name, path = target.split(":")
+        owner = importlib.import_module(module_name)
+        *parents, attribute = path.split(".")
+        for parent in parents:
+            owner = getattr(owner, parent)
+        original = getattr(owner, attribute)
+        wrapper = _timed(path, original)
+        _patch(owner, attribute, wrapper)
+        if not parents:
+            for module in list(sys.modules.values()):
+                if module is not owner and getattr(module, attribute, None) is original:
+                    _patch(module, attribute, wrapper)
+
+    _original_input = builtins.input
+    _patch(builtins, "input", _timed_input)
+    _enabled = True
+
+
+def disable() -> None:
+    """Close the current phase and put every wrapped function back."""
+    global _enabled
+    end_phase()
+    while _patches:
+        owner, attribute, original = _patches.pop()
+        setattr(owner, attribute, original)
+    _enabled = False
+
+
+def reset() -> None:
+    """Forget everything recorded so far."""
+    global _current_phase, _blocked
+    for stats in _calls.values():
+        stats[0], stats[1] = 0, 0.0
+    _phases.clear()
+    _current_phase = None
+    _blocked = 0.0
+
+
+def phase(name: str) -> None:
+    """Mark the start of a phase; the previous one ends here. A no-op unless enabled."""
+    global _current_phase, _phase_start, _phase_blocked
+    if not _enabled:
+        return
+    end_phase()
+    _current_phase = name
+    _phase_start = time.perf_counter()
+    _phase_blocked = _blocked
+
+
+def end_phase() -> None:
+    global _current_phase
+    if _current_phase is None:
+        return
+    stats = _phases.setdefault(_current_phase, [0, 0.0, 0.0])
+    stats[0] += 1
+    stats[1] += time.perf_counter() - _phase_start
+    stats[2] += _blocked - _phase_blocked
+    _current_phase = None
+
+
+def summary() -> dict:
+    """What has been recorded so far; the phase in progress counts up to now."""
+    phases = {name: list(stats) for name, stats in _phases.items()}
+    if _current_phase is not None:
+        stats = phases.setdefault(_current_phase, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += time.perf_counter() - _phase_start
+        stats[2] += _blocked - _phase_blocked
+    return {
+        "phases": {name: {"entered": count, "wall": wall, "input": blocked, "compute": wall - blocked}
+                   for name, (count, wall, blocked) in phases.items()},
+        "functions": {name: {"calls": calls, "total": total, "mean": total / calls if calls else 0.0}
+                      for name, (calls, total) in _calls.items()},
+    }
+
+
+def format_summary(data: dict) -> str:
+    lines = [f"{'Phase':<12}{'wall s':>10}{'input s':>10}{'compute s':>11}"]
+    for name, stats in data["phases"].items():
+        lines.append(f"{name:<12}{stats['wall']:>10.3f}{stats['input']:>10.3f}{stats['compute']:>11.4f}")
+    lines.append("")
+    lines.append(f"{'Function':<48}{'calls':>8}{'total ms':>11}{'mean us':>10}")
+    for name, stats in sorted(data["functions"].items(), key=lambda item: -item[1]["total"]):
+        lines.append(f"{name:<48}{stats['calls']:>8}{stats['total'] * 1e3:>11.2f}{stats['mean'] * 1e6:>10.1f}")
+    return "\n".join(lines)
+
+
+def export(path: Optional[str] = None, stream: Optional[TextIO] = None) -> None:
+    """Write the summary as JSON to `path`, or as a table to `stream` (stderr by default)."""
+    data = summary()
+    if path:
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+    else:
+        print(format_summary(data), file=stream or sys.stderr)
+
+
+def export_at_exit(path: Optional[str] = None) -> None:
+    atexit.register(export, path)
@@ -1,6 +1,7 @@
-from typing import List, Dict
-from .card import Card, Suit, Rank
+from typing import List, Sequence, Tuple
+from .card import Suit, Rank, CARDS, SUIT_INDEX, card_code
 from enum import Enum
+import numpy as np
 
 class MeldType(Enum):
     NINE = "Nine of Trump"
@@ -22,32 +23,190 @@ class MeldType(Enum):
     DOUBLEFAMILY = "Double Family"
 
 
-    
+# --- Count-vector meld evaluation ---
+#
+# A hand is a count vector of 24 entries (see card.count_cards), so every meld is
+# a min() over a few slots. The rules are the ones Hand.evaluate_melds has always
+# used, except that repeated instances are counted: each Nine of trump, and each
+# King/Queen pair in a suit is its own marriage. Double Pinochle replaces Pinochle,
+# Double Family replaces Family, a trump marriage only counts outside a Family and
+# Polygamy (an extra trump King or Queen) only counts with a single Family.
 
-class MeldDefinition:
-    def __init__(self, meld_type: MeldType, combinations: List[List[Card]], points: int):
-        self.meld_type = meld_type
-        self.combinations = combinations
-        self.points = points
+# Rank offsets inside a suit, matching the card code order
+_ACE, _TEN, _KING, _QUEEN, _JACK, _NINE = range(6)
+_SUIT_BASES = (0, 6, 12, 18)
+_QUEEN_OF_SPADES = card_code(Suit.SPADES, Rank.QUEEN)
+_JACK_OF_DIAMONDS = card_code(Suit.DIAMONDS, Rank.JACK)
 
-    def matches(self, hand: List[Card], trump_suit: Suit = None):
-        for combo in self.combinations:
-            if self._combo_matches(combo, hand, trump_suit):
-                return True
-        return False
+# (rank offset, meld type, points) for one and two of a rank in every suit
+_AROUND_MELDS = (
+    (_JACK, MeldType.FOURJACKS, 40, MeldType.EIGHTJACKS, 400),
+    (_QUEEN, MeldType.FOURQUEENS, 60, MeldType.EIGHTQUEENS, 600),
+    (_KING, MeldType.FOURKINGS, 80, MeldType.EIGHTKINGS, 800),
+    (_ACE, MeldType.FOURACES, 100, MeldType.EIGHTACES, 1000),
+)
 
-    def _combo_matches(self, combo: List[Card], hand: List[Card], trump_suit: Suit = None):
-        for card in combo:
-            # Special logic for trump-based melds
-            if self.meld_type in [MeldType.NINE, MeldType.TRUMPMARRAGE]:
-                if card.rank == Rank.NINE and trump_suit and card.suit != trump_suit:
-                    return False
-                if self.meld_type == MeldType.TRUMPMARRAGE and trump_suit and card.suit != trump_suit:
-                    return False
-            # Check if card exists in hand
-            if hand.count(card) < combo.count(card):
-                return False
-        return True
 
+def score_melds(counts: Sequence[int], trump: Suit) -> int:
+    """Total meld points of a count vector, without building the meld list."""
+    t = SUIT_INDEX[trump] * 6
+    total = 10 * counts[t + _NINE]
 
-# Define melds
+    four_marriages = True
+    for base in _SUIT_BASES:
+        pairs = min(counts[base + _KING], counts[base + _QUEEN])
+        if pairs == 0:
+            four_marriages = False
+        if base != t:
+            total += 20 * pairs
+
+    for rank, _, single, _, double in _AROUND_MELDS:
+        around = min(counts[rank], counts[6 + rank], counts[12 + rank], counts[18 + rank])
+        if around:
+            total += single
+            if around >= 2:
+                total += double
+
+    if four_marriages:
+        total += 240
+
+    pinochles = min(counts[_QUEEN_OF_SPADES], counts[_JACK_OF_DIAMONDS])
+    if pinochles >= 2:
+        total += 300
+    elif pinochles == 1:
+        total += 40
+
+    families = min(counts[t + _ACE], counts[t + _TEN], counts[t + _KING], counts[t + _QUEEN], counts[t + _JACK])
+    if families >= 2:
+        total += 1500
+    elif families == 1:
+        total += 150
+        if counts[t + _KING] >= 2 or counts[t + _QUEEN] >= 2:
+            total += 40
+    else:
+        total += 40 * min(counts[t + _KING], counts[t + _QUEEN])
+
+    return total
+
+
+def find_melds(counts: Sequence[int], trump: Suit) -> Tuple[int, List[list]]:
+    """Total meld points of a count vector and the melds found, as [MeldType, points, cards] lists."""
+    t = SUIT_INDEX[trump] * 6
+    melds = []
+
+    for _ in range(counts[t + _NINE]):
+        melds.append([MeldType.NINE, 10, [CARDS[t + _NINE]]])
+
+    for base in _SUIT_BASES:
+        if base != t:
+            for _ in range(min(counts[base + _KING], counts[base + _QUEEN])):
+                melds.append([MeldType.MARRIAGE, 20, [CARDS[base + _KING], CARDS[base + _QUEEN]]])
+
+    for rank, single_type, single, double_type, double in _AROUND_MELDS:
+        around = min(counts[rank], counts[6 + rank], counts[12 + rank], counts[18 + rank])
+        if around:
+            melds.append([single_type, single, [CARDS[base + rank] for base in _SUIT_BASES]])
+            if around >= 2:
+                melds.append([double_type, double, [CARDS[base + rank] for _ in range(2) for base in _SUIT_BASES]])
+
+    if all(counts[base + _KING] and counts[base + _QUEEN] for base in _SUIT_BASES):
+        melds.append([MeldType.FOURMARRIAGE, 240,
+                      [CARDS[base + rank] for base in _SUIT_BASES for rank in (_KING, _QUEEN)]])
+
+    pinochle = [CARDS[_QUEEN_OF_SPADES], CARDS[_JACK_OF_DIAMONDS]]
+    pinochles = min(counts[_QUEEN_OF_SPADES], counts[_JACK_OF_DIAMONDS])
+    if pinochles >= 2:
+        melds.append([MeldType.DOUBLEPINOCHLE, 300, pinochle * 2])
+    elif pinochles == 1:
+        melds.append([MeldType.PINOCHLE, 40, pinochle])
+
+    family = [CARDS[t + rank] for rank in (_ACE, _TEN, _KING, _QUEEN, _JACK)]
+    families = min(counts[code] for code in range(t, t + _NINE))
+    if families >= 2:
+        melds.append([MeldType.DOUBLEFAMILY, 1500, [card for card in family for _ in range(2)]])
+    elif families == 1:
+        melds.append([MeldType.FAMILY, 150, family])
+        if counts[t + _KING] >= 2:
+            melds.append([MeldType.POLYGAMY, 40, [CARDS[t + _KING]] * 2])
+        elif counts[t + _QUEEN] >= 2:
+            melds.append([MeldType.POLYGAMY, 40, [CARDS[t + _QUEEN]] * 2])
+    else:
+        for _ in range(min(counts[t + _KING], counts[t + _QUEEN])):
+            melds.append([MeldType.TRUMPMARRAGE, 40, [CARDS[t + _KING], CARDS[t + _QUEEN]]])
+
+    return sum(meld[1] for meld in melds), melds
+
+
+def shown_counts(counts: Sequence[int], trump: Suit) -> List[int]:
+    """Copies of each card (by code) a hand shows when its meld is laid down.
+
+    The melds are those of find_melds, without building them. A card can be part of
+    several melds (the King of trump in a family and in polygamy), so it is shown
+    as many times as the one meld needing the most copies of it.
+    """
+    t = SUIT_INDEX[trump] * 6
+    shown = [0] * len(CARDS)
+    shown[t + _NINE] = counts[t + _NINE]
+
+    for base in _SUIT_BASES:
+        if base != t:
+            shown[base + _KING] = shown[base + _QUEEN] = min(counts[base + _KING], counts[base + _QUEEN])
+    if all(counts[base + _KING] and counts[base + _QUEEN] for base in _SUIT_BASES):
+        for base in _SUIT_BASES:
+            shown[base + _KING] = max(shown[base + _KING], 1)
+            shown[base + _QUEEN] = max(shown[base + _QUEEN], 1)
+
+    for rank, _, _, _, _ in _AROUND_MELDS:
+        around = min(counts[base + rank] for base in _SUIT_BASES)
+        if around:
+            for base in _SUIT_BASES:
+                shown[base + rank] = max(shown[base + rank], around)
+
+    pinochles = min(counts[_QUEEN_OF_SPADES], counts[_JACK_OF_DIAMONDS])
+    shown[_QUEEN_OF_SPADES] = max(shown[_QUEEN_OF_SPADES], pinochles)
+    shown[_JACK_OF_DIAMONDS] = max(shown[_JACK_OF_DIAMONDS], pinochles)
+
+    families = min(counts[code] for code in range(t, t + _NINE))
+    if families:
+        for code in range(t, t + _NINE):
+            shown[code] = max(shown[code], families)
+        if families == 1:
+            if counts[t + _KING] >= 2:
+                shown[t + _KING] = 2
+            elif counts[t + _QUEEN] >= 2:
+                shown[t + _QUEEN] = 2
+    else:
+        marriages = min(counts[t + _KING], counts[t + _QUEEN])
+        shown[t + _KING] = max(shown[t + _KING], marriages)
+        shown[t + _QUEEN] = max(shown[t + _QUEEN], marriages)
+
+    return shown
+
+
+def score_melds_batch(counts: np.ndarray, trump: Suit) -> np.ndarray:
+    """Meld points for many hands at once. counts has shape (N, 24); returns N totals."""
+    counts = np.asarray(counts, dtype=np.int32)
+    t = SUIT_INDEX[trump] * 6
+    total = 10 * counts[:, t + _NINE]
+
+    kings = counts[:, [base + _KING for base in _SUIT_BASES]]
+    queens = counts[:, [base + _QUEEN for base in _SUIT_BASES]]
+    pairs = np.minimum(kings, queens)
+    non_trump = [i for i, base in enumerate(_SUIT_BASES) if base != t]
+    total += 20 * pairs[:, non_trump].sum(axis=1)
+    total += 240 * (pairs.min(axis=1) > 0)
+
+    for rank, _, single, _, double in _AROUND_MELDS:
+        around = counts[:, [base + rank for base in _SUIT_BASES]].min(axis=1)
+        total += single * (around >= 1) + double * (around >= 2)
+
+    pinochles = np.minimum(counts[:, _QUEEN_OF_SPADES], counts[:, _JACK_OF_DIAMONDS])
+    total += np.where(pinochles >= 2, 300, np.where(pinochles == 1, 40, 0))
+
+    families = counts[:, t:t + _NINE].min(axis=1)
+    polygamy = (counts[:, t + _KING] >= 2) | (counts[:, t + _QUEEN] >= 2)
+    trump_marriages = np.minimum(counts[:, t + _KING], counts[:, t + _QUEEN])
+    total += np.where(families >= 2, 1500,
+                      np.where(families == 1, 150 + 40 * polygamy, 40 * trump_marriages))
+
+    return total
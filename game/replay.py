@@ -0,0 +1,191 @@
+from typing import Iterator, List, Optional, Tuple
+from .event_log import Event, MAGIC, DEAL, BID, TRUMP, PASS, MELD, PLAY, TRICK, decode
+from .game_state import GameState
+from .hand import Hand
+import mmap
+import os
+import struct
+import numpy as np
+
+TRICKS = 12
+NO_OFFSET = 0xFFFF  # The game never reached that trick
+
+INDEX_MAGIC = b"PNIX"
+INDEX_VERSION = 1
+_INDEX_HEADER = struct.Struct("<4sIQQ")  # magic, version, log bytes indexed, games
+INDEX_HEADER_SIZE = 32
+
+# One row per game: where its DEAL record starts, and where each trick starts
+# (offset of its first card, relative to the game) with one more for the end of play
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("tricks", "<u2", (TRICKS + 1,))])
+
+
+def _scan(data, start: int, stop: int) -> Iterator[Tuple[int, int]]:
+    """(offset, kind) of every whole record between start and stop."""
+    pos = start
+    while pos + 3 <= stop:
+        end = pos + 3 + data[pos + 2]
+        if end > stop:
+            break
+        yield pos, data[pos]
+        pos = end
+
+
+class Replay:
+    """Random access to the games in an event log.
+
+    The log is read through mmap. A side index (<log>.idx) holds the offset of every
+    game and of every trick inside it, so game_state(game, trick) only decodes the
+    few dozen records of that one game. The index is built on first use and extended
+    when the log has grown since.
+    """
+    def __init__(self, log_path: str, index_path: Optional[str] = None):
+        self.log_path = log_path
+        self.index_path = index_path if index_path is not None else log_path + ".idx"
+        with open(log_path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a game event log")
+        self.index = self._load_index()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def _load_index(self) -> np.ndarray:
+        indexed, games = len(MAGIC), 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                header = f.read(INDEX_HEADER_SIZE)
+            magic, version, size, count = _INDEX_HEADER.unpack_from(header.ljust(INDEX_HEADER_SIZE, b"\0"))
+            if (magic, version) == (INDEX_MAGIC, INDEX_VERSION) and size <= len(self.data):
+                indexed, games = size, count
+
+        if indexed < len(self.data):
+            if games:
+                # The last indexed game may have been written to since; index it again
+                games -= 1
+                indexed = int(self._read_rows(games, 1)[0]["offset"])
+            games = self._extend_index(games, indexed)
+
+        if not games:
+            return np.zeros(0, dtype=INDEX_DTYPE)
+        return np.memmap(self.index_path, dtype=INDEX_DTYPE, mode="r", offset=INDEX_HEADER_SIZE, shape=(games,))
+
+    def _read_rows(self, start: int, count: int) -> np.ndarray:
+        with open(self.index_path, "rb") as f:
+            f.seek(INDEX_HEADER_SIZE + start * INDEX_DTYPE.itemsize)
+            return np.frombuffer(f.read(count * INDEX_DTYPE.itemsize), dtype=INDEX_DTYPE)
+
+    def _index_rows(self, start: int, batch_size: int = 65536) -> Iterator[np.ndarray]:
+        """Index every game that starts at or after `start`, in batches of rows."""
+        rows = np.zeros(batch_size, dtype=INDEX_DTYPE)
+        count = 0
+        game_start = None
+        tricks = []
+        new_trick = True
+
+        def add_row():
+            rows[count]["offset"] = game_start
+            rows[count]["tricks"] = tricks[:TRICKS + 1] + [NO_OFFSET] * (TRICKS + 1 - len(tricks))
+
+        for pos, kind in _scan(self.data, start, len(self.data)):
+            if kind == DEAL:
+                if game_start is not None:
+                    add_row()
+                    count += 1
+                    if count == batch_size:
+                        yield rows
+                        rows = np.zeros(batch_size, dtype=INDEX_DTYPE)
+                        count = 0
+                game_start, tricks, new_trick = pos, [], True
+            elif game_start is None:
+                continue
+            elif kind == PLAY and new_trick:
+                tricks.append(pos - game_start)
+                new_trick = False
+            elif kind == TRICK:
+                new_trick = True
+                if len(tricks) == TRICKS:
+                    tricks.append(pos + 3 + self.data[pos + 2] - game_start)  # End of play
+        if game_start is not None:
+            add_row()
+            count += 1
+        yield rows[:count]
+
+    def _extend_index(self, games: int, start: int) -> int:
+        """Index the log from `start` on, after the first `games` rows. Returns the total."""
+        mode = "r+b" if games and os.path.exists(self.index_path) else "wb"
+        with open(self.index_path, mode) as f:
+            f.seek(INDEX_HEADER_SIZE + games * INDEX_DTYPE.itemsize)
+            for rows in self._index_rows(start):
+                f.write(rows.tobytes())
+                games += len(rows)
+            f.truncate()
+            # Header last, so an interrupted build is rebuilt next time
+            f.seek(0)
+            f.write(_INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(self.data), games)
+                    .ljust(INDEX_HEADER_SIZE, b"\0"))
+        return games
+
+    def _game_end(self, game: int) -> int:
+        return int(self.index[game + 1]["offset"]) if game + 1 < len(self.index) else len(self.data)
+
+    def events(self, game: int, stop: Optional[int] = None) -> List[Event]:
+        """Decoded events of a game, up to the absolute offset `stop` if given."""
+        start = int(self.index[game]["offset"])
+        end = self._game_end(game) if stop is None else stop
+        data = self.data
+        return [decode(kind, data[pos + 1], data[pos + 3:pos + 3 + data[pos + 2]])
+                for pos, kind in _scan(data, start, end)]
+
+    def game_state(self, game: int, trick: int = 0) -> GameState:
+        """Rebuild the GameState at the start of a trick (0-11, or 12 for the end of play).
+
+        Hands, bid, trump, trades, meld, played_cards and tricks_won are as they were
+        just before the trick's first card was played.
+        """
+        if not 0 <= game < len(self.index):
+            raise IndexError(f"No game {game} in the log ({len(self.index)} games)")
+        if not 0 <= trick <= TRICKS:
+            raise IndexError(f"Trick must be between 0 and {TRICKS}")
+        relative = int(self.index[game]["tricks"][trick])
+        if relative == NO_OFFSET:
+            raise IndexError(f"Game {game} did not reach trick {trick}")
+
+        game_state = GameState()
+        for event in self.events(game, int(self.index[game]["offset"]) + relative):
+            apply_event(game_state, event)
+        return game_state
+
+    def close(self) -> None:
+        self.index = None
+        self.data.close()
+
+
+def apply_event(game_state: GameState, event: Event) -> None:
+    """Update a GameState with one logged event, as if it happened in play."""
+    if event.kind == PLAY:
+        game_state.current_player = event.seat
+        game_state.player_hands[event.seat].remove_card(event.data)
+        game_state.play_card(event.data)
+    elif event.kind == TRICK:
+        game_state.complete_trick(event.seat)
+    elif event.kind == DEAL:
+        game_state.reset()
+        for cards in event.data:
+            hand = Hand()
+            for card in cards:
+                hand.add_card(card)
+            game_state.player_hands.append(hand)
+    elif event.kind == BID:
+        if event.data is not None:
+            game_state.place_bid(event.seat, event.data)
+    elif event.kind == TRUMP:
+        game_state.set_trump(event.data)
+        for hand in game_state.player_hands:
+            hand.add_meld_def(event.data)
+    elif event.kind == PASS:
+        to_seat, cards = event.data
+        game_state.pass_cards(event.seat, to_seat, cards)
+    elif event.kind == MELD:
+        game_state.player_hands[event.seat].meldPoints = event.data
@@ -0,0 +1,28 @@
+from typing import Optional
+import hashlib
+import random
+
+
+def derive_seed(run_seed: int, game_index: int) -> int:
+    """Seed for one game of a run.
+
+    Hashes the (run seed, game index) pair, so every game gets its own stream no
+    matter which worker plays it or in what order, and neighbouring indices do not
+    get related seeds. The result is the same on every machine and Python process.
+    """
+    data = f"{run_seed}:{game_index}".encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def game_rng(run_seed: int, game_index: int) -> random.Random:
+    """An independent random.Random for one game of a run."""
+    return random.Random(derive_seed(run_seed, game_index))
+
+
+def resolve(rng: Optional[random.Random]):
+    """The RNG to use: the one given, or the global random module.
+
+    Both have the same shuffle/choice/randint/uniform/random methods, so callers that
+    pass nothing keep the old behaviour of using the global random state.
+    """
+    return rng if rng is not None else random
@@ -0,0 +1,61 @@
+from typing import Dict, List, Optional, Tuple
+from .card import Card, Suit, Rank, CARDS, SUITS, RANKS, NUM_CARDS
+
+# Precomputed answers to "which card is stronger", shared by the rules (GameState) and
+# the computer players, so trick resolution and move ordering are table lookups.
+# Tables are indexed by card code (see game/card.py) and, where trump matters, keyed
+# by the trump suit, with None for a hand that has no trump yet.
+
+SUIT_SIZE = len(RANKS)
+
+# Strength of a rank inside its suit: Ace 5, Ten 4, King 3, Queen 2, Jack 1, Nine 0
+RANK_STRENGTH: Dict[Rank, int] = {rank: SUIT_SIZE - 1 - i for i, rank in enumerate(RANKS)}
+
+# The same by card code
+CARD_STRENGTH: Tuple[int, ...] = tuple(RANK_STRENGTH[card.rank] for card in CARDS)
+
+# Counters (A, 10, K) score a point each for the team taking the trick
+IS_COUNTER: Tuple[bool, ...] = tuple(card.rank in (Rank.ACE, Rank.TEN, Rank.KING) for card in CARDS)
+
+# Codes of the cards of the same suit that outrank each card, strongest first
+HIGHER: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(range(code - code % SUIT_SIZE, code)) for code in range(NUM_CARDS)
+)
+
+
+def _trick_strength(trump: Optional[Suit]) -> Tuple[int, ...]:
+    return tuple(CARD_STRENGTH[card.code] + (SUIT_SIZE if card.suit == trump else 0) for card in CARDS)
+
+
+# Per trump: strength ordinal of each card code, every trump above every other card
+STRENGTH: Dict[Optional[Suit], Tuple[int, ...]] = {trump: _trick_strength(trump) for trump in SUITS + (None,)}
+
+
+def _beats_matrix(trump: Optional[Suit]) -> Tuple[Tuple[bool, ...], ...]:
+    strength = STRENGTH[trump]
+    return tuple(
+        tuple((a.suit == b.suit or a.suit == trump) and strength[a.code] > strength[b.code] for b in CARDS)
+        for a in CARDS
+    )
+
+
+# Per trump: BEATS[trump][a][b] is True when card code a, played after b, takes the
+# trick from b while b is winning it. The winning card is always of the led suit or
+# trump, so the led suit doesn't need a dimension of its own. Of two equal cards the
+# one played first wins, so no card beats itself.
+BEATS: Dict[Optional[Suit], Tuple[Tuple[bool, ...], ...]] = {trump: _beats_matrix(trump) for trump in SUITS + (None,)}
+
+
+def beats(trump: Optional[Suit], card: Card, winning: Card) -> bool:
+    """Whether `card` takes the trick from `winning`, the card winning it so far."""
+    return BEATS[trump][card.code][winning.code]
+
+
+def winning_position(trick: List[Card], trump: Optional[Suit]) -> int:
+    """Position in `trick` of the card winning it."""
+    matrix = BEATS[trump]
+    best = 0
+    for position in range(1, len(trick)):
+        if matrix[trick[position].code][trick[best].code]:
+            best = position
+    return best
@@ -1,16 +1,44 @@
 #!/usr/bin/env python3
 
-from game.card import Card, Deck, Suit
-from game.hand import Hand
+from typing import Dict, Optional
+from game.card import Card, Deck, Suit, SUIT_INDEX
+from game.hand import Hand, HandOverlay
 from game.game_state import GameState
+from game.event_log import EventLog
+from game.flow import GameFlow, Decision, BIDDING, TRUMP, PASSING, PLAYING, BID, CHOOSE_TRUMP, PASS, PLAY
 from ai.player import Player
 from ai.bidHelper import BidHelper
 from ai.bidder import Bidder
 from ai.helperFunctions import *
+from ai.engine import computer_action, create_bidder, deal_hands
+from ai.passEstimator import estimate_pass_meld
+from ai.bidTable import default_table
+from game.rng import resolve
+from game import instrument
+from concurrent.futures import ProcessPoolExecutor
+import os
 import random
 
+# Process pool for the partner-pass simulation, started on first use and kept for the session
+_pass_pool: Optional[ProcessPoolExecutor] = None
 
-def main():
+
+def pass_pool() -> Optional[ProcessPoolExecutor]:
+    """The session's pass-simulation pool, or None to simulate inline on a single CPU."""
+    global _pass_pool
+    if _pass_pool is None and (os.cpu_count() or 1) > 1:
+        _pass_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _pass_pool
+
+
+def close_pass_pool() -> None:
+    global _pass_pool
+    if _pass_pool is not None:
+        _pass_pool.shutdown(wait=False, cancel_futures=True)
+        _pass_pool = None
+
+
+def main(log_path: Optional[str] = None):
     print("\033[94mWelcome to the Pinochle AI Tutor!\033[0m")
     print("\033[92mThis program will help you learn and improve your Pinochle game.\033[0m")
     
@@ -26,26 +54,24 @@ def main():
     deck = Deck()
     game_state = GameState()
     player = Player()
-
-    start_new_game(deck, game_state, player)
+    if log_path:
+        game_state.event_log = EventLog(log_path)
+
+    try:
+        start_new_game(deck, game_state, player)
+    finally:
+        game_state.event_log.close()
+        close_pass_pool()
     
-def start_new_game(deck: Deck, game_state: GameState, player: Player):
+def start_new_game(deck: Deck, game_state: GameState, player: Player, rng: Optional[random.Random] = None):
+    rng = resolve(rng)
+    instrument.phase("deal")
     print("\n\033[94mYou are Player 0. Player 2 is your partner. \nStarting a new game...\033[0m")
     print("\033[92mFirst, we'll deal the cards...\033[0m")
     input("Press Enter to continue...")
     
-    # Reset game state
-    game_state.__init__()
-    deck.shuffle()
-        
-    # Deal hands (3 cards at a time until each player has 12)
-    for _ in range(4):  
-        game_state.player_hands.append(Hand())  # Initialize hands
-
-    for _ in range(4):  # 4 rounds of dealing
-        for hand in game_state.player_hands:
-            for card in deck.draw_hand(3):
-                hand.add_card(card)
+    # Reset game state and deal hands (3 cards at a time until each player has 12)
+    deal_hands(deck, game_state, rng)
     
     print("\n\033[92mCards are passed out. Here is your hand:\033[0m")
     print("Look at your hand and evaluate if you want to bid or pass.")
@@ -55,75 +81,44 @@ def start_new_game(deck: Deck, game_state: GameState, player: Player):
     print("Don't worry, we will help you out with some stats.")
 
     input("\n\033[94mBefore we start the bidding phase, let's evaluate your cards.\033[0m")
+    instrument.phase("bidding")
 
-    bidders = []
-    for i in range(3):
-        # Create bidder for each computer 
-        helper = BidHelper(game_state.player_hands[i+1])
-        neededCards = helper.closest_family_suits()
-        
-        # Find best suit based on probability
-        best_suit = None
-        best_prob = 0
-        best_needed = None
-        
-        for suit, needed in zip(Suit, neededCards):
-            if len(needed) <= 4:  # Only consider suits where we can get all needed cards
-                prob = helper.calculate_hypergeometric_probability(needed, len(needed))
-                if prob > best_prob:
-                    best_prob = prob
-                    best_suit = suit
-                    best_needed = needed
-        
-        if best_suit is not None:
-            # Calculate minimum bid (current meld + tricks)
-            game_state.player_hands[i+1].add_meld_def(best_suit)
-            min_meld = game_state.player_hands[i+1].evaluate_melds()
-            min_tricks = helper.estimate_tricks(game_state.player_hands[i+1].cards, best_suit)
-            min_bid = min_meld + min_tricks
-            
-            # Calculate maximum bid (potential meld + tricks with needed cards)
-            max_meld = helper.create_bid_hand(best_suit, best_needed)
-            temp_hand = game_state.player_hands[i+1].cards + best_needed
-            max_tricks = helper.estimate_tricks(temp_hand, best_suit)
-            max_bid = max_meld + max_tricks
-            
-            # Generate bid based on probability
-            # If probability is 50% or higher, bias towards higher bids
-            if best_prob >= 0.5:
-                # Use a triangular distribution favoring higher bids
-                # The higher the probability, the more we favor the max bid
-                bid_range = max_bid - min_bid
-                # Scale probability to be between 0.5 and 1.0 for high probability cases
-                scaled_prob = 0.5 + (best_prob - 0.5) * 0.5
-                # Generate bid with bias towards max_bid
-                bid = int(min_bid + bid_range * (1 - (1 - scaled_prob) ** 2))
-            else:
-                # For lower probabilities, be more conservative
-                # Scale probability to be between 0 and 0.5
-                scaled_prob = best_prob * 0.5
-                # Generate bid with bias towards min_bid
-                bid = int(min_bid + (max_bid - min_bid) * scaled_prob)
-            
+    # Create bidder for each computer
+    bidders = {seat: create_bidder(game_state.player_hands[seat], rng) for seat in (1, 2, 3)}
 
-            if bid > 250:
-                bidders.append(Bidder(bid, best_suit))
-            else:
-                bidders.append(Bidder(250, best_suit))
+    suit_summary = show_bid_analysis(game_state, rng)
 
-        else:
-            bid = 0     
-            bidders.append(Bidder(250, Suit.CLUBS))   
+    print("\n________________________________________________________________________________")
+    print("\n\033[94mBidding Phase:\033[0m")
 
+    user_input = input("Type 'info' to read the basics on how Meld works, or press Enter to skip to bidding: ").strip().lower()
 
+    if user_input == "info":
+        print_meld_phase_rules()
+        input("\nPress Enter to start the game...")
+
+    # Take random number for who will open
+    game = TutorGame(GameFlow(game_state, rng.randint(0, 3), detailed_meld=True), bidders, suit_summary, rng)
+    game.run()
+
+
+def show_bid_analysis(game_state: GameState, rng: random.Random) -> str:
+    """Walk the player through the odds and suggested bids for each suit. Returns a
+    one-line-per-suit summary to show again when picking trump."""
     helper = BidHelper(game_state.player_hands[0])
     neededCards = helper.closest_family_suits()
+    bid_table = default_table()  # Precomputed odds and best-case meld, see ai/bidTable.py
+
+    # Simulate what the partner could pass for every suit (takes about a second)
+    pass_estimates = estimate_pass_meld(game_state.player_hands[0], time_budget=1.0, seed=rng.getrandbits(64),
+                                        executor=pass_pool())
 
     # Create a summary string for later use
     suit_summary = ""
 
     # Loop through the suits in the enum
     for suit, needed in zip(Suit, neededCards):
+        likely, best_meld = bid_table.recommend(helper, suit)
         print(f"\n\033[93mAnalyzing {suit.value}  :\033[0m")
         if len(needed) > 4:
             print(f"\033[91mFor {suit.value}   you need more than 4 cards to get a family. Your partner can only pass 4 cards. It would be hard to make a high bid in this suit without a family.\033[0m")
@@ -132,13 +127,12 @@ def start_new_game(deck: Deck, game_state: GameState, player: Player):
             print(f"\033[92mFor {suit.value}  , you already have all the cards needed for a family!\033[0m")
             suit_summary += f"{suit.value}  : Have all needed cards\n"
         else:
-            likely = helper.calculate_hypergeometric_probability(needed, len(needed))
             print(f"\033[94mLikelihood of getting the cards you need in {suit.value}  is {likely * 100:.2f}%\033[0m")
             print(f"You are missing {needed}")
             suit_summary += f"{suit.value}  : {likely * 100:.2f}% - Missing {needed}\n"
             print(f"\nIf you went into this suit and didn't get any cards here is what will happen...")
             game_state.player_hands[0].add_meld_def(suit)
-            meld = game_state.player_hands[0].evaluate_melds()
+            meld = game_state.player_hands[0].evaluate_melds(detailed=False)
             print(f"The most you can make on your current meld is {meld}")
             tricks = helper.estimate_tricks(game_state.player_hands[0].cards, suit)
             print(f"We calculate the tricks you will be able to win will total {tricks} points.")
@@ -146,46 +140,62 @@ def start_new_game(deck: Deck, game_state: GameState, player: Player):
             print()
 
             print("\nIf you went into this suit and got all the cards you need, here is what will happen...")
-            meld = helper.create_bid_hand(suit, needed)
+            meld = best_meld
             print(f"The most you can make on your current meld is {meld}")
-            temp = game_state.player_hands[0].cards + needed
-            tricks = helper.estimate_tricks(temp, suit)
+            tricks = helper.estimate_tricks(HandOverlay(game_state.player_hands[0], added=needed), suit)
             print(f"We calculate the tricks you will be able to win will total {tricks} points.")
             print(f"We will add 40 points for potential points your partner will make in Meld \n(This is just a set number, not a calculation.)")
             print(f"\nTherefore the largest bid we suggest you bid is {meld + tricks + 40}. \nBut remember there is only a {likely * 100:.2f}% chance that you will get this!")
 
+            estimate = pass_estimates[suit]
+            print(f"\nWe also simulated {estimate.samples} hands your partner could have and the cards they would pass you.")
+            print(f"On average your meld after the pass would be {estimate.mean():.0f} (usually between {estimate.percentile(0.1)} and {estimate.percentile(0.9)}).")
+
             print()
 
         input("\nPress Enter to continue to next suit...")
 
-    print("\n________________________________________________________________________________")
-    print("\n\033[94mBidding Phase:\033[0m")
-
-    user_input = input("Type 'info' to read the basics on how Meld works, or press Enter to skip to bidding: ").strip().lower()
-
-    if user_input == "info":
-        print_meld_phase_rules()
-        input("\nPress Enter to start the game...")
-
-    # Take random number for who will open
-    current_player = random.randint(0, 3)
-
-    print("\n\033[94mA random number was picked to choose who will open.\033[0m")
-    print("Usually this is the person to the left of the dealer.")
-    current_bid = 250
-    passes = {0: False, 1: False, 2: False, 3: False}
-
-    if current_player == 0:
-        print("\033[92mYou were randomly picked to open.\033[0m")
-    print(f"\n\033[93mPlayer {current_player} has to open at 250\033[0m")
-    game_state.place_bid(current_player, current_bid)
-    input("\nPress Enter to continue with bidding...")
-
-    while list(passes.values()).count(True) < 3:
-        current_player = (current_player + 1) % 4
-
-        if passes[current_player]:
-            continue
+    return suit_summary
+
+
+class TutorGame:
+    """Drives a GameFlow from the command line: the player answers seat 0's decisions,
+    the computer players answer the rest, and every step is explained along the way.
+    """
+    def __init__(self, flow: GameFlow, bidders: Dict[int, Bidder], suit_summary: str, rng: random.Random):
+        self.flow = flow
+        self.game_state = flow.game_state
+        self.bidders = bidders
+        self.suit_summary = suit_summary
+        self.rng = rng
+        self.round = 0
+        self.turns = {BID: self.bid_turn, CHOOSE_TRUMP: self.trump_turn, PASS: self.pass_turn, PLAY: self.play_turn}
+        self.phase_ends = {BIDDING: self.end_bidding, TRUMP: self.end_trump, PASSING: self.end_trading, PLAYING: self.end_game}
+
+    def run(self) -> None:
+        opener = self.flow.opener
+        print("\n\033[94mA random number was picked to choose who will open.\033[0m")
+        print("Usually this is the person to the left of the dealer.")
+        if opener == 0:
+            print("\033[92mYou were randomly picked to open.\033[0m")
+        print(f"\n\033[93mPlayer {opener} has to open at 250\033[0m")
+        input("\nPress Enter to continue with bidding...")
+
+        decision = self.flow.pending_decision()
+        while decision is not None:
+            phase = self.flow.phase
+            self.turns[decision.kind](decision)
+            if self.flow.phase != phase:
+                self.phase_ends[phase]()
+            decision = self.flow.pending_decision()
+
+    def computer_action(self, decision: Decision):
+        return computer_action(self.game_state, decision, self.bidders, self.rng)
+
+    def bid_turn(self, decision: Decision) -> None:
+        game_state = self.game_state
+        current_player = decision.seat
+        current_bid = game_state.current_bid
 
         if current_player == 0:
             print("\n\033[92mYour turn to bid.\033[0m")
@@ -200,7 +210,7 @@ def start_new_game(deck: Deck, game_state: GameState, player: Player):
             while True:
                 bid_input = input("\nEnter your bid (or 'pass'): ").lower()
                 if bid_input == 'pass':
-                    passes[current_player] = True
+                    self.flow.apply(None)
                     print("\033[91mYou passed.\033[0m")
                     input("\nPress Enter to continue...")
                     break
@@ -211,270 +221,203 @@ def start_new_game(deck: Deck, game_state: GameState, player: Player):
                     print("\033[91mInvalid input. Please enter a number or 'pass'.\033[0m")
                     continue
 
-                if bid < current_bid + 10:
-                    print(f"\033[91mBid must be at least {current_bid + 10}\033[0m")
+                if bid < decision.minimum:
+                    print(f"\033[91mBid must be at least {decision.minimum}\033[0m")
                     continue
 
-                if game_state.place_bid(current_player, bid):
-                    current_bid = bid
-                    break
-                else:
-                    print("\033[91mInvalid bid. Please try again.\033[0m")
-                    continue
+                self.flow.apply(bid)
+                break
+            return
 
-        elif current_player == 2:
+        color = "\033[92m" if current_player == 2 else "\033[91m"
+        if current_player == 2:
             print(f"\n\033[92mPlayer {current_player}'s turn to bid (your partner)\033[0m")
-            input("Press Enter to see their bid...")
-            bid_input = bidders[current_player - 1].get_next_bid(current_bid)
-
-            if bid_input == 'pass':
-                passes[current_player] = True
-                print(f"\n\033[91mPlayer {current_player} passed. \n(Remember, this is your partner—losing the bid gives it to the other team.)\033[0m")
-                input("\nPress Enter to continue...")
-                continue
-
-            bid = int(bid_input)
-            if bid < current_bid + 10:
-                print(f"\033[91mPlayer {current_player} attempted to bid below {current_bid + 10}. Passing instead.\033[0m")
-                passes[current_player] = True
-                input("\nPress Enter to continue...")
-                continue
-
-            if game_state.place_bid(current_player, bid):
-                current_bid = bid
-                print(f"\n\033[92mPlayer {current_player} placed a bid of {current_bid}.\033[0m")
-                input("\nPress Enter to continue...")
-            else:
-                print(f"\033[91mError with Player {current_player}'s bid\033[0m")
-
         else:
             print(f"\n\033[91mPlayer {current_player}'s turn to bid.\033[0m")
-            input("Press Enter to see their bid...")
-            bid_input = bidders[current_player - 1].get_next_bid(current_bid)
+        input("Press Enter to see their bid...")
+        bid = self.computer_action(decision)
+        self.flow.apply(bid)
 
-            if bid_input == 'pass':
-                passes[current_player] = True
-                print(f"\033[91mPlayer {current_player} passed.\033[0m")
-                input("\nPress Enter to continue...")
-                continue
-
-            bid = int(bid_input)
-            if bid < current_bid + 10:
-                print(f"\033[91mPlayer {current_player} attempted to bid below {current_bid + 10}. Passing instead.\033[0m")
-                passes[current_player] = True
-                input("\nPress Enter to continue...")
-                continue
-
-            if game_state.place_bid(current_player, bid):
-                current_bid = bid
-                print(f"\033[91mPlayer {current_player} placed a bid of {current_bid}.\033[0m")
-                input("\nPress Enter to continue...")
+        if bid is None:
+            if current_player == 2:
+                print(f"\n\033[91mPlayer {current_player} passed. \n(Remember, this is your partner—losing the bid gives it to the other team.)\033[0m")
             else:
-                print(f"\033[91mError with Player {current_player}'s bid\033[0m")
-
-    # Announce winner
-    print("\n\033[94mBidding phase complete.\033[0m")
-    print(f"\033[92mPlayer {game_state.winning_bidder} wins the bid at {current_bid}.\033[0m")
-    input("\nPress Enter to continue to trump selection...")
-
-    if game_state.winning_bidder == 0:
-        print(f"\n\033[92mCongratulations, you won the bid!\033[0m")
-        print("\033[91mBut now comes the hard part. You need to be careful, if you don't make your bid it will now be subtracted from your score.\033[0m")
-        print("For a reminder, here is what you need to do in each suit:")
-        print(suit_summary)
-        input("\nPress Enter to select trump...")
-        
-        # Trump selection
-        print("\n\033[93mTrump Selection:\033[0m")
-        print("0. ♠️  Spades")
-        print("1. ♥️  Hearts")
-        print("2. ♣️  Clubs")
-        print("3. ♦️  Diamonds")
-        
-        while True:
-            try:
-                trump_choice = int(input("\nSelect trump suit (0-3): "))
-                if 0 <= trump_choice <= 3:
-                    game_state.set_trump(list(Suit)[trump_choice])
-                    break
-                print("\033[91mInvalid choice. Please try again.\033[0m")
-            except ValueError:
-                print("\033[91mPlease enter a number between 0 and 3\033[0m")
- 
-    elif game_state.winning_bidder == 2:
-        print(f"\n\033[92mCongratulations, your partner won the bid. In this situation it's now your job to back them up!\033[0m")
-        input("\nPress Enter to see what trump suit they chose...")
-        game_state.set_trump(bidders[1].best_suit)
-    else:
-        print("\n\033[91mSadly the other team won the bid, your job now is to get as many points as you can and try to stop the other team from making their bid.\033[0m")
-        input("\nPress Enter to see what trump suit they chose...")
-        game_state.set_trump(bidders[game_state.winning_bidder - 1].best_suit)
-
-    print(f"\n\033[93mTrump suit chosen is {game_state.trump_suit.value}\033[0m")
-    input("\nPress Enter to continue to the trading phase...")
+                print(f"\033[91mPlayer {current_player} passed.\033[0m")
+        else:
+            print(f"\n{color}Player {current_player} placed a bid of {bid}.\033[0m")
+        input("\nPress Enter to continue...")
 
-    # Put Trump for each hand
-    game_state.player_hands[0].add_meld_def(game_state.trump_suit)
-    game_state.player_hands[1].add_meld_def(game_state.trump_suit)
-    game_state.player_hands[2].add_meld_def(game_state.trump_suit)
-    game_state.player_hands[3].add_meld_def(game_state.trump_suit)
+    def end_bidding(self) -> None:
+        # Announce winner
+        print("\n\033[94mBidding phase complete.\033[0m")
+        print(f"\033[92mPlayer {self.game_state.winning_bidder} wins the bid at {self.game_state.current_bid}.\033[0m")
+        input("\nPress Enter to continue to trump selection...")
+        instrument.phase("trump")
+
+    def trump_turn(self, decision: Decision) -> None:
+        if decision.seat == 0:
+            print(f"\n\033[92mCongratulations, you won the bid!\033[0m")
+            print("\033[91mBut now comes the hard part. You need to be careful, if you don't make your bid it will now be subtracted from your score.\033[0m")
+            print("For a reminder, here is what you need to do in each suit:")
+            print(self.suit_summary)
+            input("\nPress Enter to select trump...")
+
+            # Trump selection
+            print("\n\033[93mTrump Selection:\033[0m")
+            print("0. ♠️  Spades")
+            print("1. ♥️  Hearts")
+            print("2. ♣️  Clubs")
+            print("3. ♦️  Diamonds")
 
-    print("\n________________________________________________________________________________")
-    print("\n\033[94mTrading Phase:\033[0m")
+            while True:
+                try:
+                    trump_choice = int(input("\nSelect trump suit (0-3): "))
+                    if 0 <= trump_choice <= 3:
+                        self.flow.apply(list(Suit)[trump_choice])
+                        break
+                    print("\033[91mInvalid choice. Please try again.\033[0m")
+                except ValueError:
+                    print("\033[91mPlease enter a number between 0 and 3\033[0m")
+            return
 
-    user_input = input("Type 'info' to read the basics tips and tricks on trading, or press Enter to skip to trading: ").strip().lower()
+        if decision.seat == 2:
+            print(f"\n\033[92mCongratulations, your partner won the bid. In this situation it's now your job to back them up!\033[0m")
+        else:
+            print("\n\033[91mSadly the other team won the bid, your job now is to get as many points as you can and try to stop the other team from making their bid.\033[0m")
+        input("\nPress Enter to see what trump suit they chose...")
+        self.flow.apply(self.computer_action(decision))
 
-    if user_input == "info":
-        print_passing_rules()
-        input("Press Enter to begin trading...")
+    def end_trump(self) -> None:
+        print(f"\n\033[93mTrump suit chosen is {self.game_state.trump_suit.value}\033[0m")
+        input("\nPress Enter to continue to the trading phase...")
+        instrument.phase("trading")
 
-    if game_state.winning_bidder == 0:
-        # Player 2 passes to Player 0 (user)
-        print("\n\033[92mWaiting for your partner's cards...\033[0m")
-        input("Press Enter to see what cards they're passing you...")
-        
-        cards = choose_cards_to_pass(game_state.player_hands[2], game_state.trump_suit)
-        print("\n\033[92mYour partner (Player 2) is passing you these cards:\033[0m")
-        for card in cards:
-            print(f"  - {card}")
-            game_state.player_hands[2].remove_card(card)
-            game_state.player_hands[0].add_card(card)
-
-        input("\nPress Enter to see your updated hand...")
-        print("\n\033[92mYour hand after receiving partner's cards:\033[0m")
-        print(game_state.player_hands[0])
-        
-        # Recommend cards to pass back
-        recommended = choose_cards_to_pass_back(game_state.player_hands[0], game_state.trump_suit)
-        print("\n\033[92m--- Now it's your turn to pass back cards ---\033[0m")
-        cards = prompt_user_to_pass_cards(game_state.player_hands[0], recommended)
-        for card in cards:
-            game_state.player_hands[0].remove_card(card)
-            game_state.player_hands[2].add_card(card)
-
-    elif game_state.winning_bidder == 2:
-        # Player 0 (user) passes cards to Player 2
-        recommended = choose_cards_to_pass(game_state.player_hands[0], game_state.trump_suit)
-        print("\n\033[92m--- Your partner won the bid ---\033[0m")
-        print("\033[92m--- Choose cards to pass to your partner (Player 2) ---\033[0m")
-        cards = prompt_user_to_pass_cards(game_state.player_hands[0], recommended)
-        for card in cards:
-            game_state.player_hands[0].remove_card(card)
-            game_state.player_hands[2].add_card(card)
+        print("\n________________________________________________________________________________")
+        print("\n\033[94mTrading Phase:\033[0m")
 
-        print("\n\033[92mWaiting for your partner's cards...\033[0m")
-        input("Press Enter to see what cards they're passing back...")
+        user_input = input("Type 'info' to read the basics tips and tricks on trading, or press Enter to skip to trading: ").strip().lower()
 
-        # Partner (Player 2) sends cards back
-        cards = choose_cards_to_pass_back(game_state.player_hands[2], game_state.trump_suit)
-        print("\n\033[92mYour partner is passing these cards back to you:\033[0m")
-        for card in cards:
-            print(f"  - {card}")
-            game_state.player_hands[2].remove_card(card)
-            game_state.player_hands[0].add_card(card)
+        if user_input == "info":
+            print_passing_rules()
+            input("Press Enter to begin trading...")
 
-        print("\n\033[92mYour final hand after trading:\033[0m")
-        print(game_state.player_hands[0])
-        input("\nPress Enter to continue...")
+    def pass_turn(self, decision: Decision) -> None:
+        game_state = self.game_state
+        passing_back = decision.seat == game_state.winning_bidder
 
-    elif game_state.winning_bidder == 3:
-        print("\n\033[91mPlayers 1 and 3 are trading cards...\033[0m")
-        input("Press Enter to continue...")
-        # Player 1 passes cards to player 3
-        cards = choose_cards_to_pass(game_state.player_hands[1], game_state.trump_suit)
-        for card in cards:
-            game_state.player_hands[1].remove_card(card)
-            game_state.player_hands[3].add_card(card)
+        if decision.seat == 0:
+            hand = game_state.player_hands[0]
+            if passing_back:
+                recommended = choose_cards_to_pass_back(hand, game_state.trump_suit)
+                print("\n\033[92m--- Now it's your turn to pass back cards ---\033[0m")
+            else:
+                recommended = choose_cards_to_pass(hand, game_state.trump_suit)
+                print("\n\033[92m--- Your partner won the bid ---\033[0m")
+                print("\033[92m--- Choose cards to pass to your partner (Player 2) ---\033[0m")
+            while True:
+                try:
+                    self.flow.apply(prompt_user_to_pass_cards(hand, recommended))
+                    break
+                except ValueError as e:
+                    print(f"\033[91m{e}\033[0m")
+            return
 
-        cards = choose_cards_to_pass_back(game_state.player_hands[3], game_state.trump_suit)
-        for card in cards:
-            game_state.player_hands[3].remove_card(card)
-            game_state.player_hands[1].add_card(card)
-    elif game_state.winning_bidder == 1:
-        print("\n\033[91mPlayers 1 and 3 are trading cards...\033[0m")
-        input("Press Enter to continue...")
-        # Player 3 passes cards to player 1
-        cards = choose_cards_to_pass(game_state.player_hands[3], game_state.trump_suit)
-        for card in cards:
-            game_state.player_hands[3].remove_card(card)
-            game_state.player_hands[1].add_card(card)
+        if decision.to_seat != 0:
+            if not passing_back:
+                print(f"\n\033[91mPlayers {decision.seat} and {decision.to_seat} are trading cards...\033[0m")
+                input("Press Enter to continue...")
+            self.flow.apply(self.computer_action(decision))
+            return
 
-        cards = choose_cards_to_pass_back(game_state.player_hands[1], game_state.trump_suit)
+        # Partner (Player 2) passes to the user
+        print("\n\033[92mWaiting for your partner's cards...\033[0m")
+        if passing_back:
+            input("Press Enter to see what cards they're passing back...")
+        else:
+            input("Press Enter to see what cards they're passing you...")
+        cards = self.computer_action(decision)
+        if passing_back:
+            print("\n\033[92mYour partner is passing these cards back to you:\033[0m")
+        else:
+            print("\n\033[92mYour partner (Player 2) is passing you these cards:\033[0m")
         for card in cards:
-            game_state.player_hands[1].remove_card(card)
-            game_state.player_hands[3].add_card(card)
-
-    print("\n________________________________________________________________________________")
-    print("\n\033[94mMeld Phase:\033[0m")
-    input("Press Enter to count your meld...")
-
-    points = game_state.player_hands[0].evaluate_melds()
-    print("\n\033[92mLet's count your meld:\033[0m ")
-
-    for meld in game_state.player_hands[0].melds:
-        name, points, cards = meld
-        print(f"\t\033[93m{name.name.capitalize()}:\033[0m")
-        print(f"\t{cards} for {points} points.\n")
-    
-    print(f"\t\033[92mTotal: {game_state.player_hands[0].meldPoints}\033[0m")
-    input("\nPress Enter to see Player 1's meld...")
-
-    print("\n\033[91mNow let's total Player 1's meld:\033[0m")
-    points = game_state.player_hands[1].evaluate_melds()
-
-    for meld in game_state.player_hands[1].melds:
-        name, points, cards = meld
-        print(f"\t\033[93m{name.name.capitalize()}:\033[0m")
-        print(f"\t{cards} for {points} points.\n")
-    
-    print(f"\t\033[91mTotal: {game_state.player_hands[1].meldPoints}\033[0m")
-    input("\nPress Enter to see Player 2's meld...")
+            print(f"  - {card}")
+        self.flow.apply(cards)
 
-    print("\n\033[92mNow let's total Player 2's meld:\033[0m")
-    points = game_state.player_hands[2].evaluate_melds()
+        if passing_back:
+            print("\n\033[92mYour final hand after trading:\033[0m")
+            print(game_state.player_hands[0])
+            input("\nPress Enter to continue...")
+        else:
+            input("\nPress Enter to see your updated hand...")
+            print("\n\033[92mYour hand after receiving partner's cards:\033[0m")
+            print(game_state.player_hands[0])
 
-    for meld in game_state.player_hands[2].melds:
-        name, points, cards = meld
-        print(f"\t\033[93m{name.name.capitalize()}:\033[0m")
-        print(f"\t{cards} for {points} points.\n")
-    
-    print(f"\t\033[92mTotal: {game_state.player_hands[2].meldPoints}\033[0m")
-    input("\nPress Enter to see Player 3's meld...")
+    def end_trading(self) -> None:
+        game_state = self.game_state
+        instrument.phase("meld")
+        print("\n________________________________________________________________________________")
+        print("\n\033[94mMeld Phase:\033[0m")
+        input("Press Enter to count your meld...")
+
+        # GameFlow counted everyone's meld when the trading finished
+        for seat in range(4):
+            color = "\033[92m" if seat % 2 == 0 else "\033[91m"
+            if seat == 0:
+                print("\n\033[92mLet's count your meld:\033[0m ")
+            else:
+                print(f"\n{color}Now let's total Player {seat}'s meld:\033[0m")
 
-    print("\n\033[91mNow let's total Player 3's meld:\033[0m")
-    points = game_state.player_hands[3].evaluate_melds()
+            for meld in game_state.player_hands[seat].melds:
+                name, points, cards = meld
+                print(f"\t\033[93m{name.name.capitalize()}:\033[0m")
+                print(f"\t{cards} for {points} points.\n")
 
-    for meld in game_state.player_hands[3].melds:
-        name, points, cards = meld
-        print(f"\t\033[93m{name.name.capitalize()}:\033[0m")
-        print(f"\t{cards} for {points} points.\n")
-    
-    print(f"\t\033[91mTotal: {game_state.player_hands[3].meldPoints}\033[0m")
-    input("\nPress Enter to begin playing tricks...")
+            print(f"\t{color}Total: {game_state.player_hands[seat].meldPoints}\033[0m")
+            if seat < 3:
+                input(f"\nPress Enter to see Player {seat + 1}'s meld...")
+        input("\nPress Enter to begin playing tricks...")
+        instrument.phase("play")
 
-    print("\n________________________________________________________________________________")
-    print("\n\033[94mPlaying Phase:\033[0m")
+        print("\n________________________________________________________________________________")
+        print("\n\033[94mPlaying Phase:\033[0m")
 
-    user_input = input("Type 'info' to read the basics on how Playing Phase works, or press Enter to skip to Playing: ").strip().lower()
+        user_input = input("Type 'info' to read the basics on how Playing Phase works, or press Enter to skip to Playing: ").strip().lower()
 
-    if user_input == "info":
-        print_card_play_rules()
+        if user_input == "info":
+            print_card_play_rules()
 
-    cardsLeft = Deck()
-    # Initialize cardsLeft with all cards in the deck
-    # We'll remove cards as they're played
+        # Start with the winning bidder
+        print(f"\n\033[93mPlayer {game_state.winning_bidder} leads the first trick.\033[0m")
+        input("Press Enter to begin...")
 
-    def view_remaining_cards():
+    def view_remaining_cards(self) -> None:
+        game_state = self.game_state
         print("\n\033[94mRemaining cards in play:\033[0m")
         print("\033[93mTrump suit:\033[0m", game_state.trump_suit.value)
         print("\n\033[94mCards by suit:\033[0m")
         for suit in Suit:
-            suit_cards = [card for card in cardsLeft.cards if card.suit == suit]
+            suit_cards = game_state.tracker.remaining_in_suit(suit)
             if suit_cards:
                 print(f"{suit.value}  : {suit_cards}")
             else:
                 print(f"{suit.value}  : None")
-        
+
+        locations = game_state.locations[0] if game_state.locations else None
+        if locations is not None:
+            # Inferred from the plays, the pass and the meld (see game/inference.py)
+            print("\n\033[94mCards each player probably still holds, by suit:\033[0m")
+            print("       " + "".join(f"{f'Player {seat}':>10}" for seat in locations.others))
+            expected = locations.suit_expected()
+            for suit in Suit:
+                cells = ["out" if locations.shown_out(seat, suit)
+                         else f"{expected[SUIT_INDEX[suit], locations.column(seat)]:.1f}" for seat in locations.others]
+                print(f"{suit.value}  : " + "".join(f"{cell:>10}" for cell in cells))
+            for seat in locations.others:
+                known = locations.known_cards(seat)
+                if known:
+                    print(f"Player {seat} is known to hold {known}")
+
         print("\n\033[94mTricks won:\033[0m")
         print(f"\033[92mYour team (Players 0 & 2):\033[0m {game_state.tricks_won[0]}")
         print(f"\033[91mOpponent team (Players 1 & 3):\033[0m {game_state.tricks_won[1]}")
@@ -491,88 +434,72 @@ def start_new_game(deck: Deck, game_state: GameState, player: Player):
 
         input("\nPress Enter to continue...")
 
-    # Start with the winning bidder
-    current_player = game_state.winning_bidder
-    print(f"\n\033[93mPlayer {current_player} leads the first trick.\033[0m")
-    input("Press Enter to begin...")
-    
-    round = 0
-
-    # Continue until all cards are played
-    while any(len(hand.cards) > 0 for hand in game_state.player_hands):
-        round += 1
-        print(f"\n\033[94mRound {round}:\033[0m")
-        input("Press Enter to start this round...")
-        
-        # Clear the current trick
-        game_state.current_trick = []
-
-        for i in range(4):
-            player_idx = (current_player + i) % 4
-            hand = game_state.player_hands[player_idx]
-            game_state.current_player = player_idx
-
-            valid_cards = [card for card in hand.cards if game_state.is_valid_play(card)]
-
-            if not valid_cards:
-                print(f"\033[91mPlayer {player_idx} has no valid cards! Skipping turn.\033[0m")
-                continue
-
-            if player_idx == 0:
-                print("\n\033[92mYour turn! Choose a card to play:\033[0m")
-                print("\nYour hand:")
-                for idx, card in enumerate(hand.cards):
-                    print(f"{idx + 1}. {card}")
-                
-                while True:
-                    try:
-                        choice = input("\nEnter the number of the card to play (or 'view' to see remaining cards): ")
-                        if choice.lower() == 'view':
-                            view_remaining_cards()
-                            print("\n\033[92mYour turn! Choose a card to play:\033[0m")
-                            print("\nYour hand:")
-                            for idx, card in enumerate(hand.cards):
-                                print(f"{idx + 1}. {card}")
-                            continue
-                        choice = int(choice) - 1
-                        if 0 <= choice < len(hand.cards):
-                            selected_card = hand.cards[choice]
-                            if selected_card in valid_cards:
-                                card = selected_card
-                                break
-                            else:
-                                print(f"\033[91mInvalid choice. {selected_card} cannot be played right now. Please choose a valid card.\nYou must follow lead suit. If you don't have lead suit you must trump. \nOnly when you don't have lead suit or trump can you play anything.\033[0m")
+    def play_turn(self, decision: Decision) -> None:
+        game_state = self.game_state
+        player_idx = decision.seat
+        hand = game_state.player_hands[player_idx]
+        valid_cards = decision.legal
+
+        if not game_state.current_trick:
+            self.round += 1
+            print(f"\n\033[94mRound {self.round}:\033[0m")
+            input("Press Enter to start this round...")
+
+        if player_idx == 0:
+            print("\n\033[92mYour turn! Choose a card to play:\033[0m")
+            print("\nYour hand:")
+            for idx, card in enumerate(hand.cards):
+                print(f"{idx + 1}. {card}")
+            
+            while True:
+                try:
+                    choice = input("\nEnter the number of the card to play (or 'view' to see remaining cards): ")
+                    if choice.lower() == 'view':
+                        self.view_remaining_cards()
+                        print("\n\033[92mYour turn! Choose a card to play:\033[0m")
+                        print("\nYour hand:")
+                        for idx, card in enumerate(hand.cards):
+                            print(f"{idx + 1}. {card}")
+                        continue
+                    choice = int(choice) - 1
+                    if 0 <= choice < len(hand.cards):
+                        selected_card = hand.cards[choice]
+                        if selected_card in valid_cards:
+                            card = selected_card
+                            break
                         else:
-                            print(f"\033[91mPlease enter a number between 1 and {len(hand.cards)}.\033[0m")
-                    except ValueError:
-                        print("\033[91mInvalid input. Please enter a number or 'view'.\033[0m")
-            else:
-                if player_idx == 2:
-                    print(f"\n\033[92mPlayer {player_idx}'s turn (your partner)...\033[0m")
-                else:
-                    print(f"\n\033[91mPlayer {player_idx}'s turn...\033[0m")
-                input("Press Enter to see their play...")
-                card = cardPlay(valid_cards, game_state.current_trick, game_state.played_cards, game_state.trump_suit, (game_state.winning_bidder % 2 == player_idx % 2))
-
-            hand.remove_card(card)
-            game_state.play_card(card)
-            cardsLeft.remove_card(card)  # Remove the card from cardsLeft when it's played
-
-            if player_idx in [0, 2]:
-                print(f"\033[92mPlayer {player_idx} played {card}\033[0m")
+                            print(f"\033[91mInvalid choice. {selected_card} cannot be played right now. Please choose a valid card.\nYou must follow lead suit. If you don't have lead suit you must trump. \nOnly when you don't have lead suit or trump can you play anything.\033[0m")
+                    else:
+                        print(f"\033[91mPlease enter a number between 1 and {len(hand.cards)}.\033[0m")
+                except ValueError:
+                    print("\033[91mInvalid input. Please enter a number or 'view'.\033[0m")
+        else:
+            if player_idx == 2:
+                print(f"\n\033[92mPlayer {player_idx}'s turn (your partner)...\033[0m")
             else:
-                print(f"\033[91mPlayer {player_idx} played {card}\033[0m")
-            if player_idx != 0:
-                input("Press Enter to continue...")
+                print(f"\n\033[91mPlayer {player_idx}'s turn...\033[0m")
+            input("Press Enter to see their play...")
+            card = self.computer_action(decision)
+
+        tricks_before = len(self.flow.tricks)
+        self.flow.apply(card)
+
+        if player_idx in [0, 2]:
+            print(f"\033[92mPlayer {player_idx} played {card}\033[0m")
+        else:
+            print(f"\033[91mPlayer {player_idx} played {card}\033[0m")
+        if player_idx != 0:
+            input("Press Enter to continue...")
 
-        # Determine trick winner
-        winner = game_state.get_trick_winner(current_player)
+        if len(self.flow.tricks) == tricks_before:
+            return
+
+        # The trick is complete
+        winner = self.flow.tricks[-1][2]
         if winner in [0, 2]:
             print(f"\n\033[92mPlayer {winner} won the trick!\033[0m")
         else:
             print(f"\n\033[91mPlayer {winner} won the trick!\033[0m")
-        game_state.complete_trick(winner)
-        current_player = winner
 
         if len(game_state.player_hands[0].cards) > 0:
             input("\nPress Enter to see your remaining cards...")
@@ -580,20 +507,19 @@ def start_new_game(deck: Deck, game_state: GameState, player: Player):
             print(game_state.player_hands[0])
             input("\nPress Enter to continue to next trick...")
 
-    print("\n________________________________________________________________________________")
-    print("\n\033[94mGame Over!\033[0m")
-    input("Press Enter to see the final scores...")
+    def end_game(self) -> None:
+        instrument.phase("scoring")
+        print("\n________________________________________________________________________________")
+        print("\n\033[94mGame Over!\033[0m")
+        input("Press Enter to see the final scores...")
 
-    yourPoints = game_state.tricks_won[0] * 10
-    if yourPoints > 0:
-        yourPoints += game_state.player_hands[0].meldPoints + game_state.player_hands[2].meldPoints
-    enemyPoints = game_state.tricks_won[1] * 10
-    if enemyPoints > 0:
-        enemyPoints += game_state.player_hands[1].meldPoints + game_state.player_hands[3].meldPoints
+        yourPoints, enemyPoints = self.flow.scores
+        self.game_state.event_log.flush()
 
-    print(f"\n\033[92mYour Score: {yourPoints}\033[0m")
-    print(f"\033[91mEnemy Score: {enemyPoints}\033[0m")
-    print("\n\033[94mThank you for playing!\033[0m")
+        print(f"\n\033[92mYour Score: {yourPoints}\033[0m")
+        print(f"\033[91mEnemy Score: {enemyPoints}\033[0m")
+        print("\n\033[94mThank you for playing!\033[0m")
+        instrument.end_phase()
 
 
 # def practice_bidding(deck: Deck, bidder: Bidder):
@@ -783,4 +709,26 @@ def print_card_play_rules():
     
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "simulate":
+        import argparse
+        from ai import simulate
+
+        parser = argparse.ArgumentParser(prog="main.py simulate",
+                                         description="Play deals with the AI on all four seats and write one JSON line per deal.")
+        simulate.add_arguments(parser)
+        args = parser.parse_args(sys.argv[2:])
+        simulate.run(args.games, args.workers, args.seed, args.out, args.log, args.track_locations)
+    else:
+        import argparse
+
+        parser = argparse.ArgumentParser(description="Pinochle AI Tutor")
+        parser.add_argument("--log", help="Append a binary record of the game to this file (see game/event_log.py)")
+        parser.add_argument("--profile", nargs="?", const="", metavar="JSON",
+                            help="Time each phase and the hot functions; print a summary at exit, "
+                                 "or write it to JSON if a path is given")
+        args = parser.parse_args()
+        if args.profile is not None:
+            instrument.enable()
+            instrument.export_at_exit(args.profile or None)
+        main(args.log)